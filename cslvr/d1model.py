@@ -272,6 +272,7 @@ class D1Model(Model):
     B = Base()
     S.mark(self.ff, 0)
     B.mark(self.ff, 1)
+    self.reset_vert_operators()
     self.ds = Measure('ds', subdomain_data=self.ff)#[self.ff]
     self.dx = Measure('dx')(self.mesh)
 
@@ -288,6 +289,7 @@ class D1Model(Model):
     self.z     = self.mesh.coordinates()[:,0]
     self.index = np.argsort(self.z)[::-1]
     self.z     = self.z[self.index]
+    self.vert_dofs = {}         # dofs of each function space by self.index
     self.l     = np.diff(self.z)
    
     # surface Dirichlet boundary :
@@ -366,28 +368,88 @@ class D1Model(Model):
     #  self.rho_surface.rhon = self.rhos
     self.rho_surface.t = self.t
 
+  def get_vert_markers(self, d='down'):
+    """
+    Return the list of markers of ``self.ff`` on which the vertical integral
+    is started; the firn column is always integrated from the surface.
+    """
+    return [0]
+
+  def assemble_vert_operator(self, Q, d='down', kind='integrate'):
+    """
+    Assemble the matrix of the vertical integration operator over function
+    space ``Q``, with the surface Dirichlet row applied.
+
+    :rtype: tuple of the :class:`~fenics.Matrix` and a 
+            :class:`~fenics.LUSolver` reusing its factorization
+    """
+    phi = TestFunction(Q)
+    w   = TrialFunction(Q)
+    A   = assemble(w.dx(0) * phi * dx)
+    DirichletBC(Q, 0.0, self.surface).apply(A)
+    solver = LUSolver(A)
+    solver.parameters['reuse_factorization'] = True
+    return A, solver
+
+  def get_vert_dofs(self, Q):
+    """
+    Return the array of the dofs of function space ``Q`` in the order of 
+    ``self.index``, from the surface to the bed, or ``None`` if ``Q`` is not
+    a scalar linear Lagrange space of a serial mesh.  The order of the 
+    vertices along the column does not change as the firn compacts, so the
+    permutation is cached in ``self.vert_dofs`` by function space and kept 
+    when :func:`reset_vert_operators` is called as the mesh moves; it is 
+    recomputed only when ``self.index`` is, by :func:`initialize_variables`.
+    """
+    entry = self.vert_dofs.get(Q.id())
+    if entry is None or entry[0] is not self.index:
+      e    = Q.ufl_element()
+      dofs = None
+      if      MPI.size(mpi_comm_world()) == 1 \
+          and e.family() == 'Lagrange' and e.degree() == 1 \
+          and Q.dim() == self.mesh.num_vertices():
+        dofs = vertex_to_dof_map(Q)[self.index]
+      entry = (self.index, dofs)
+      self.vert_dofs[Q.id()] = entry
+    return entry[1]
+
   def vert_integrate(self, u):
     """
-    Integrate <u> from the surface to the bed.
+    Integrate <u> from the surface to the bed.  This is a cumulative 
+    trapezoidal sum over the vertices ordered by :func:`get_vert_dofs`;
+    UFL expressions are first reduced to nodal values with the lumped mass
+    matrix.  If the space is not linear, a variational problem is solved.
     """
     s    = '::: vertically integrating function :::'
     print_text(s, self.D1Model_color)
 
-    ff  = self.ff
-    Q   = self.Q
-    phi = TestFunction(Q)
-    v   = TrialFunction(Q)
-    
-    # surface Dirichlet boundary :
-    def surface(x, on_boundary):
-      return on_boundary and x[0] == self.S_bc
-    
-    # integral is zero on surface
-    bcs = DirichletBC(Q, 0.0, surface)
-    a      = v.dx(0) * phi * dx
-    L      = u * phi * dx
-    v      = Function(Q)
-    solve(a == L, v, bcs, annotate=False)
+    Q     = self.Q
+    phi   = TestFunction(Q)
+    dofs  = self.get_vert_dofs(Q)
+    v     = Function(Q)
+
+    if dofs is not None:
+      if isinstance(u, float) or isinstance(u, int):
+        u_v = u * np.ones(Q.dim())
+      elif isinstance(u, Function) and u.function_space().id() == Q.id():
+        u_v = u.vector().array()
+      else:
+        u_v = assemble(u * phi * dx).array() / assemble(phi * dx).array()
+      z         = self.mesh.coordinates()[self.index, 0]
+      f         = u_v[dofs]
+      seg       = 0.5 * (f[1:] + f[:-1]) * np.diff(z)
+      v_v       = np.empty(Q.dim())
+      v_v[dofs] = np.append(0.0, np.cumsum(seg))
+      v.vector().set_local(v_v)
+      v.vector().apply('insert')
+    else:
+      A, solver = self.get_vert_operator(Q, 'down', 'integrate')
+      
+      # integral is zero on surface
+      bc     = DirichletBC(Q, 0.0, self.surface)
+      b      = assemble(u * phi * dx)
+      bc.apply(b)
+      solver.solve(v.vector(), b, annotate=False)
     print_min_max(v, 'vertically integrated function')
     #print_min_max(v, 'vertically integrated %s' % u.name())
     return v
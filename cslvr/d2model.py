@@ -2,7 +2,8 @@ from fenics            import *
 from dolfin_adjoint    import *
 from cslvr.inputoutput import print_text, get_text, print_min_max
 from cslvr.model       import Model
-from cslvr.helper      import Boundary, VerticalBasis
+from cslvr.helper      import Boundary, VerticalBasis, get_exterior_facets, \
+                                 evaluate_at_points
 from pylab             import inf
 import numpy               as np
 import sys
@@ -183,6 +184,9 @@ class D2Model(Model):
     S = self.S
     B = self.B
     
+    # the arguments as given, evaluated at the midpoints below :
+    mask_in, adot_in, U_mask_in = mask, adot, U_mask
+
     # default to all grounded ice :
     if mask == None:
       mask = Expression('1.0', element=self.Q.ufl_element())
@@ -204,59 +208,40 @@ class D2Model(Model):
     self.U_mask.set_allow_extrapolation(True)
     self.lat_mask.set_allow_extrapolation(True)
     
-    tol = 1e-6
-    
     s = "    - marking boundaries - "
     print_text(s, cls=self)
     
-    s = "    - iterating through %i edges - " % self.num_edges
+    # the fields passed in are evaluated at the midpoints of the edges and
+    # cells, so that an edge or cell straddling a mask transition takes the
+    # value at its centre, as it did when they were marked one at a time :
+    x_c = self.mesh.coordinates()[self.mesh.cells()].mean(axis=1)
+    
+    ext, fv, x_m, n = get_exterior_facets(self.mesh)
+    
+    s = "    - marking %i exterior edges - " % len(ext)
     print_text(s, cls=self)
-    for f in facets(self.mesh):
-      x_m      = f.midpoint().x()
-      y_m      = f.midpoint().y()
-      mask_xy  = mask(x_m, y_m)
-      
-      if f.exterior():
-        # if we want to use a basin, we need to mark the interior facets :
-        if mark_divide:
-          lat_mask_xy = lat_mask(x_m, y_m)
-          if lat_mask_xy > 0:
-            self.ff[f] = self.GAMMA_L_DVD
-          else:
-            if mask_xy > 1:
-              self.ff[f] = self.GAMMA_L_FLT
-            else:
-              self.ff[f] = self.GAMMA_L_GND
-        # otherwise just mark for in contact with or without water :
-        else:
-          if mask_xy > 1:
-            self.ff[f] = self.GAMMA_L_FLT
-          else:
-            self.ff[f] = self.GAMMA_L_GND
+    flt    = evaluate_at_points(mask_in, x_m) > 1
+    ff     = self.ff.array()
+    ff[ext] = np.where(flt, self.GAMMA_L_FLT, self.GAMMA_L_GND)
+    
+    # if we want to use a basin, we need to mark the interior facets :
+    if mark_divide:
+      dvd = evaluate_at_points(lat_mask, x_m) > 0
+      ff[ext[dvd]] = self.GAMMA_L_DVD
     s = "    - done - "
     print_text(s, cls=self)
     
-    s = "    - iterating through %i cells - " % self.num_cells
+    s = "    - marking %i cells - " % self.num_cells
     print_text(s, cls=self)
-    for c in cells(self.mesh):
-      x_m       = c.midpoint().x()
-      y_m       = c.midpoint().y()
-      mask_xy   = mask(x_m, y_m)
-      U_mask_xy = U_mask(x_m, y_m)
-      adot_xy   = adot(x_m, y_m)
-
-      if adot_xy > 0:
-        self.ff_acc[c] = self.OMEGA_ACC
-      if mask_xy > 1:
-        if U_mask_xy > 0:
-          self.cf[c] = self.OMEGA_U_FLT
-        else:
-          self.cf[c] = self.OMEGA_FLT
-      else:
-        if U_mask_xy > 0:
-          self.cf[c] = self.OMEGA_U_GND
-        else:
-          self.cf[c] = self.OMEGA_GND
+    flt    = evaluate_at_points(mask_in, x_c)   > 1
+    obs    = evaluate_at_points(U_mask_in, x_c) > 0
+    acc    = evaluate_at_points(adot_in, x_c)   > 0
+    ff_acc = self.ff_acc.array()
+    cf     = self.cf.array()
+    ff_acc[acc] = self.OMEGA_ACC
+    cf[:]  = np.select([flt & obs,        flt,            obs],
+                       [self.OMEGA_U_FLT, self.OMEGA_FLT, self.OMEGA_U_GND],
+                       self.OMEGA_GND)
     s = "    - done - "
     print_text(s, cls=self)
     
@@ -2,8 +2,10 @@ from fenics            import *
 from dolfin_adjoint    import *
 from cslvr.inputoutput import print_text, get_text, print_min_max
 from cslvr.model       import Model
-from cslvr.helper      import Boundary
+from cslvr.helper      import Boundary, VerticalColumns, \
+                                 get_exterior_facets, evaluate_at_points
 from pylab             import inf
+import numpy               as np
 import sys
 
 class D3Model(Model):
@@ -243,6 +245,9 @@ class D3Model(Model):
     self.cf      = CellFunction('size_t',  self.mesh, 0)
     dofmap       = self.Q.dofmap()
     
+    # the arguments as given, evaluated at the midpoints below :
+    mask_in, adot_in, U_mask_in = mask, adot, U_mask
+
     # default to all grounded ice :
     if mask == None:
       mask = Expression('1.0', element=self.Q.ufl_element())
@@ -266,7 +271,12 @@ class D3Model(Model):
     
     tol = 1e-6
     
-    # iterate through the facets and mark each if on a boundary :
+    # the fields passed in are evaluated at the midpoints of the facets and
+    # cells, so that a facet or cell straddling a mask transition takes the
+    # value at its centre, as it did when they were marked one at a time :
+    x_c = self.mesh.coordinates()[self.mesh.cells()].mean(axis=1)
+    
+    # mark each exterior facet according to its normal vector :
     #
     #   2 = high slope, upward facing ................ grounded surface
     #   3 = grounded high slope, downward facing ..... grounded base
@@ -278,70 +288,44 @@ class D3Model(Model):
     # facet for accumulation :
     #
     #   1 = high slope, upward facing ................ positive adot
-    s = "    - iterating through %i facets - " % self.num_facets
+    ext, fv, x_m, n = get_exterior_facets(self.mesh)
+    
+    s = "    - marking %i exterior facets - " % len(ext)
     print_text(s, cls=self)
-    for f in facets(self.mesh):
-      n        = f.normal()
-      x_m      = f.midpoint().x()
-      y_m      = f.midpoint().y()
-      z_m      = f.midpoint().z()
-      mask_xy  = mask(x_m, y_m, z_m)
-      
-      if   n.z() >=  tol and f.exterior():
-        adot_xy   = adot(x_m, y_m, z_m)
-        U_mask_xy = U_mask(x_m, y_m, z_m)
-        if adot_xy > 0:
-          self.ff_acc[f] = self.GAMMA_ACC
-        if mask_xy > 1:
-          if U_mask_xy > 0:
-            self.ff[f] = self.GAMMA_U_FLT
-          else:
-            self.ff[f] = self.GAMMA_S_FLT
-        else:
-          if U_mask_xy > 0:
-            self.ff[f] = self.GAMMA_U_GND
-          else:
-            self.ff[f] = self.GAMMA_S_GND
     
-      elif n.z() <= -tol and f.exterior():
-        if mask_xy > 1:
-          self.ff[f] = self.GAMMA_B_FLT
-        else:
-          self.ff[f] = self.GAMMA_B_GND
-      
-      elif n.z() >  -tol and n.z() < tol and f.exterior():
-        # if we want to use a basin, we need to mark the interior facets :
-        if mark_divide:
-          lat_mask_xy = lat_mask(x_m, y_m, z_m)
-          if lat_mask_xy > 0:
-            if z_m > 0:
-              self.ff[f] = self.GAMMA_L_OVR
-            else:
-              self.ff[f] = self.GAMMA_L_UDR
-          else:
-            self.ff[f] = self.GAMMA_L_DVD
-        # otherwise just mark for over (4) and under (10) water :
-        else:
-          if z_m > 0:
-            self.ff[f] = self.GAMMA_L_OVR
-          else:
-            self.ff[f] = self.GAMMA_L_UDR
+    n_z   = n[:,2]
+    z_m   = x_m[:,2]
+    upr   = n_z >=  tol
+    lwr   = n_z <= -tol
+    lat   = ~(upr | lwr)
+    flt   = evaluate_at_points(mask_in, x_m)   > 1
+    obs   = evaluate_at_points(U_mask_in, x_m) > 0
+    acc   = evaluate_at_points(adot_in, x_m)   > 0
+    ovr   = z_m > 0
+    
+    ff     = self.ff.array()
+    ff_acc = self.ff_acc.array()
+    
+    ff_acc[ext[upr & acc]] = self.GAMMA_ACC
+    ff[ext[upr]] = np.select([flt & obs,        flt,              obs],
+                             [self.GAMMA_U_FLT, self.GAMMA_S_FLT,
+                              self.GAMMA_U_GND], self.GAMMA_S_GND)[upr]
+    ff[ext[lwr]] = np.where(flt, self.GAMMA_B_FLT, self.GAMMA_B_GND)[lwr]
+    ff[ext[lat]] = np.where(ovr, self.GAMMA_L_OVR, self.GAMMA_L_UDR)[lat]
+    
+    # if we want to use a basin, we need to mark the interior facets :
+    if mark_divide:
+      dvd = lat & ~(evaluate_at_points(lat_mask, x_m) > 0)
+      ff[ext[dvd]] = self.GAMMA_L_DVD
     
     s = "    - done - "
     print_text(s, cls=self)
     
-    s = "    - iterating through %i cells - " % self.num_cells
+    s = "    - marking %i cells - " % self.num_cells
     print_text(s, cls=self)
-    for c in cells(self.mesh):
-      x_m     = c.midpoint().x()
-      y_m     = c.midpoint().y()
-      z_m     = c.midpoint().z()
-      mask_xy = mask(x_m, y_m, z_m)
-
-      if mask_xy > 1:
-        self.cf[c] = self.OMEGA_FLT
-      else:
-        self.cf[c] = self.OMEGA_GND
+    mask_c = evaluate_at_points(mask_in, x_c)
+    cf     = self.cf.array()
+    cf[:]  = np.where(mask_c > 1, self.OMEGA_FLT, self.OMEGA_GND)
     
     s = "    - done - "
     print_text(s, cls=self)
@@ -391,6 +375,9 @@ class D3Model(Model):
     * ``self.dx_g``    --  internal above grounded
     * ``self.dx_f``    --  internal above floating
     """
+    # the vertical operators depend on the markers of self.ff :
+    self.reset_vert_operators()
+
     # calculate the number of cells and facets that are of a certain type
     # for determining Dirichlet boundaries :
     self.N_OMEGA_GND   = sum(self.cf.array()     == self.OMEGA_GND)
@@ -474,95 +461,90 @@ class D3Model(Model):
     s = "::: deforming mesh to geometry :::"
     print_text(s, cls=self)
 
-    self.init_S(S)
-    self.init_B(B)
+    Q = self.Q_non_periodic
+    self.init_S(self.evaluate_by_column(S, Q, 2))
+    self.init_B(self.evaluate_by_column(B, Q, 2))
     
     # transform z :
     # thickness = surface - base, z = thickness + base
     # Get the height of the mesh, assumes that the base is at z=0
-    max_height  = self.mesh.coordinates()[:,2].max()
-    min_height  = self.mesh.coordinates()[:,2].min()
+    x           = self.mesh.coordinates()
+    max_height  = x[:,2].max()
+    min_height  = x[:,2].min()
     mesh_height = max_height - min_height
     
-    s = "    - iterating through %i vertices - " % self.num_vertices
+    s = "    - moving %i vertices - " % self.num_vertices
     print_text(s, cls=self)
-    
-    for x in self.mesh.coordinates():
-      x[2] = (x[2] / mesh_height) * ( + S(x[0],x[1],x[2]) \
-                                      - B(x[0],x[1],x[2]) )
-      x[2] = x[2] + B(x[0], x[1], x[2])
+   
+    S_v    = self.S.compute_vertex_values(self.mesh)
+    B_v    = self.B.compute_vertex_values(self.mesh)
+    x[:,2] = (x[:,2] / mesh_height) * (S_v - B_v) + B_v
+    self.reset_vert_operators()
     s = "    - done - "
     print_text(s, cls=self)
 
-  def form_srf_mesh(self):
+  def form_boundary_meshes(self, kinds=('srf', 'bed', 'lat', 'dvd')):
     """
-    sets self.srfmesh, the surface boundary mesh for this model instance.
+    sets the boundary meshes ``self.srfmesh``, ``self.bedmesh``, 
+    ``self.latmesh``, and ``self.dvdmesh`` named in ``kinds`` for this model
+    instance, extracted together from a single exterior boundary mesh.  The
+    vertices of each are recorded against ``self.mesh``, so that 
+    :func:`~model.Model.assign_submesh_variable` transfers linear Lagrange
+    functions to and from them by copying dof values.
+
+    :param kinds: any of ``'srf'``, ``'bed'``, ``'lat'``, and ``'dvd'``
     """
-    s = "::: extracting surface mesh :::"
+    s = "::: extracting %s boundary meshes :::" % ', '.join(kinds)
     print_text(s, cls=self)
 
-    bmesh   = BoundaryMesh(self.mesh, 'exterior')
-    cellmap = bmesh.entity_map(2)
-    pb      = CellFunction("size_t", bmesh, 0)
-    for c in cells(bmesh):
-      if Facet(self.mesh, cellmap[c.index()]).normal().z() > 1e-3:
-        pb[c] = 1
-    submesh = SubMesh(bmesh, pb, 1)
-    self.srfmesh = submesh
+    bmesh           = BoundaryMesh(self.mesh, 'exterior')
+    ext, fv, mid, n = get_exterior_facets(self.mesh, bmesh)
+    b_v             = bmesh.entity_map(0).array()
+    n_z             = n[:,2]
+
+    masks = {'srf' : n_z >  1e-3,
+             'bed' : n_z < -1e-3,
+             'lat' : np.abs(n_z) < 1e-3}
+
+    # the lateral mask is linear, so its facet midpoint value is the mean :
+    if 'dvd' in kinds:
+      lat_mask     = self.lat_mask.compute_vertex_values(self.mesh)
+      masks['dvd'] = masks['lat'] & (lat_mask[fv].mean(axis=1) <= 0)
+
+    for k in kinds:
+      pb                   = CellFunction("size_t", bmesh, 0)
+      pb.array()[masks[k]] = 1
+      submesh              = SubMesh(bmesh, pb, 1)
+      sub_v                = submesh.data().array('parent_vertex_indices', 0)
+      Model.submesh_vertices[submesh.id()] = (self.mesh.id(), b_v[sub_v])
+      setattr(self, k + 'mesh', submesh)
+      s = "    - %smesh has %i cells, %i vertices -" \
+          % (k, submesh.num_cells(), submesh.num_vertices())
+      print_text(s, cls=self)
+
+  def form_srf_mesh(self):
+    """
+    sets self.srfmesh, the surface boundary mesh for this model instance.
+    """
+    self.form_boundary_meshes(['srf'])
 
   def form_bed_mesh(self):
     """
     sets self.bedmesh, the basal boundary mesh for this model instance.
     """
-    s = "::: extracting bed mesh :::"
-    print_text(s, cls=self)
-
-    bmesh   = BoundaryMesh(self.mesh, 'exterior')
-    cellmap = bmesh.entity_map(2)
-    pb      = CellFunction("size_t", bmesh, 0)
-    for c in cells(bmesh):
-      if Facet(self.mesh, cellmap[c.index()]).normal().z() < -1e-3:
-        pb[c] = 1
-    submesh = SubMesh(bmesh, pb, 1)
-    self.bedmesh = submesh
+    self.form_boundary_meshes(['bed'])
 
   def form_lat_mesh(self):
     """
     sets self.latmesh, the lateral boundary mesh for this model instance.
     """
-    s = "::: extracting lateral mesh :::"
-    print_text(s, cls=self)
-
-    bmesh   = BoundaryMesh(self.mesh, 'exterior')
-    cellmap = bmesh.entity_map(2)
-    pb      = CellFunction("size_t", bmesh, 0)
-    for c in cells(bmesh):
-      if abs(Facet(self.mesh, cellmap[c.index()]).normal().z()) < 1e-3:
-        pb[c] = 1
-    submesh = SubMesh(bmesh, pb, 1)
-    self.latmesh = submesh
+    self.form_boundary_meshes(['lat'])
 
   def form_dvd_mesh(self):
     """
     sets self.dvdmesh, the lateral divide boundary mesh for this model instance.
     """
-    s = "::: extracting lateral divide mesh :::"
-    print_text(s, cls=self)
-
-    bmesh   = BoundaryMesh(self.mesh, 'exterior')
-    cellmap = bmesh.entity_map(2)
-    pb      = CellFunction("size_t", bmesh, 0)
-    self.lat_mask.set_allow_extrapolation(True)
-    for c in cells(bmesh):
-      f       = Facet(self.mesh, cellmap[c.index()])
-      n       = f.normal()
-      x_m     = f.midpoint().x()
-      y_m     = f.midpoint().y()
-      z_m     = f.midpoint().z()
-      if abs(n.z()) < 1e-3 and self.lat_mask(x_m, y_m, z_m) <= 0:
-        pb[c] = 1
-    submesh = SubMesh(bmesh, pb, 1)
-    self.dvdmesh = submesh
+    self.form_boundary_meshes(['dvd'])
       
   def calc_thickness(self):
     """
@@ -594,10 +576,70 @@ class D3Model(Model):
     pv[pv < 0] = 0.0
     self.assign_variable(self.p, p)
   
+  def get_vert_markers(self, d='up'):
+    """
+    Return the list of markers of ``self.ff`` on which the vertical operators
+    are started; the bed if ``d`` = 'up' and the surface if ``d`` = 'down'.
+    """
+    if d == 'up':
+      return [self.GAMMA_B_GND, self.GAMMA_B_FLT]
+    elif d == 'down':
+      return [self.GAMMA_S_GND, self.GAMMA_S_FLT,
+              self.GAMMA_U_GND, self.GAMMA_U_FLT]
+
+  def get_vertical_columns(self, Q):
+    """
+    Return the :class:`~helper.VerticalColumns` index of the dofs of function
+    space ``Q``, built once for each space and set of markers ``self.ff``.
+    If the mesh is not layered or ``Q`` is not a scalar linear space, 
+    ``None`` is returned and the vertical operators fall back to solving a
+    variational problem.
+    """
+    if Q.id() not in self.columns:
+      col = VerticalColumns(Q, self.ff, self.get_vert_markers('up'),
+                            self.get_vert_markers('down'), axis=2)
+      if not col.structured:
+        s = "    - mesh is not column-structured for this space, vertical" + \
+            " operators will solve a variational problem -"
+        print_text(s, cls=self)
+        col = None
+      self.columns[Q.id()] = col
+    return self.columns[Q.id()]
+
+  def assemble_vert_operator(self, Q, d='up', kind='extrude'):
+    r"""
+    Assemble the matrix of the vertical operator over function space ``Q``
+    with the Dirichlet rows of :func:`get_vert_markers` in direction ``d``
+    applied, for ``kind`` = 'extrude' or 'integrate' :
+  
+    .. math::
+       
+       \pm \int_{\Omega} \frac{\partial v}{\partial z} \phi \ d\Omega
+
+    where the sign is negative only when integrating downwards.
+
+    :rtype: tuple of the :class:`~fenics.Matrix` and a 
+            :class:`~fenics.LUSolver` reusing its factorization
+    """
+    phi = TestFunction(Q)
+    w   = TrialFunction(Q)
+    if kind == 'integrate' and d == 'down':
+      a = -w.dx(2) * phi * dx
+    else:
+      a =  w.dx(2) * phi * dx
+    A   = assemble(a)
+    for m in self.get_vert_markers(d):
+      DirichletBC(Q, 0.0, self.ff, m).apply(A)
+    solver = LUSolver(A)
+    solver.parameters['reuse_factorization'] = True
+    return A, solver
+  
   def vert_extrude(self, u, d='up', Q='self'):
     r"""
     This extrudes a function *u* vertically in the direction *d* = 'up' or
-    'down'.  It does this by solving a variational problem:
+    'down'.  If the mesh is layered, this is done by copying the values of
+    *u* along each vertical column given by :func:`get_vertical_columns`;
+    otherwise, it does this by solving a variational problem:
   
     .. math::
        
@@ -605,92 +647,93 @@ class D3Model(Model):
        v|_b = u
 
     """
-    s = "::: extruding function %swards :::" % d
-    print_text(s, cls=self)
     if type(Q) != FunctionSpace:
       #Q  = self.Q_non_periodic
       Q = u.function_space()
-    ff   = self.ff
-    phi  = TestFunction(Q)
-    v    = TrialFunction(Q)
-    a    = v.dx(2) * phi * dx
-    L    = DOLFIN_EPS * phi * dx
-    bcs  = []
-    # extrude bed (ff = 3,5) 
-    if d == 'up':
-      #if self.N_GAMMA_B_GND != 0:
-      #  bcs.append(DirichletBC(Q, u, ff, self.GAMMA_B_GND))  # grounded
-      #if self.N_GAMMA_B_FLT != 0:
-      #  bcs.append(DirichletBC(Q, u, ff, self.GAMMA_B_FLT))  # shelves
-      bcs.append(DirichletBC(Q, u, ff, self.GAMMA_B_GND))  # grounded
-      bcs.append(DirichletBC(Q, u, ff, self.GAMMA_B_FLT))  # shelves
-    # extrude surface (ff = 2,6) 
-    elif d == 'down':
-      #if self.N_GAMMA_S_GND != 0:
-      #  bcs.append(DirichletBC(Q, u, ff, self.GAMMA_S_GND))  # grounded
-      #if self.N_GAMMA_S_FLT != 0:
-      #  bcs.append(DirichletBC(Q, u, ff, self.GAMMA_S_FLT))  # shelves
-      #if self.N_GAMMA_U_GND != 0:
-      #  bcs.append(DirichletBC(Q, u, ff, self.GAMMA_U_GND))  # grounded
-      #if self.N_GAMMA_U_FLT != 0:
-      #  bcs.append(DirichletBC(Q, u, ff, self.GAMMA_U_FLT))  # shelves
-      bcs.append(DirichletBC(Q, u, ff, self.GAMMA_S_GND))  # grounded
-      bcs.append(DirichletBC(Q, u, ff, self.GAMMA_S_FLT))  # shelves
-      bcs.append(DirichletBC(Q, u, ff, self.GAMMA_U_GND))  # grounded
-      bcs.append(DirichletBC(Q, u, ff, self.GAMMA_U_FLT))  # shelves
-    try:
-      name = '%s extruded %s' % (u.name(), d)
-    except AttributeError:
-      name = 'extruded'
-    v    = Function(Q, name=name)
-    solve(a == L, v, bcs, annotate=False)
-    print_min_max(v, 'extruded function')
-    return v
+    return self.vert_extrude_many([u], d=d, Q=Q)[0]
+  
+  def vert_extrude_many(self, us, d='up', Q='self'):
+    """
+    Extrude each of the list of functions or UFL expressions <us> vertically
+    in the direction <d> = 'up' or 'down', as in :func:`vert_extrude`.  When
+    a variational problem is needed, the operator is assembled and factored
+    once and only the boundary values change for each of <us>.
+
+    :rtype: list of extruded :class:`~fenics.Function`\s
+    """
+    s = "::: extruding %i function(s) %swards :::" % (len(us), d)
+    print_text(s, cls=self)
+    if type(Q) != FunctionSpace:
+      Q = us[0].function_space()
+    col = self.get_vertical_columns(Q)
+    if col is None:
+      A, solver = self.get_vert_operator(Q, d, 'extrude')
+      b0        = assemble(DOLFIN_EPS * TestFunction(Q) * dx)
+    vs  = []
+    for u in us:
+      try:
+        name = '%s extruded %s' % (u.name(), d)
+      except AttributeError:
+        name = 'extruded'
+      v = Function(Q, name=name)
+      if col is not None:
+        v.vector().set_local(col.extrude(col.get_nodal_values(u), d))
+        v.vector().apply('insert')
+      else:
+        if not isinstance(u, (float, int, GenericFunction)):
+          u = project(u, Q, annotate=False)
+        b = b0.copy()
+        for m in self.get_vert_markers(d):
+          DirichletBC(Q, u, self.ff, m).apply(b)
+        solver.solve(v.vector(), b, annotate=False)
+      print_min_max(v, 'extruded function')
+      vs.append(v)
+    return vs
   
   def vert_integrate(self, u, d='up', Q='self'):
     """
-    Integrate <u> from the bed to the surface.
+    Integrate <u> from the bed to the surface if <d> = 'up', or from the
+    surface to the bed if <d> = 'down'.  If the mesh is layered, this is a
+    cumulative trapezoidal sum along each vertical column given by 
+    :func:`get_vertical_columns`; otherwise a variational problem is solved.
+    """
+    return self.vert_integrate_many([u], d=d, Q=Q)[0]
+  
+  def vert_integrate_many(self, us, d='up', Q='self'):
+    """
+    Vertically integrate each of the list of functions or UFL expressions
+    <us> in the direction <d> = 'up' or 'down', as in :func:`vert_integrate`.
+    When a variational problem is needed, the operator is assembled and 
+    factored once and only the right-hand side changes for each of <us>.
+
+    :rtype: list of integrated :class:`~fenics.Function`\s
     """
-    s = "::: vertically integrating function :::"
+    s = "::: vertically integrating %i function(s) :::" % len(us)
     print_text(s, cls=self)
 
     if type(Q) != FunctionSpace:
       Q  = self.Q_non_periodic
       #Q = u.function_space()
-    ff  = self.ff
-    phi = TestFunction(Q)
-    v   = TrialFunction(Q)
-    bcs = []
-    # integral is zero on bed (ff = 3,5) 
-    if d == 'up':
-      #if self.N_GAMMA_B_GND != 0:
-      #  bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_B_GND))  # grounded
-      #if self.N_GAMMA_B_FLT != 0:
-      #  bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_B_FLT))  # shelves
-      bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_B_GND))  # grounded
-      bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_B_FLT))  # shelves
-      a      = v.dx(2) * phi * dx
-    # integral is zero on surface (ff = 2,6) 
-    elif d == 'down':
-      #if self.N_GAMMA_S_GND != 0:
-      #  bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_S_GND))  # grounded
-      #if self.N_GAMMA_S_FLT != 0:
-      #  bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_S_FLT))  # shelves
-      #if self.N_GAMMA_U_GND != 0:
-      #  bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_U_GND))  # grounded
-      #if self.N_GAMMA_U_FLT != 0:
-      #  bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_U_FLT))  # shelves
-      bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_S_GND))  # grounded
-      bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_S_FLT))  # shelves
-      bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_U_GND))  # grounded
-      bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_U_FLT))  # shelves
-      a      = -v.dx(2) * phi * dx
-    L      = u * phi * dx
-    name   = 'value integrated %s' % d 
-    v      = Function(Q, name=name)
-    solve(a == L, v, bcs, annotate=False)
-    print_min_max(v, 'vertically integrated function')
-    return v
+    col = self.get_vertical_columns(Q)
+    if col is None:
+      A, solver = self.get_vert_operator(Q, d, 'integrate')
+      phi       = TestFunction(Q)
+      bcs       = [DirichletBC(Q, 0.0, self.ff, m) \
+                   for m in self.get_vert_markers(d)]
+    vs  = []
+    for u in us:
+      v = Function(Q, name='value integrated %s' % d)
+      if col is not None:
+        v.vector().set_local(col.integrate(col.get_nodal_values(u), d))
+        v.vector().apply('insert')
+      else:
+        b = assemble(u * phi * dx)
+        for bc in bcs:
+          bc.apply(b)
+        solver.solve(v.vector(), b, annotate=False)
+      print_min_max(v, 'vertically integrated function')
+      vs.append(v)
+    return vs
 
   def calc_vert_average(self, u):
     """
@@ -717,6 +760,133 @@ class D3Model(Model):
     H_v    = self.S.vector().array() - self.B.vector().array() + DOLFIN_EPS
     self.assign_variable(ubar, ubar_v / H_v)
     return ubar
+
+  def extrude_from_submesh(self, u, u_sub, d='up'):
+    """
+    Assign to the function <u> over this mesh the values of <u_sub>, defined
+    over a basal boundary mesh if <d> = 'up' or a surface boundary mesh if
+    <d> = 'down', such as that of a :class:`~d2model.D2Model` created from 
+    ``self.bedmesh``, extruded vertically through the ice.  If the boundary
+    mesh was formed by :func:`form_boundary_meshes` and the mesh is layered,
+    this is a single copy of the boundary values up or down each vertical
+    column; otherwise the values are assigned with 
+    :func:`~model.Model.assign_submesh_variable` and :func:`vert_extrude`.
+    If <u_sub> is known not to cover the boundary extruded from, the 
+    program exits rather than extruding zeros.
+
+    :param u:     3D function to assign to
+    :param u_sub: boundary-mesh function to assign from
+    :param d:     direction to extrude, 'up' or 'down'
+    """
+    s = "::: extruding submesh variable %swards :::" % d
+    print_text(s, cls=self)
+
+    if d not in ['up', 'down']:
+      s = ">>> PARAMETER <d> OF extrude_from_submesh() MUST BE 'up' OR " + \
+          "'down', NOT '%s' <<<" % d
+      print_text(s, 'red', 1)
+      sys.exit(1)
+    kind = {'up' : 'bed', 'down' : 'srf'}[d]
+    self.check_submesh(u_sub.function_space().mesh(), kind, 
+                       'extrude_from_submesh')
+
+    Q    = u.function_space()
+    col  = self.get_vertical_columns(Q)
+    dofs = self.get_submesh_dofs(u_sub.function_space(), Q)
+    if col is not None and dofs is not None:
+      end = {'up' : col.bed_dofs, 'down' : col.srf_dofs}[d]
+      if not np.all(np.in1d(end, dofs)):
+        s = ">>> THE SUBMESH OF <u_sub> DOES NOT CONTAIN THE %s OF EVERY " \
+            % {'up' : 'BED', 'down' : 'SURFACE'}[d] + \
+            "VERTICAL COLUMN, AND CANNOT BE EXTRUDED %sWARDS <<<" % d.upper()
+        print_text(s, 'red', 1)
+        sys.exit(1)
+      u_v       = np.zeros(Q.dim())
+      u_v[dofs] = u_sub.vector().array()
+      u.vector().set_local(col.extrude(u_v, d))
+      u.vector().apply('insert')
+    else:
+      u_b = Function(Q)
+      self.assign_submesh_variable(u_b, u_sub)
+      self.assign_variable(u, self.vert_extrude(u_b, d=d))
+    print_min_max(u, u.name())
+
+  def reduce_to_submesh(self, u_sub, u, kind='bed'):
+    """
+    Assign to the function <u_sub>, defined over a basal or surface boundary
+    mesh such as that of a :class:`~d2model.D2Model` created from 
+    ``self.bedmesh`` or ``self.srfmesh``, the values of the function <u>
+    over this mesh at the bed if <kind> = 'bed', at the surface if <kind> = 
+    'srf', or its vertical average if <kind> = 'avg', taken along the 
+    vertical column through each vertex of the boundary mesh.  If the 
+    boundary mesh was formed by :func:`form_boundary_meshes` and the mesh is
+    layered, this is a single gather, or cumulative sum for the average, 
+    over each vertical column; otherwise the values are extruded with 
+    :func:`vert_extrude` or averaged with :func:`calc_vert_average`.
+
+    :param u_sub: boundary-mesh function to assign to
+    :param u:     3D function to assign from
+    :param kind:  'bed', 'srf', or 'avg'
+    """
+    s = "::: reducing %s variable to submesh :::" % kind
+    print_text(s, cls=self)
+
+    if kind not in ['bed', 'srf', 'avg']:
+      s = ">>> PARAMETER <kind> OF reduce_to_submesh() MUST BE 'bed', " + \
+          "'srf', OR 'avg', NOT '%s' <<<" % kind
+      print_text(s, 'red', 1)
+      sys.exit(1)
+
+    Q    = u.function_space()
+    col  = self.get_vertical_columns(Q)
+    dofs = self.get_submesh_dofs(u_sub.function_space(), Q)
+    if col is not None and dofs is not None:
+      u_a   = u.vector().array()
+      if   kind == 'bed':
+        u_c = u_a[col.bed_dofs]
+      elif kind == 'srf':
+        u_c = u_a[col.srf_dofs]
+      else:
+        z   = self.mesh.coordinates()[:,2]
+        H   = z[col.vertices[col.end - 1]] - z[col.vertices[col.start]]
+        u_c = col.integrate(u_a, 'up')[col.srf_dofs] / (H + DOLFIN_EPS)
+
+      # each column's value at both its ends, for either boundary mesh :
+      u_v               = np.zeros(Q.dim())
+      u_v[col.bed_dofs] = u_c
+      u_v[col.srf_dofs] = u_c
+      u_sub.vector().set_local(u_v[dofs])
+      u_sub.vector().apply('insert')
+      print_min_max(u_sub, u_sub.name())
+    elif kind == 'avg':
+      self.assign_submesh_variable(u_sub, self.calc_vert_average(u))
+    elif self.is_submesh(u_sub.function_space().mesh(), kind):
+      self.assign_submesh_variable(u_sub, u)
+    else:
+      d = {'bed' : 'up', 'srf' : 'down'}[kind]
+      self.assign_submesh_variable(u_sub, self.vert_extrude(u, d=d))
+
+  def is_submesh(self, submesh, kind):
+    """
+    Return True if <submesh> is the boundary mesh ``self.bedmesh`` if 
+    <kind> = 'bed', or ``self.srfmesh`` if <kind> = 'srf', formed by 
+    :func:`form_boundary_meshes`.
+    """
+    bmesh = getattr(self, kind + 'mesh', None)
+    return bmesh is not None and submesh.id() == bmesh.id()
+
+  def check_submesh(self, submesh, kind, caller):
+    """
+    Exit if <submesh> is the boundary mesh opposite to <kind>, i.e., 
+    ``self.srfmesh`` where the bed is required, or ``self.bedmesh`` where
+    the surface is.  Boundary meshes unknown to this model are not checked.
+    """
+    other = {'bed' : 'srf', 'srf' : 'bed'}[kind]
+    if self.is_submesh(submesh, other):
+      s = ">>> %s() REQUIRES A FUNCTION OVER THE %smesh, " % (caller, kind) + \
+          "NOT THE %smesh <<<" % other
+      print_text(s, 'red', 1)
+      sys.exit(1)
  
   def save_bed_mesh(self, h5File): 
     """
@@ -1,15 +1,128 @@
 import inspect
 import os
 import sys
+import shutil
+import cPickle          as pickle
+import tifffile
+from functools          import wraps
+from multiprocessing    import Pool
+from multiprocessing.pool import ThreadPool
+from hashlib            import sha1
 from tifffile           import TiffFile
 from numpy              import array, sqrt, shape, arange, meshgrid, loadtxt, \
-                               gradient
+                               gradient, linspace, where, ndarray, save, load, \
+                               array_equal
+from fenics             import MPI, mpi_comm_world
 from scipy.io           import loadmat, netcdf_file
 from netCDF4            import Dataset
 from scipy.interpolate  import griddata
 from pyproj             import Proj, transform
 from cslvr.inputoutput  import print_text
 
+
+def cache_dataset(*sources):
+  """
+  Decorator of the getters of :class:`DataFactory` storing the dictionary 
+  returned for the whole raster in the ``cache`` subdirectory of the data
+  directory, one ``.npy`` file per array.  The cache is keyed by the name 
+  and arguments of the getter, except ``bounds``, and the paths and 
+  modification times of the files ``sources``, given relative to the data
+  directory; a directory stands for all of its files.  Later calls with the
+  same key memory-map the arrays, copy-on-write, and crop them to 
+  ``bounds`` with :func:`DataFactory.crop`, instead of reading and 
+  processing the source data.  
+
+  Under MPI, the decision to use the cache is taken by the first process,
+  which alone writes it, so that every process either loads it or falls
+  through to the getter together.  Entries made stale by a change of the 
+  source files are removed when the new entry is written, and 
+  :func:`DataFactory.clear_cache` removes the rest.  The cache is not used
+  if ``DataFactory.use_cache`` is False.
+  """
+  def decorator(getter):
+    @wraps(getter)
+    def cached_getter(*args, **kwargs):
+      if not DataFactory.use_cache:
+        return getter(*args, **kwargs)
+
+      stamp = []
+      for src in sources:
+        path = os.path.join(home, src)
+        if os.path.isdir(path):
+          files = sorted(os.path.join(path, f) for f in os.listdir(path))
+        else:
+          files = [path]
+        for f in files:
+          if os.path.isfile(f):
+            stamp.append((os.path.abspath(f), os.path.getmtime(f)))
+
+      call   = inspect.getcallargs(getter, *args, **kwargs)
+      bounds = call.pop('bounds', None)
+      call   = sorted(call.items())
+      name   = getter.__name__ + '_' + sha1(repr(call)).hexdigest()[:16]
+      direc  = os.path.join(home, 'cache', 
+                            name + '_' + sha1(repr(stamp)).hexdigest()[:16])
+
+      comm   = mpi_comm_world()
+      rank   = MPI.rank(comm)
+      hit    = MPI.max(comm, float(rank == 0 and os.path.isdir(direc)))
+
+      if hit == 0:
+        # the first process reads the whole raster and caches it :
+        if rank == 0:
+          vara = getter(**dict(call, bounds=None))
+          DataFactory.save_cache(vara, direc, stale=name + '_')
+        MPI.barrier(comm)
+        if not os.path.isdir(direc):
+          if rank == 0:
+            return DataFactory.crop(vara, bounds)
+          return getter(**dict(call, bounds=bounds))
+      
+      s = "::: loading cached %s data from DataFactory :::" % getter.__name__
+      print_text(s, DataFactory.color)
+      return DataFactory.crop(DataFactory.load_cache(direc), bounds)
+    return cached_getter
+  return decorator
+
+
+def read_netcdf(filename, name, index, netcdf4=True):
+  """
+  Return the array of the ``index`` of the variable ``name`` of the netCDF
+  file ``filename``, opened with :class:`~netCDF4.Dataset` if ``netcdf4`` is
+  True, and :class:`~scipy.io.netcdf_file` otherwise.  The file is opened
+  and closed here, so that each worker of 
+  :func:`DataFactory.read_concurrently` uses its own handle.
+  """
+  if netcdf4:
+    data = Dataset(filename, mode = 'r')
+  else:
+    data = netcdf_file(filename, mode = 'r', mmap = False)
+  try:
+    return array(data.variables[name][index])
+  finally:
+    data.close()
+
+
+def mpi_initialized():
+  """
+  Return True if this program was started by an MPI launcher or MPI has 
+  been initialized through :mod:`mpi4py`, without initializing it.
+  """
+  launched = ['OMPI_COMM_WORLD_SIZE', 'PMI_SIZE', 'PMIX_RANK', 
+              'MPI_LOCALNRANKS', 'SLURM_NTASKS']
+  if any(v in os.environ for v in launched):
+    return True
+  mpi4py_MPI = sys.modules.get('mpi4py.MPI')
+  return mpi4py_MPI is not None and bool(mpi4py_MPI.Is_initialized())
+
+
+def apply_args(fn_args):
+  """
+  Return ``fn(*args)`` for the pair ``fn_args`` = ``(fn, args)``.
+  """
+  return fn_args[0](*fn_args[1])
+
+
 class DataFactory(object):
   """
   This class contains several static methods that fetch and return raw data
@@ -32,7 +145,10 @@ class DataFactory(object):
   * ``continent``          -- the continent of the datset
   """
 
-  color = '229'
+  color       = '229'
+  use_cache   = True   # store the data returned in the data directory
+  num_workers = 4      # number of files or variables read concurrently
+  safe_margin = 30     # grid cells read around a partition for cubic splines
   global home 
   filename = inspect.getframeinfo(inspect.currentframe()).filename
   home     = os.path.dirname(os.path.abspath(filename)) + '/../data'
@@ -50,9 +166,342 @@ class DataFactory(object):
       else:
         print "\n"
 
+  @staticmethod
+  def save_cache(vara, direc, stale=None):
+    """
+    Save the data dictionary ``vara`` to the new directory ``direc``, each
+    array to its own ``.npy`` file and the remaining entries to 
+    ``meta.pkl``.  The directory is written under a temporary name and 
+    renamed when complete, so that interrupted runs never leave a partial 
+    cache.  The other entries of the cache whose names begin with ``stale``
+    are then removed.  If it cannot be written, a warning is printed and 
+    the data is not cached.
+
+    :param vara: data dictionary returned by the getters of this class
+    :param direc: directory to create
+    :param stale: prefix of the entries superseded by this one
+    :type vara: dict
+    :type direc: string
+    :type stale: string
+    """
+    tmp = direc + '.tmp%i' % os.getpid()
+    try:
+      os.makedirs(tmp)
+      meta = {}
+      for n, f in vara.items():
+        if isinstance(f, ndarray):
+          save(os.path.join(tmp, n + '.npy'), f)
+        elif isinstance(f, Proj):
+          meta[n] = ('Proj', f.srs)
+        else:
+          meta[n] = ('value', f)
+      with open(os.path.join(tmp, 'meta.pkl'), 'wb') as fh:
+        pickle.dump(meta, fh, pickle.HIGHEST_PROTOCOL)
+      os.rename(tmp, direc)
+    except (IOError, OSError) as err:
+      s = "    - unable to cache data in %s : %s -" % (direc, err)
+      print_text(s, DataFactory.color)
+      shutil.rmtree(tmp, ignore_errors=True)
+      return
+    if stale is not None:
+      cache = os.path.dirname(direc)
+      for d in os.listdir(cache):
+        if d.startswith(stale) and os.path.join(cache, d) != direc:
+          shutil.rmtree(os.path.join(cache, d), ignore_errors=True)
+
+  @staticmethod
+  def clear_cache(getter=None):
+    """
+    Remove the data cached by the getters of this class, or only that of
+    the getter named ``getter``, e.g., ``'get_bedmap2'``, if given.
+
+    :param getter: name of the getter whose cache to remove
+    :type getter: string
+    """
+    cache = os.path.join(home, 'cache')
+    if MPI.rank(mpi_comm_world()) == 0 and os.path.isdir(cache):
+      for d in os.listdir(cache):
+        if getter is None or d.startswith(getter + '_'):
+          s = "::: removing cached data %s :::" % d
+          print_text(s, DataFactory.color)
+          shutil.rmtree(os.path.join(cache, d), ignore_errors=True)
+    MPI.barrier(mpi_comm_world())
 
   @staticmethod
-  def get_ant_measures(res = 450):
+  def crop(vara, bounds):
+    """
+    Return the data dictionary ``vara`` with each of its rasters cropped 
+    to the box ``bounds``, as read by its getter with the same ``bounds``
+    using :func:`get_window`, and its extents set accordingly.  If 
+    ``bounds`` is None, ``vara`` is returned unchanged.
+
+    :param vara: data dictionary returned by the getters of this class
+    :param bounds: box ``(west, south, east, north[, margin])`` to cover
+    :type vara: dict
+    :type bounds: tuple
+    :rtype: dict
+    """
+    if bounds is None:
+      return vara
+    nx, ny     = vara['nx'], vara['ny']
+    x          = linspace(vara['map_western_edge'],  
+                          vara['map_eastern_edge'],  nx)
+    y          = linspace(vara['map_southern_edge'], 
+                          vara['map_northern_edge'], ny)
+    rows, cols = DataFactory.get_window(x, y, bounds)
+    vara       = dict(vara)
+    for n, f in vara.items():
+      if isinstance(f, ndarray) and f.shape == (ny, nx):
+        vara[n] = f[rows, cols]
+    DataFactory.set_extents(vara, x[cols], y[rows])
+    return vara
+
+  @staticmethod
+  def load_cache(direc):
+    """
+    Return the data dictionary saved by :func:`save_cache` in ``direc``, 
+    with its arrays memory-mapped copy-on-write, so that they are read from
+    disk only when used and may be modified without altering the cache.
+
+    :param direc: directory to load
+    :type direc: string
+    :rtype: dict
+    """
+    with open(os.path.join(direc, 'meta.pkl'), 'rb') as fh:
+      meta = pickle.load(fh)
+    vara = dict()
+    for n, (kind, f) in meta.items():
+      if kind == 'Proj':
+        vara[n] = Proj(f)
+      else:
+        vara[n] = f
+    for fn in os.listdir(direc):
+      if fn.endswith('.npy'):
+        vara[fn[:-4]] = load(os.path.join(direc, fn), mmap_mode='c')
+    return vara
+
+  @staticmethod
+  def read_concurrently(fn, args, processes=False):
+    """
+    Return the list of ``fn(*a)`` for each tuple of arguments ``a`` in 
+    ``args``, evaluated by ``DataFactory.num_workers`` concurrent workers, so
+    that reading and decompressing several files or variables is limited by
+    the bandwidth of the storage rather than a single thread.  
+
+    Threads are used unless ``processes`` is True, in which case ``fn`` and 
+    ``args`` must be picklable; readers of netCDF or HDF5 files, whose 
+    libraries are not thread-safe, must use processes.  As processes must 
+    not be forked once MPI is initialized, and each process of an MPI run 
+    already reads its own data, the reads are made one after the other 
+    whenever :func:`mpi_initialized` is True.
+
+    :param fn: function reading one array
+    :param args: list of argument tuples of ``fn``
+    :param processes: use a pool of processes rather than threads
+    :type fn: function
+    :type args: list
+    :type processes: bool
+    :rtype: list
+    """
+    n = min(DataFactory.num_workers, len(args))
+    if n <= 1 or mpi_initialized():
+      return [fn(*a) for a in args]
+    if processes:
+      pool = Pool(n)
+    else:
+      pool = ThreadPool(n)
+    try:
+      return pool.map(apply_args, [(fn, a) for a in args])
+    finally:
+      pool.close()
+      pool.join()
+
+  @staticmethod
+  def get_bounds(mesh, halo=0.0, local=False, margin=None):
+    """
+    Return the bounding box ``(west, south, east, north, margin)`` of the 
+    :math:`x` and :math:`y` coordinates of ``mesh``, enlarged by ``halo`` on
+    every side, for use as the ``bounds`` parameter of the getters of this
+    class, which read ``margin`` extra grid cells around it.  The mesh must
+    be in the projection of the data.
+    
+    If ``local`` is False, the box covers the mesh over all processes, and
+    ``margin`` is one cell if not given.  If ``local`` is True, it covers 
+    only the partition of this process, so that under MPI each process 
+    reads just the raster window it needs, and ``margin`` is at least 
+    ``DataFactory.safe_margin`` = 30 cells.  The values interpolated to the 
+    owned degrees of freedom are then those of the serial path: exactly for
+    nearest-neighbor and linear interpolation, and to round-off for cubic 
+    splines, as the influence of the data on the interpolating spline has 
+    decayed below machine precision 30 cells away.
+
+    :param mesh: the mesh to be covered by the data
+    :param halo: distance to enlarge the box by
+    :param local: cover only the partition of this process
+    :param margin: number of grid cells read beyond the box
+    :type mesh: :class:`~fenics.Mesh`
+    :type halo: float
+    :type local: bool
+    :type margin: int
+    :rtype: tuple
+    """
+    x    = mesh.coordinates()
+    comm = mesh.mpi_comm()
+    b    = [float(x[:,0].min()), float(x[:,1].min()),
+            float(x[:,0].max()), float(x[:,1].max())]
+    if not local:
+      b = [MPI.min(comm, b[0]), MPI.min(comm, b[1]),
+           MPI.max(comm, b[2]), MPI.max(comm, b[3])]
+      if margin is None: margin = 1
+    else:
+      margin = max(margin or 0, DataFactory.safe_margin)
+    return (b[0] - halo, b[1] - halo, b[2] + halo, b[3] + halo, int(margin))
+
+  @staticmethod
+  def get_window(x, y, bounds):
+    """
+    Return the slices of the rows and columns of a raster with column 
+    coordinates ``x`` and row coordinates ``y``, in the order stored, that
+    cover the box ``bounds`` = ``(west, south, east, north[, margin])``, 
+    widened by ``margin`` grid cells on each side, one if not given.  If 
+    ``bounds`` is None, the slices cover the whole raster.
+
+    :param x: column coordinates
+    :param y: row coordinates
+    :param bounds: box to cover
+    :type x: :class:`~numpy.array`
+    :type y: :class:`~numpy.array`
+    :type bounds: tuple
+    :rtype: tuple of the row and column slices
+    """
+    if bounds is None:
+      return slice(0, len(y)), slice(0, len(x))
+
+    west, south, east, north = bounds[:4]
+    m = bounds[4] if len(bounds) > 4 else 1
+
+    def span(c, c_min, c_max):
+      i = where((c >= c_min) & (c <= c_max))[0]
+      if len(i) == 0:
+        s = ">>> DATA DOES NOT COVER THE REQUESTED BOUNDS %s <<<" % (bounds,)
+        print_text(s, 'red', 1)
+        sys.exit(1)
+      return slice(max(i[0] - m, 0), min(i[-1] + m + 1, len(c)))
+
+    return span(y, south, north), span(x, west, east)
+
+  @staticmethod
+  def pad_window(rows, cols, n, shape):
+    """
+    Return the slices ``rows`` and ``cols`` of a raster of ``shape`` 
+    widened by ``n`` cells on each side, as far as the raster extends, 
+    and the slices of the widened window that recover the original.  
+    Stencil operations of radius up to ``n`` applied to the widened window
+    and cropped are thus those applied to the whole raster.
+
+    :param rows: slice of the rows, from :func:`get_window`
+    :param cols: slice of the columns, from :func:`get_window`
+    :param n: number of cells to widen by
+    :param shape: shape of the raster
+    :type rows: slice
+    :type cols: slice
+    :type n: int
+    :type shape: tuple
+    :rtype: tuple of the widened row and column slices and the cropping 
+            row and column slices
+    """
+    r = slice(max(rows.start - n, 0), min(rows.stop + n, shape[0]))
+    c = slice(max(cols.start - n, 0), min(cols.stop + n, shape[1]))
+    return r, c, slice(rows.start - r.start, rows.stop - r.start), \
+                 slice(cols.start - c.start, cols.stop - c.start)
+
+  @staticmethod
+  def check_window(getter, bounds, **kwargs):
+    """
+    Return True if the arrays returned by the getter ``getter`` of this 
+    class, e.g., :func:`get_bedmap2`, called with ``bounds`` are equal to 
+    those read for the whole raster and cropped to ``bounds`` with 
+    :func:`crop`, and print the names of those which are not.  The 
+    remaining arguments ``kwargs`` are passed to ``getter``, and the cache 
+    is not used.
+
+    :param getter: getter of this class to check
+    :param bounds: box ``(west, south, east, north[, margin])`` to read
+    :type getter: function
+    :type bounds: tuple
+    :rtype: bool
+    """
+    use_cache             = DataFactory.use_cache
+    DataFactory.use_cache = False
+    try:
+      win  = getter(bounds=bounds, **kwargs)
+      full = DataFactory.crop(getter(bounds=None, **kwargs), bounds)
+    finally:
+      DataFactory.use_cache = use_cache
+    equal = True
+    for n, f in win.items():
+      if isinstance(f, ndarray) and not array_equal(f, full[n]):
+        s = ">>> WINDOWED AND CROPPED '%s' DIFFER <<<" % n
+        print_text(s, 'red', 1)
+        equal = False
+    return equal
+
+  @staticmethod
+  def set_extents(vara, x, y):
+    """
+    Set the extents ``map_*_edge``, ``nx`` and ``ny`` of the data 
+    dictionary ``vara`` to those of the coordinate vectors ``x`` and ``y`` of
+    its, possibly cropped, rasters.
+
+    :param vara: data dictionary returned by the getters of this class
+    :param x: column coordinates
+    :param y: row coordinates
+    :type vara: dict
+    :type x: :class:`~numpy.array`
+    :type y: :class:`~numpy.array`
+    """
+    vara['map_western_edge']  = float(x.min())
+    vara['map_eastern_edge']  = float(x.max())
+    vara['map_southern_edge'] = float(y.min())
+    vara['map_northern_edge'] = float(y.max())
+    vara['nx']                = len(x)
+    vara['ny']                = len(y)
+
+  @staticmethod
+  def read_tiff(filename, rows=slice(None), cols=slice(None)):
+    """
+    Read the window ``rows``, ``cols`` of the image in the TIFF file 
+    ``filename``.  Uncompressed images are memory-mapped, so that only the 
+    strips or tiles of the window are read from disk; others are read whole
+    and cropped.
+
+    :param filename: TIFF file to read
+    :param rows: slice of the rows to read
+    :param cols: slice of the columns to read
+    :type filename: string
+    :type rows: slice
+    :type cols: slice
+    :rtype: :class:`~numpy.array`
+    """
+    try:
+      d = tifffile.memmap(filename, mode='r')
+    except (AttributeError, ValueError):
+      d = TiffFile(filename).asarray()
+    return array(d[rows, cols])
+
+  @staticmethod
+  def get_tiff_shape(filename):
+    """
+    Return the shape of the image in the TIFF file ``filename`` without 
+    reading it.
+    """
+    return TiffFile(filename).pages[0].shape
+
+
+  @staticmethod
+  @cache_dataset('antarctica/measures/antarctica_ice_velocity_900m_v2.nc',
+                 'antarctica/measures/antarctica_ice_velocity_450m_v2.nc')
+  def get_ant_measures(res = 450, bounds = None):
     """
     `Antarctica Measures <https://nsidc.org/data/docs/measures/nsidc0484_rignot/>`_ surface velocity data.  This function creates a new data field with
     key ``mask`` that is 1 where velocity measurements are present and 
@@ -67,6 +516,9 @@ class DataFactory(object):
 
     :param res: resolution of the data, may be either 450 or 900
     :type res: int
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -85,10 +537,25 @@ class DataFactory(object):
 
     data     = Dataset(direc, mode = 'r')
     vara     = dict()
+    
+    # extents of domain :
+    ny,nx =  data.variables['VX'].shape
+    dx    =  res
+    west  = -2800000.0
+    east  =  west + nx*dx
+    north =  2800000.0
+    south =  north - ny*dx
+
+    # coordinates of the columns, and of the rows in the order stored :
+    x          = linspace(west,  east,  nx)
+    y          = linspace(south, north, ny)[::-1]
+    rows, cols = DataFactory.get_window(x, y, bounds)
   
-    # retrieve data :
-    vx   = array(data.variables['VX'][:])
-    vy   = array(data.variables['VY'][:])
+    # retrieve data, each variable by its own process :
+    vx, vy = DataFactory.read_concurrently(read_netcdf,
+                                           [(direc, 'VX', (rows, cols)),
+                                            (direc, 'VY', (rows, cols))],
+                                           processes=True)
     mask = (vx != 0.0).astype('i')
     
     names = ['vx', 'vy', 'mask']
@@ -96,14 +563,6 @@ class DataFactory(object):
     
     for n in names:
       print_text('      Measures : %-*s key : "%s" '%(30,n,n), '230')
-    
-    # extents of domain :
-    nx,ny =  shape(vx)
-    dx    =  res
-    west  = -2800000.0
-    east  =  west + nx*dx
-    north =  2800000.0
-    south =  north - ny*dx
 
     #projection info :
     proj   = 'stere'
@@ -122,13 +581,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west
-    vara['map_eastern_edge']  = east
-    vara['map_southern_edge'] = south
-    vara['map_northern_edge'] = north
-    vara['nx']                = nx
-    vara['ny']                = ny
     vara['dx']                = dx
+    DataFactory.set_extents(vara, x[cols], y[rows])
     
     # save the data in matlab format :
     vara['dataset']   = 'measures'
@@ -139,7 +593,7 @@ class DataFactory(object):
  
   
   @staticmethod
-  def get_bedmachine(thklim = 0.0):
+  def get_bedmachine(thklim = 0.0, bounds = None):
     """
     Greenland `Bedmachine <http://onlinelibrary.wiley.com/doi/10.1002/2017GL074954/full>`_ geometry. 
     This class creates a new lateral boundary mask with key
@@ -160,46 +614,36 @@ class DataFactory(object):
     
     :param thklim: minimum-allowed ice thickness
     :type thklim: float
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
-    s    = "::: getting Greenland Bedmachine data from DataFactory :::"
-    print_text(s, DataFactory.color)
-    
+    DataFactory.make_bedmachine_cslvr()
+    return DataFactory.read_bedmachine(thklim, bounds)
+
+  @staticmethod
+  def make_bedmachine_cslvr():
+    """
+    Generate the file ``bedmachine_cslvr.nc`` of the cslvr ice mask and the
+    lateral-boundary mask of the whole Bedmachine raster used by 
+    :func:`get_bedmachine`, if not present.  Under MPI, it is written by the
+    first process while the others wait, so this must be called by all 
+    processes.
+    """
     global home
     
     direc = home + '/greenland/bedmachine/'
     filen = 'BedMachineGreenland-2017-09-20.nc'
 
-    data  = Dataset(direc + filen, mode = 'r')
-    vara  = dict()
-    
-    needed_vars = {'surface'   : 'S',
-                   'bed'       : 'B',
-                   'thickness' : 'H',
-                   'mask'      : 'mask_orig'}
-    
-    s    = "    - data-fields collected : python dict key to access -"
-    print_text(s, DataFactory.color)
-    for v in data.variables:
-      try:
-        txt = '"' + needed_vars[v] + '"'
-      except KeyError:
-        txt = ''
-      print_text('      Bedmachine : %-*s key : %s '%(30,v, txt), '230')
-    
-    # retrieve data :
-    S          = array(data.variables['surface'][:])
-    B          = array(data.variables['bed'][:])
-    H          = array(data.variables['thickness'][:])
-    mask_orig  = array(data.variables['mask'][:])
-      
-    try:
-      data_new = Dataset(direc + 'bedmachine_cslvr.nc', 'r')
-    except RuntimeError:
+    # the derived data is generated once, by the first process only :
+    if      not os.path.isfile(direc + 'bedmachine_cslvr.nc') \
+        and MPI.rank(mpi_comm_world()) == 0:
+      data = Dataset(direc + filen, mode = 'r')
       s    = "::: cslvr bedmachine data not present, calculating :::"
       print_text(s, 'red', 1)
-      # format the mask for cslvr :
-      mask = mask_orig.copy(True)
+      # format the mask for cslvr, over the whole raster :
+      mask = array(data.variables['mask'][:])
       mask[mask == 1] = 0
       mask[mask == 2] = 1  # grounded ice
       mask[mask == 3] = 2  # floating ice
@@ -259,17 +703,44 @@ class DataFactory(object):
       data_new.variables['y'][:]        =  data.variables['y'][:]
       data_new.variables['mask'][:]     =  mask
       data_new.variables['lat_mask'][:] =  L
+      data_new.close()
+      data.close()
 
-    mask = array(data_new.variables['mask'][:])
-    L    = array(data_new.variables['lat_mask'][:])
-   
-    # remove the junk data and impose thickness limit :
-    B   = B.copy(True)
-    H[H == data.no_data] = 0.0
-    S[H < thklim] = B[H < thklim] + thklim
-    H[H < thklim] = thklim
-    B             = S - H
-     
+    MPI.barrier(mpi_comm_world())
+
+  @staticmethod
+  @cache_dataset('greenland/bedmachine/BedMachineGreenland-2017-09-20.nc',
+                 'greenland/bedmachine/bedmachine_cslvr.nc')
+  def read_bedmachine(thklim = 0.0, bounds = None):
+    """
+    Return the data of :func:`get_bedmachine`, once ``bedmachine_cslvr.nc``
+    has been generated by :func:`make_bedmachine_cslvr`.
+    """
+    s    = "::: getting Greenland Bedmachine data from DataFactory :::"
+    print_text(s, DataFactory.color)
+    
+    global home
+    
+    direc = home + '/greenland/bedmachine/'
+    filen = 'BedMachineGreenland-2017-09-20.nc'
+
+    data  = Dataset(direc + filen, mode = 'r')
+    vara  = dict()
+    
+    needed_vars = {'surface'   : 'S',
+                   'bed'       : 'B',
+                   'thickness' : 'H',
+                   'mask'      : 'mask_orig'}
+    
+    s    = "    - data-fields collected : python dict key to access -"
+    print_text(s, DataFactory.color)
+    for v in data.variables:
+      try:
+        txt = '"' + needed_vars[v] + '"'
+      except KeyError:
+        txt = ''
+      print_text('      Bedmachine : %-*s key : %s '%(30,v, txt), '230')
+    
     # extents of domain :
     nx    = int(data.ny)
     ny    = int(data.nx)
@@ -279,6 +750,28 @@ class DataFactory(object):
     north = data.ymax
     south = north - ny*dx
 
+    # coordinates of the columns, and of the rows in the order stored :
+    x          = linspace(west,  east,  nx)
+    y          = linspace(south, north, ny)[::-1]
+    rows, cols = DataFactory.get_window(x, y, bounds)
+    
+    # retrieve data :
+    S          = array(data.variables['surface'][rows, cols])
+    B          = array(data.variables['bed'][rows, cols])
+    H          = array(data.variables['thickness'][rows, cols])
+    mask_orig  = array(data.variables['mask'][rows, cols])
+      
+    data_new = Dataset(direc + 'bedmachine_cslvr.nc', 'r')
+    mask = array(data_new.variables['mask'][rows, cols])
+    L    = array(data_new.variables['lat_mask'][rows, cols])
+   
+    # remove the junk data and impose thickness limit :
+    B   = B.copy(True)
+    H[H == data.no_data] = 0.0
+    S[H < thklim] = B[H < thklim] + thklim
+    H[H < thklim] = thklim
+    B             = S - H
+
     #projection info :
     proj   = 'stere'
     lat_0  = '90'
@@ -300,13 +793,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = nx
-    vara['ny']                = ny
     vara['dx']                = dx
+    DataFactory.set_extents(vara, x[cols], y[rows])
     
     names = ['S', 'B', 'H', 'mask_orig', 'mask', 'lat_mask']
     ftns  = [ S,   B,   H,   mask_orig,   mask,   L        ]
@@ -324,7 +812,8 @@ class DataFactory(object):
   
   
   @staticmethod
-  def get_gre_measures():
+  @cache_dataset('greenland/measures')
+  def get_gre_measures(bounds = None):
     """
     `Greenland Measures <https://nsidc.org/data/NSIDC-0478/versions/2#>`_ 
     surface velocity data.  This function creates a new data field with 
@@ -339,6 +828,9 @@ class DataFactory(object):
     * ``ey``  -- :math:`y`-component of velocity error
     * ``mask`` -- observation mask
     
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -354,13 +846,34 @@ class DataFactory(object):
     files    = ['mask', 'vx_v2', 'vy_v2']#, '_ex_v2', '_ey_v2']
     vara     = dict()
     
-    d    = TiffFile(direc + 'vx_v2.tif')
-    mask = (d.asarray() != -2e9).astype('i')
-    
-    ftns = [mask]
+    # extents of domain :
+    ny,nx       =  DataFactory.get_tiff_shape(direc + 'vx_v2.tif')
+    dx          = 500
+    lon_min     = -75.0
+    lon_max     = -14.0
+    lat_min     =  60.0
+    lat_max     =  83.0
+
+    # old v1 values :
+    # FIXME: no projection extents provided, only longitude ranges which 
+    #        do not mach the data.  What a fucking disappointment.
+    west  = -645000.0
+    east  =  west  + nx*dx
+    south = -3370000.0 
+    north =  south + ny*dx
+
+    # coordinates of the columns, and of the rows in the order stored :
+    x          = linspace(west,  east,  nx)
+    y          = linspace(south, north, ny)[::-1]
+    rows, cols = DataFactory.get_window(x, y, bounds)
+    
+    # read and decode the files concurrently :
+    ftns = DataFactory.read_concurrently(DataFactory.read_tiff,
+                                         [(direc + n + '.tif', rows, cols)
+                                          for n in files[1:]])
+    mask = (ftns[0] != -2e9).astype('i')
+    ftns = [mask] + ftns
     for n in files[1:]:
-      data    = TiffFile(direc + n + '.tif')
-      ftns.append(data.asarray())
       print_text('      Measures : %-*s key : "%s" '%(30,n,n), '230')
     print_text('      Measures : %-*s key : "%s"'%(30,files[0],files[0]), '230')
 
@@ -378,32 +891,11 @@ class DataFactory(object):
            + " +k=1 +x_0=0 +y_0=0 +no_defs +a=6378137 +rf=298.257223563" \
            + " +towgs84=0.000,0.000,0.000 +to_meter=1"
     p    = Proj(txt)
-     
-    # extents of domain :
-    ny,nx       =  shape(d.asarray())
-    dx          = 500
-    lon_min     = -75.0
-    lon_max     = -14.0
-    lat_min     =  60.0
-    lat_max     =  83.0
-
-    # old v1 values :
-    # FIXME: no projection extents provided, only longitude ranges which 
-    #        do not mach the data.  What a fucking disappointment.
-    west  = -645000.0
-    east  =  west  + nx*dx
-    south = -3370000.0 
-    north =  south + ny*dx
     
     # set up a dictionary for use with cslvr::DataInput class :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west
-    vara['map_eastern_edge']  = east
-    vara['map_southern_edge'] = south
-    vara['map_northern_edge'] = north
-    vara['nx']                = nx
-    vara['ny']                = ny
     vara['dx']                = dx
+    DataFactory.set_extents(vara, x[cols], y[rows])
     
     # retrieve data :
     vara['dataset']   = 'measures'
@@ -414,7 +906,8 @@ class DataFactory(object):
  
   
   @staticmethod
-  def get_rignot():
+  @cache_dataset('greenland/rignot/velocity_greenland_v4Aug2014.nc')
+  def get_rignot(bounds = None):
     """
     Greenland `Rignot <http://www.ess.uci.edu/group/erignot/data/ice-flow-greenland-international-polar-year-2008%E2%80%932009>`_ surface velocity data. 
     This function creates a new data field with key ``mask`` that is 1 where
@@ -427,6 +920,9 @@ class DataFactory(object):
     * ``v_err``  -- velocity error
     * ``mask`` -- observation mask
     
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -452,20 +948,25 @@ class DataFactory(object):
         txt = ''
       print_text('      Rignot : %-*s key : %s '%(30,v, txt), '230')
     
-    # retrieve data :
-    vx   = array(data.variables['vx'][:])
-    vy   = array(data.variables['vy'][:])
-    err  = array(data.variables['err'][:])
-    mask = (vx != 0.0).astype('i')
-     
     # extents of domain :
-    ny,nx =  shape(vx)
+    ny,nx =  data.variables['vx'].shape
     dx    =  150
     west  = -638000.0
     east  =  west + nx*dx
     north = -657600.0
     south =  north - ny*dx
 
+    # coordinates of the columns, and of the rows in the order stored :
+    x          = linspace(west,  east,  nx)
+    y          = linspace(south, north, ny)[::-1]
+    rows, cols = DataFactory.get_window(x, y, bounds)
+    
+    # retrieve data :
+    vx   = array(data.variables['vx'][rows, cols])
+    vy   = array(data.variables['vy'][rows, cols])
+    err  = array(data.variables['err'][rows, cols])
+    mask = (vx != 0.0).astype('i')
+
     #projection info :
     proj   = 'stere'
     lat_0  = '90'
@@ -483,13 +984,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = nx
-    vara['ny']                = ny
     vara['dx']                = dx
+    DataFactory.set_extents(vara, x[cols], y[rows])
     
     names = ['vx', 'vy', 'v_err', 'mask']
     ftns  = [ vx,   vy,   err,     mask ]
@@ -505,7 +1001,8 @@ class DataFactory(object):
     
   
   @staticmethod
-  def get_gre_qgeo_fox_maule():
+  @cache_dataset('greenland/fox_maule/Greenland_heat_flux_5km.nc')
+  def get_gre_qgeo_fox_maule(bounds = None):
     """
     Greenland `Fox Maule <http://websrv.cs.umt.edu/isis/index.php/Greenland_Basal_Heat_Flux>`_ geothermal-heat-flux data.  This function converts the 
     geothermal-heat flux data from J s\ :sup:`-1` m\ :sup:`-2` to that used 
@@ -515,6 +1012,9 @@ class DataFactory(object):
      
     * ``q_geo`` -- geothermal-heat flux
     
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -525,15 +1025,11 @@ class DataFactory(object):
     vara  = dict()
     
     # retrieve data :
-    x     = array(data.variables['x1'][:])
-    y     = array(data.variables['y1'][:])
-    q_geo = array(data.variables['bheatflx'][:][0]) * 60 * 60 * 24 * 365
- 
-    # extents of domain :
-    east  = max(x)
-    west  = min(x)
-    north = max(y)
-    south = min(y)
+    x          = array(data.variables['x1'][:])
+    y          = array(data.variables['y1'][:])
+    rows, cols = DataFactory.get_window(x, y, bounds)
+    q_geo      = array(data.variables['bheatflx'][0, rows, cols]) \
+                 * 60 * 60 * 24 * 365
 
     #projection info :
     proj   = 'stere'
@@ -552,13 +1048,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = len(x)
-    vara['ny']                = len(y)
     vara['dx']                = 5000.0
+    DataFactory.set_extents(vara, x[cols], y[rows])
  
     vara['dataset']   = 'Fox Maule'
     vara['continent'] = 'greenland'
@@ -567,7 +1058,8 @@ class DataFactory(object):
 
 
   @staticmethod
-  def get_bedmap1(thklim = 0.0):
+  @cache_dataset('antarctica/bedmap1/ALBMAPv1.nc')
+  def get_bedmap1(thklim = 0.0, bounds = None):
     """
     Antarctica `Bedmap 1 <https://doi.pangaea.de/10.1594/PANGAEA.734145>`_
     data.  This function converts the geothermal-heat flux data from 
@@ -588,6 +1080,9 @@ class DataFactory(object):
     
     :param thklim: minimum-allowed ice thickness
     :type thklim: float
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -621,14 +1116,15 @@ class DataFactory(object):
     # retrieve data :
     x       = array(data.variables['x1'][:])
     y       = array(data.variables['y1'][:])
-    b       = array(data.variables['lsrf'][:])
-    h       = array(data.variables['usrf'][:])
-    adota   = array(data.variables['acca'][:])
-    adotr   = array(data.variables['accr'][:])
-    mask    = array(data.variables['mask'][:])
-    srfTemp = array(data.variables['temp'][:]) + 273.15
-    q_geo_f = array(data.variables['ghffm'][:]) * 60 * 60 * 24 * 365 / 1000
-    q_geo_s = array(data.variables['ghfsr'][:]) * 60 * 60 * 24 * 365 / 1000
+    r, c    = DataFactory.get_window(x, y, bounds)
+    b       = array(data.variables['lsrf'][r, c])
+    h       = array(data.variables['usrf'][r, c])
+    adota   = array(data.variables['acca'][r, c])
+    adotr   = array(data.variables['accr'][r, c])
+    mask    = array(data.variables['mask'][r, c])
+    srfTemp = array(data.variables['temp'][r, c]) + 273.15
+    q_geo_f = array(data.variables['ghffm'][r, c]) * 60 * 60 * 24 * 365 / 1000
+    q_geo_s = array(data.variables['ghfsr'][r, c]) * 60 * 60 * 24 * 365 / 1000
 
     H             = h - b
     h[H < thklim] = b[H < thklim] + thklim
@@ -639,12 +1135,6 @@ class DataFactory(object):
     
     names = ['B','S','H','acca','accr','ghffm','ghfsr','temp']
     ftns  = [b, h, H, adota, adotr, q_geo_f, q_geo_s, srfTemp]
-    
-    # extents of domain :
-    east    = max(x)
-    west    = min(x)
-    north   = max(y)
-    south   = min(y)
 
     #projection info :
     proj   = 'stere'
@@ -665,20 +1155,16 @@ class DataFactory(object):
     vara['dataset']           = 'bedmap 1'
     vara['continent']         = 'antarctica'
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = len(x)
-    vara['ny']                = len(y)
     vara['dx']                = 5000.0
+    DataFactory.set_extents(vara, x[c], y[r])
     for n, f in zip(names, ftns):
       vara[n] = f
     return vara 
   
   
   @staticmethod
-  def get_bedmap2(thklim = 0.0):
+  @cache_dataset('antarctica/bedmap2/bedmap2_tiff')
+  def get_bedmap2(thklim = 0.0, bounds = None):
     """
     Antarctica `Bedmap 2 <https://www.bas.ac.uk/project/bedmap-2/>`_
     topography data.  This class creates a new lateral boundary mask with key
@@ -701,6 +1187,9 @@ class DataFactory(object):
    
     :param thklim: minimum-allowed ice thickness
     :type thklim: float
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -709,30 +1198,48 @@ class DataFactory(object):
 
     global home
     direc    = home + '/antarctica/bedmap2/bedmap2_tiff/' 
+     
+    # extents of domain :
+    nx    =  6667
+    ny    =  6667
+    dx    =  1000
+    west  = -3333500.0
+    east  =  3333500.0
+    north =  3333500.0
+    south = -3333500.0
+
+    # coordinates of the columns, and of the rows in the order stored :
+    x          = linspace(west,  east,  nx)
+    y          = linspace(south, north, ny)[::-1]
+    rows, cols = DataFactory.get_window(x, y, bounds)
+
+    files = ['bedmap2_bed',
+             'bedmap2_surface',
+             'bedmap2_thickness',
+             'bedmap2_icemask_grounded_and_shelves',
+             'bedmap2_rockmask',
+             'bedmap2_grounded_bed_uncertainty',
+             'bedmap2_coverage',
+             'gl04c_geiod_to_WGS84']
    
-    B           = TiffFile(direc + 'bedmap2_bed.tif')
-    S           = TiffFile(direc + 'bedmap2_surface.tif') 
-    H           = TiffFile(direc + 'bedmap2_thickness.tif')
-    mask        = TiffFile(direc + 'bedmap2_icemask_grounded_and_shelves.tif') 
-    rock_mask   = TiffFile(direc + 'bedmap2_rockmask.tif') 
-    b_uncert    = TiffFile(direc + 'bedmap2_grounded_bed_uncertainty.tif') 
-    coverage    = TiffFile(direc + 'bedmap2_coverage.tif')
-    gl04c_WGS84 = TiffFile(direc + 'gl04c_geiod_to_WGS84.tif')
-    
+    # the lateral-boundary mask marks six levels of cells in from the ice 
+    # edge, so the ice mask is read six cells beyond the window :
+    rows_p, cols_p, r_i, c_i = DataFactory.pad_window(rows, cols, 6, 
+                                                      (ny, nx))
+    windows = [(rows, cols)]*len(files)
+    windows[3] = (rows_p, cols_p)
    
-    B           = B.asarray()
-    S           = S.asarray()
-    H           = H.asarray()
-    mask        = mask.asarray()
-    rock_mask   = rock_mask.asarray()
-    b_uncert    = b_uncert.asarray()
-    coverage    = coverage.asarray() 
-    gl04c_WGS84 = gl04c_WGS84.asarray()
+    # read and decode the files concurrently :
+    B, S, H, mask_p, rock_mask, b_uncert, coverage, gl04c_WGS84 = \
+      DataFactory.read_concurrently(DataFactory.read_tiff,
+                                    [(direc + n + '.tif',) + w
+                                     for n, w in zip(files, windows)])
     
     # format the mask for cslvr :
-    mask[mask == 1]   = 2
-    mask[mask == 0]   = 1
-    mask[mask == 127] = 0
+    mask_p[mask_p == 1]   = 2
+    mask_p[mask_p == 0]   = 1
+    mask_p[mask_p == 127] = 0
+    mask = mask_p[r_i, c_i]
     
     # remove the junk data and impose thickness limit :
     B = S - H
@@ -741,8 +1248,8 @@ class DataFactory(object):
     S = B + H
     
     # generate mask for lateral boundaries :
-    Hc = mask.copy(True)
-    Hc[mask > 0] = 1
+    Hc = mask_p.copy(True)
+    Hc[mask_p > 0] = 1
     
     # calculate mask gradient, to properly mark lateral boundaries :
     gradH = gradient(Hc)
@@ -796,17 +1303,9 @@ class DataFactory(object):
     L[L4 > 0.0] = 1.0
     L[L5 > 0.0] = 1.0
     L[L6 > 0.0] = 1.0
+    L = L[r_i, c_i]
     
     vara        = dict()
-     
-    # extents of domain :
-    nx    =  6667
-    ny    =  6667
-    dx    =  1000
-    west  = -3333500.0
-    east  =  3333500.0
-    north =  3333500.0
-    south = -3333500.0
 
     #projection info :
     proj   = 'stere'
@@ -825,13 +1324,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = nx
-    vara['ny']                = ny
     vara['dx']                = dx
+    DataFactory.set_extents(vara, x[cols], y[rows])
     
     names = ['B', 'S', 'H', 'mask', 'lat_mask', 'rock_mask', 'b_uncert', 
              'coverage', 'gl04c_WGS84']
@@ -849,7 +1343,8 @@ class DataFactory(object):
 
   
   @staticmethod
-  def get_bamber(thklim = 0.0):
+  @cache_dataset('greenland/bamber13/Greenland_bedrock_topography_V2.nc')
+  def get_bamber(thklim = 0.0, bounds = None):
     """
     Greenland `Bamber <https://nsidc.org/data/NSIDC-0092>`_ topography data.
     This class creates a new lateral boundary mask with key
@@ -871,6 +1366,9 @@ class DataFactory(object):
     
     :param thklim: minimum-allowed ice thickness
     :type thklim: float
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
 
@@ -901,21 +1399,28 @@ class DataFactory(object):
     # retrieve data :
     x         = array(data.variables['projection_x_coordinate'][:])
     y         = array(data.variables['projection_y_coordinate'][:])
-    Bo        = array(data.variables['BedrockElevation'][:])
-    S         = array(data.variables['SurfaceElevation'][:])
-    H         = array(data.variables['IceThickness'][:])
-    Herr      = array(data.variables['BedrockError'][:])
-    mask_orig = array(data.variables['LandMask'][:])
+    r, c      = DataFactory.get_window(x, y, bounds)
+    Bo        = array(data.variables['BedrockElevation'][r, c])
+    S         = array(data.variables['SurfaceElevation'][r, c])
+    H         = array(data.variables['IceThickness'][r, c])
+    Herr      = array(data.variables['BedrockError'][r, c])
+
+    # the lateral-boundary mask marks two levels of cells in from the ice 
+    # edge, so the land mask is read two cells beyond the window :
+    r_p, c_p, r_i, c_i = DataFactory.pad_window(r, c, 2, (len(y), len(x)))
+    mask_p    = array(data.variables['LandMask'][r_p, c_p])
+    mask_orig = mask_p[r_i, c_i]
 
     # format the mask for cslvr :
-    mask = mask_orig.copy(True)
-    mask[mask == 1] = 0
-    mask[mask == 2] = 1  # grounded ice
-    mask[mask == 3] = 0
-    mask[mask == 4] = 2  # ice shelves
+    mask_p = mask_p.copy(True)
+    mask_p[mask_p == 1] = 0
+    mask_p[mask_p == 2] = 1  # grounded ice
+    mask_p[mask_p == 3] = 0
+    mask_p[mask_p == 4] = 2  # ice shelves
+    mask = mask_p[r_i, c_i]
                
     # generate  mask for lateral boundaries :
-    Hc = mask.copy(True)
+    Hc = mask_p.copy(True)
     
     # calculate mask gradient, to properly mark lateral boundaries :
     gradH = gradient(Hc)
@@ -933,6 +1438,7 @@ class DataFactory(object):
     
     # combine them :
     L[L2 > 0.0] = 1.0
+    L = L[r_i, c_i]
    
     # remove the junk data and impose thickness limit :
     B   = Bo.copy(True)
@@ -941,12 +1447,6 @@ class DataFactory(object):
     H[H < thklim] = thklim
     B             = S - H
 
-    # extents of domain :
-    east  = max(x)
-    west  = min(x)
-    north = max(y)
-    south = min(y)
-
     #projection info :
     proj   = 'stere'
     lat_0  = '90'
@@ -964,14 +1464,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['dx']                = dx
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = len(x)
-    vara['ny']                = len(y)
     vara['dx']                = 1000.0
+    DataFactory.set_extents(vara, x[c], y[r])
      
     names = ['B', 'Bo', 'S', 'H', 'lat_mask', 'Herr', 'mask', 'mask_orig']
     ftns  = [ B,   Bo,   S,   H,   L,          Herr,   mask,   mask_orig]
@@ -985,7 +1479,8 @@ class DataFactory(object):
   
   
   @staticmethod
-  def get_searise(thklim = 0.0):
+  @cache_dataset('greenland/searise/Greenland_5km_dev1.2.nc')
+  def get_searise(thklim = 0.0, bounds = None):
     """
     Greenland `Searise <http://websrv.cs.umt.edu/isis/index.php/Present_Day_Greenland>`_ data.
 
@@ -1003,6 +1498,11 @@ class DataFactory(object):
     * ``dhdt`` -- suface height rate of change
     * ``U_sar`` -- surface velocity magnitude 
     
+    :param thklim: minimum-allowed ice thickness
+    :type thklim: float
+    :param bounds: box ``(west, south, east, north[, margin])`` to read, 
+                   e.g., from :func:`get_bounds`; the whole raster if None
+    :type bounds: tuple
     :rtype: dict
     """
     
@@ -1038,25 +1538,21 @@ class DataFactory(object):
     # retrieve data :
     x     = array(data.variables['x1'][:])
     y     = array(data.variables['y1'][:])
-    S     = array(data.variables['usrf'][:][0])
-    adot  = array(data.variables['smb'][:][0])
-    B     = array(data.variables['topg'][:][0])
-    T     = array(data.variables['surftemp'][:][0]) + 273.15
-    q_geo = array(data.variables['bheatflx'][:][0]) * 60 * 60 * 24 * 365
-    lat   = array(data.variables['lat'][:][0])
-    lon   = array(data.variables['lon'][:][0])
-    U_sar = array(data.variables['surfvelmag'][:][0])
-    dhdt  = array(data.variables['dhdt'][:][0])
+    r, c  = DataFactory.get_window(x, y, bounds)
+
+    # each variable is read by its own process :
+    names = ['usrf', 'smb', 'topg', 'surftemp', 'bheatflx', 'lat', 'lon',
+             'surfvelmag', 'dhdt']
+    S, adot, B, T, q_geo, lat, lon, U_sar, dhdt = \
+      DataFactory.read_concurrently(read_netcdf,
+                                    [(direc, n, (0, r, c), False)
+                                     for n in names], processes=True)
+    T     = T + 273.15
+    q_geo = q_geo * 60 * 60 * 24 * 365
  
     H             = S - B
     S[H < thklim] = B[H < thklim] + thklim
 
-    # extents of domain :
-    east  = max(x)
-    west  = min(x)
-    north = max(y)
-    south = min(y)
-
     #projection info :
     proj   = 'stere'
     lat_0  = '90'
@@ -1074,13 +1570,8 @@ class DataFactory(object):
     
     # save the data in matlab format :
     vara['pyproj_Proj']       = p
-    vara['map_western_edge']  = west 
-    vara['map_eastern_edge']  = east 
-    vara['map_southern_edge'] = south 
-    vara['map_northern_edge'] = north
-    vara['nx']                = len(x)
-    vara['ny']                = len(y)
     vara['dx']                = 5000.0
+    DataFactory.set_extents(vara, x[c], y[r])
  
     names = ['S', 'adot', 'B', 'T', 'q_geo','U_sar', \
              'lat', 'lon', 'dhdt']
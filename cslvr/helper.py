@@ -1,6 +1,7 @@
 import inspect
 import pylab                 as pl
 import numpy                 as np
+import scipy.sparse          as sparse
 from pylab                   import plt
 from fenics                  import *
 from ufl                     import indexed
@@ -12,6 +13,7 @@ from matplotlib.ticker       import LogFormatter, ScalarFormatter
 from pyproj                  import *
 from mpl_toolkits.axes_grid1 import make_axes_locatable, inset_locator
 from cslvr.inputoutput       import print_text, DataInput
+from cslvr.meshing           import MeshExtruder, write_mesh_hdf5
 
 def raiseNotDefined():
   fileName = inspect.stack()[1][1]
@@ -199,38 +201,24 @@ class IsotropicMeshRefiner(object):
     self.mesh = refine(mesh, cell_markers)
     self.U    = U
 
-  def extrude(self, n_layers, workspace_path="", n_processors = 1):
+  def extrude(self, n_layers, workspace_path=None, n_processors=None,
+              filename=None):
     """
-    This function writes the refinements to the mesh to msh files and
-    extrudes the mesh
+    Extrudes the refined mesh over unit height in ``n_layers + 1`` layers 
+    of cells with :func:`extrude_mesh`, in memory.
 
     Args:
     
-     :n_layers:       Number of layers in the mesh
-     :workspace_path: Path to the location where the refined meshes
-                      will be written
-     :n_processors:   Number of processers utilized in the extrusion
+      :n_layers:       Number of interior layers of vertices in the mesh
+      :workspace_path: Deprecated; if given, the extruded mesh is also 
+                       saved to ``workspace_path``/3dmesh.xml, as before
+      :n_processors:   Deprecated and ignored, as gmsh is no longer run
+      :filename:       Optional HDF5 file to save the extruded mesh to
 
+    :rtype: the extruded 3D :class:`~fenics.Mesh`
     """
-    import os
-    layers = str(n_layers + 1)
-
-    write_gmsh(self.mesh, workspace_path + "/2dmesh.msh")
-
-    output = open(workspace_path + "/2dmesh.geo", 'w')
-
-    output.write("Merge \"2dmesh.msh\";\n")
-    output.write("Extrude {0,0,1} {Surface{0}; Layers{" + layers + "};}")
-    output.close()
-    print "Extruding mesh (This could take a while)."
-
-    string = "mpirun -np {0:d} gmsh " + workspace_path + "/2dmesh.geo -3 -o " \
-             + workspace_path + "/3dmesh.msh -format msh -v 0"
-    os.system(string.format(n_processors))
-
-    string = "dolfin-convert " + workspace_path + "/3dmesh.msh " \
-             + workspace_path + "/3dmesh.xml"
-    os.system(string)
+    return extrude_mesh(self.mesh, n_layers, filename, workspace_path,
+                        n_processors)
 
 
 class AnisotropicMeshRefiner(object):
@@ -462,44 +450,93 @@ class AnisotropicMeshRefiner(object):
     refined_mesh.order()
     self.mesh = refined_mesh 
  
-  def extrude(self, n_layers, workspace_path="", n_processors = 1):
+  def extrude(self, n_layers, workspace_path=None, n_processors=None,
+              filename=None):
     """
-    This function writes the refinements to the mesh to msh files and
-    extrudes the mesh
+    Extrudes the refined mesh over unit height in ``n_layers + 1`` layers 
+    of cells with :func:`extrude_mesh`, in memory.
 
     Args:
     
-      :n_layers:       Number of layers in the mesh
-      :workspace_path: Path to the location where the refined meshes
-                       will be written
-      :n_processors:   Number of processers utilized in the extrusion
+      :n_layers:       Number of interior layers of vertices in the mesh
+      :workspace_path: Deprecated; if given, the extruded mesh is also 
+                       saved to ``workspace_path``/3dmesh.xml, as before
+      :n_processors:   Deprecated and ignored, as gmsh is no longer run
+      :filename:       Optional HDF5 file to save the extruded mesh to
 
+    :rtype: the extruded 3D :class:`~fenics.Mesh`
     """
-    import os
-    layers = str(n_layers + 1)
+    return extrude_mesh(self.mesh, n_layers, filename, workspace_path,
+                        n_processors)
 
-    write_gmsh(self.mesh, workspace_path + "/2dmesh.msh")
 
-    output = open(workspace_path + "/2dmesh.geo", 'w')
+def extrude_mesh(mesh, n_layers, filename=None, workspace_path=None,
+                 n_processors=None):
+  """
+  Extrudes the 2D ``mesh`` over unit height in ``n_layers + 1`` layers of 
+  cells, each prism split into three tetrahedra, with 
+  :class:`~meshing.MeshExtruder`.  This gives the layers of the extrusion 
+  ``Extrude {0,0,1} {Surface{0}; Layers{n_layers + 1};}`` by gmsh, without
+  writing and converting any intermediate files: the same number of 
+  vertices and cells, and the same vertices in each layer, which is 
+  checked, but vertices and cells are numbered layer by layer from the 
+  base rather than in the order of gmsh, and the prisms may be split along
+  different diagonals.
+
+  The arguments ``workspace_path`` and ``n_processors`` of the former gmsh
+  extrusion are deprecated.  If ``workspace_path`` is given, the mesh is 
+  also saved to ``workspace_path``/3dmesh.xml, where gmsh and 
+  dolfin-convert left it; ``n_processors`` is ignored.
 
-    output.write("Merge \"2dmesh.msh\";\n")
-    output.write("Extrude {0,0,1} {Surface{0}; Layers{" + layers + "};}")
-    output.close()
-    print "Extruding mesh (This could take a while)."
+  Args:
 
-    string = "mpirun -np {0:d} gmsh " + workspace_path + "/2dmesh.geo -3 -o " \
-             + workspace_path + "/3dmesh.msh -format msh -v 0"
-    os.system(string.format(n_processors))
+    :mesh:           2D :class:`~fenics.Mesh` to extrude
+    :n_layers:       Number of interior layers of vertices in the mesh
+    :filename:       Optional HDF5 file to save the extruded mesh to, with 
+                     dataset name ``mesh``
+    :workspace_path: Deprecated directory to save 3dmesh.xml to
+    :n_processors:   Deprecated and ignored
 
-    string = "dolfin-convert " + workspace_path + "/3dmesh.msh " \
-             + workspace_path + "/3dmesh.xml"
-    os.system(string)
+  """
+  print_text("::: extruding mesh :::", '242')
+  if workspace_path is not None or n_processors is not None:
+    s = "    - workspace_path and n_processors are deprecated, the mesh is " \
+        "extruded in memory -"
+    print_text(s, 'red')
+
+  extruder = MeshExtruder(mesh)
+  extruder.extrude_mesh(n_layers + 2, 1.0)
+  mesh_3d  = extruder.new_mesh
+
+  # the layers of gmsh : n_layers + 2 copies of the 2D vertices, and three
+  # tetrahedra for each triangle in each layer, spanning just that layer :
+  n_v    = mesh.num_vertices()
+  n_c    = mesh.num_cells()
+  x      = mesh_3d.coordinates()
+  layer  = mesh_3d.cells() // n_v
+  z      = np.linspace(0, 1, n_layers + 2)
+  if      mesh_3d.num_vertices() != n_v * (n_layers + 2) \
+       or mesh_3d.num_cells()    != 3 * n_c * (n_layers + 1) \
+       or not np.allclose(x[:,:2], np.tile(mesh.coordinates()[:,:2],
+                                           (n_layers + 2, 1))) \
+       or not np.allclose(x[:,2], np.repeat(z, n_v)) \
+       or not np.all(layer.max(axis=1) - layer.min(axis=1) == 1):
+    s = ">>> THE EXTRUDED MESH DOES NOT HAVE THE LAYERS OF GMSH <<<"
+    print_text(s, 'red', 1)
+    sys.exit(1)
+
+  if filename is not None:
+    write_mesh_hdf5(mesh_3d, filename)
+  if workspace_path is not None:
+    File(os.path.join(workspace_path, '3dmesh.xml')) << mesh_3d
+  return mesh_3d
 
 
 def write_gmsh(mesh,path):
   """
-  This function iterates through the mesh and writes a file to the specified
-  path
+  This function writes the vertices and the triangles or tetrahedra of the 
+  mesh to a gmsh version 2 ASCII file at the specified path, formatting all
+  of the node and element lines at once.
 
   Args:
   
@@ -507,41 +544,43 @@ def write_gmsh(mesh,path):
     :path: Path to write the mesh file to
 
   """
-  output = open(path,'w')
-  
   cell_type = mesh.type().cell_type()
+  if cell_type == 2:
+    elm_type = 2
+  elif cell_type == 3:
+    elm_type = 4
+  else:
+    print "Unknown cell type"
+    return
 
-  nodes = mesh.coordinates()
+  nodes   = mesh.coordinates()
   n_nodes = mesh.num_vertices()
+  nodes   = np.hstack((nodes, np.zeros((n_nodes, 3 - nodes.shape[1]))))
 
-  nodes = pl.hstack((nodes,pl.zeros((n_nodes,3 - pl.shape(mesh.coordinates())[1]))))
-
-  cells = mesh.cells()
+  cells   = mesh.cells()
   n_cells = mesh.num_cells()
+  n_v     = cells.shape[1]
 
+  output = open(path,'w')
   output.write("$MeshFormat\n" + 
-        "2.2 0 8\n" +
-         "$EndMeshFormat\n" +
-         "$Nodes \n" +
-         "{0:d}\n".format(n_nodes))
+               "2.2 0 8\n" +
+               "$EndMeshFormat\n" +
+               "$Nodes \n" +
+               "{0:d}\n".format(n_nodes))
 
-  for ii,node in enumerate(nodes):
-    output.write("{0:d} {1:g} {2:g} {3:g}\n".format(ii+1,node[0],node[1],node[2]))
+  idx = np.arange(1, n_nodes + 1)
+  np.savetxt(output, np.column_stack((idx, nodes)), 
+             fmt=['%d', '%.16g', '%.16g', '%.16g'])
 
   output.write("$EndNodes\n")
-
   output.write("$Elements\n" + 
-          "{0:d}\n".format(n_cells))
-
-  for ii,cell in enumerate(cells):
-    #if cell_type == 1:
-    #  output.write("{0:d} 1 0 {1:d} {2:d}\n".format(ii+1,int(cell[0]+1),int(cell[1]+1)))
-    if cell_type == 2:
-      output.write("{0:d} 2 0 {1:d} {2:d} {3:d}\n".format(ii+1,int(cell[0]+1),int(cell[1]+1),int(cell[2]+1)))
-    #elif cell_type == 3:
-    #  output.write("{0:d} 4 0 {1:d} {2:d} {3:d} {4:d}\n".format(ii+1,int(cell[0]+1),int(cell[1]+1),int(cell[2]+1),int(cell[3]+1)))
-    else:
-      print "Unknown cell type"
+               "{0:d}\n".format(n_cells))
+
+  elms = np.column_stack((np.arange(1, n_cells + 1),
+                          elm_type * np.ones(n_cells, dtype=int),
+                          np.zeros(n_cells, dtype=int),
+                          cells.astype(int) + 1))
+  np.savetxt(output, elms, fmt='%d')
   
   output.write("$EndElements\n")
   output.close()
@@ -717,6 +756,502 @@ def get_bed_mesh(mesh):
   return submesh
 
 
+def get_exterior_facets(mesh, bmesh=None):
+  """
+  Return arrays describing the exterior facets of ``mesh``, computed without
+  iterating through the facets in Python.  The facets are ordered as the 
+  cells of the exterior boundary mesh ``bmesh``.
+
+  Args:
+
+    :mesh:  simplicial :class:`~fenics.Mesh` of topological dimension 2 or 3,
+            equal to its geometric dimension
+    :bmesh: exterior :class:`~fenics.BoundaryMesh` of ``mesh``, created if 
+            not given
+
+  Returns:
+
+    :rtype: tuple of the arrays of the exterior facet indices, their vertex
+            indices, midpoints, and outward-pointing unit normal vectors
+
+  """
+  D   = mesh.topology().dim()
+  mesh.init(D-1, 0)
+  mesh.init(D,   D-1)
+  x   = mesh.coordinates()
+  fv  = mesh.topology()(D-1, 0)().reshape(-1, D).astype(np.intp)
+  cf  = mesh.topology()(D,   D-1)().reshape(-1, D+1).astype(np.intp)
+  if bmesh is None:
+    bmesh = BoundaryMesh(mesh, 'exterior')
+  ext = bmesh.entity_map(D-1).array().astype(np.intp)
+
+  # the cell adjacent to each facet, unique for the exterior facets :
+  fc             = np.empty(mesh.num_facets(), dtype=np.intp)
+  fc[cf.ravel()] = np.repeat(np.arange(mesh.num_cells()), D+1)
+
+  fv  = fv[ext]
+  p   = x[fv]
+  mid = p.mean(axis=1)
+  if D == 3:
+    n = np.cross(p[:,1] - p[:,0], p[:,2] - p[:,0])
+  elif D == 2:
+    t = p[:,1] - p[:,0]
+    n = np.column_stack((t[:,1], -t[:,0]))
+  n  /= np.sqrt((n**2).sum(axis=1))[:,np.newaxis]
+
+  # orient the normals away from the adjacent cell :
+  c_mid = x[mesh.cells()[fc[ext]]].mean(axis=1)
+  n    *= np.sign(((mid - c_mid) * n).sum(axis=1))[:,np.newaxis]
+  return ext, fv, mid, n
+
+
+def get_horizontal_keys(x, axis=2, tol=1e-9):
+  """
+  Return an integer array of the horizontal coordinates of the rows of the
+  coordinate array ``x``, rounded to ``tol`` relative to the horizontal
+  extent of ``x``, so that points in the same vertical column compare equal.
+
+  Args:
+
+    :x:    array of coordinates
+    :axis: index of the vertical coordinate
+    :tol:  relative tolerance used to match horizontal coordinates
+
+  """
+  h   = np.delete(x, axis, 1)
+  eps = tol * max(np.ptp(h, axis=0).max(), 1.0)
+  return np.round(h / eps).astype(np.int64)
+
+
+def get_unique_columns(x, axis=2, tol=1e-9):
+  """
+  Find the distinct vertical columns of the points of coordinate array ``x``.
+
+  Args:
+
+    :x:    array of coordinates
+    :axis: index of the vertical coordinate
+    :tol:  relative tolerance used to match horizontal coordinates
+
+  Returns:
+
+    :rtype: tuple of the array of indices of one row of ``x`` in each column,
+            and the array of the column of each row of ``x``
+
+  """
+  h   = get_horizontal_keys(x, axis, tol)
+  idx = np.lexsort([h[:,i] for i in range(h.shape[1]-1, -1, -1)])
+  new = np.append(True, np.any(np.diff(h[idx], axis=0) != 0, axis=1))
+  inv = np.empty(len(x), dtype=np.intp)
+  inv[idx] = np.cumsum(new) - 1
+  return idx[new], inv
+
+
+def evaluate_at_points(f, x, default=1.0):
+  """
+  Return the array of values of the scalar ``f`` at each row of the 
+  coordinate array ``x``.  Expressions providing a vectorized 
+  ``eval_array`` method, such as those created by 
+  :func:`~inputoutput.DataInput.get_expression`, are evaluated in a single
+  call; any other is evaluated at each point in turn.  If ``f`` is None, 
+  the constant ``default`` is returned at every point.
+
+  Args:
+
+    :f:       :class:`~fenics.Expression`, :class:`~fenics.Function`, 
+              :class:`~fenics.Constant`, or None
+    :x:       array of coordinates
+    :default: value used where ``f`` is None
+
+  """
+  if f is None:
+    return default * np.ones(len(x))
+  if hasattr(f, 'eval_array'):
+    return f.eval_array(x)
+  v = np.empty(len(x))
+  for i, p in enumerate(x):
+    v[i] = f(*p)
+  return v
+
+
+class VerticalColumns(object):
+  """
+  Index of the vertical columns of a layered mesh, e.g., one extruded with
+  :class:`~meshing.MeshExtruder` or gmsh.  For every vertex of the lower
+  surface, the dofs lying directly above it are recorded in order of
+  increasing height, so that vertical extrusion is a gather and scatter and
+  vertical integration is a cumulative trapezoidal sum over each column.
+
+  The index is only usable if ``self.structured`` is True; i.e., the
+  function space is scalar linear Lagrange without periodic constraints,
+  the mesh is not distributed, and every column starts on a dof of the lower
+  surface and ends on a dof of the upper surface.
+
+  Args:
+
+    :Q:           :class:`~fenics.FunctionSpace` of the columns
+    :ff:          :class:`~fenics.FacetFunction` of boundary markers
+    :bed_markers: list of the markers of ``ff`` on the lower surface
+    :srf_markers: list of the markers of ``ff`` on the upper surface
+    :axis:        index of the vertical coordinate
+    :tol:         relative tolerance used to match horizontal coordinates
+
+  """
+  def __init__(self, Q, ff, bed_markers, srf_markers, axis=2, tol=1e-9):
+    self.Q          = Q
+    self.mesh       = Q.mesh()
+    self.axis       = axis
+    self.structured = False
+
+    e = Q.ufl_element()
+    if    MPI.size(mpi_comm_world()) > 1 \
+       or Q.num_sub_spaces() != 0 \
+       or e.family() != 'Lagrange' or e.degree() != 1 \
+       or Q.dim() != self.mesh.num_vertices():
+      return
+
+    x     = self.mesh.coordinates()
+    z     = x[:,axis]
+    h     = get_horizontal_keys(x, axis, tol)
+
+    # sort the vertices by horizontal position, then by height :
+    keys  = [z] + [h[:,i] for i in range(h.shape[1]-1, -1, -1)]
+    idx   = np.lexsort(keys)
+    new   = np.any(np.diff(h[idx], axis=0) != 0, axis=1)
+    start = np.append(0, np.where(new)[0] + 1)
+    end   = np.append(start[1:], len(idx))
+
+    self.vertices = idx
+    self.dofs     = vertex_to_dof_map(Q)[idx]
+    self.start    = start
+    self.end      = end
+    self.counts   = end - start
+    self.bed_dofs = self.dofs[start]
+    self.srf_dofs = self.dofs[end - 1]
+
+    # the segments joining the top of one column to the bottom of the next :
+    self.jumps    = start[1:] - 1
+
+    def marked_dofs(markers):
+      dofs = []
+      for m in markers:
+        dofs.extend(DirichletBC(Q, 0.0, ff, m).get_boundary_values().keys())
+      return np.unique(np.array(dofs, dtype=np.intc))
+
+    self.structured = bool(    np.all(self.counts > 1) \
+                           and np.all(np.in1d(self.bed_dofs,
+                                              marked_dofs(bed_markers))) \
+                           and np.all(np.in1d(self.srf_dofs,
+                                              marked_dofs(srf_markers))))
+
+  def get_nodal_values(self, u):
+    """
+    Return an array of the values of ``u`` at the dofs of ``self.Q``.
+
+    Args:
+
+      :u: float, :class:`~fenics.Constant`, :class:`~fenics.Expression`,
+          :class:`~fenics.Function`, or UFL expression
+
+    """
+    Q = self.Q
+    if isinstance(u, float) or isinstance(u, int):
+      return u * np.ones(Q.dim())
+    elif isinstance(u, Function) \
+         and u.function_space().ufl_element() == Q.ufl_element() \
+         and u.function_space().mesh().id() == self.mesh.id():
+      return u.vector().array()
+    elif    isinstance(u, Function) or isinstance(u, Expression) \
+         or isinstance(u, Constant):
+      return interpolate(u, Q, annotate=False).vector().array()
+    else:
+      return project(u, Q, annotate=False).vector().array()
+
+  def extrude(self, u, d='up'):
+    """
+    Return the array of dof values of ``u`` extruded from the lower surface
+    if ``d`` = 'up', or the upper surface if ``d`` = 'down'.
+    """
+    if   d == 'up':   b = self.bed_dofs
+    elif d == 'down': b = self.srf_dofs
+    v            = np.empty(len(u))
+    v[self.dofs] = np.repeat(u[b], self.counts)
+    return v
+
+  def integrate(self, u, d='up'):
+    """
+    Return the array of dof values of the integral of ``u`` from the lower
+    surface if ``d`` = 'up', or from the upper surface if ``d`` = 'down'.
+    """
+    z    = self.mesh.coordinates()[self.vertices, self.axis]
+    f    = u[self.dofs]
+    seg  = 0.5 * (f[1:] + f[:-1]) * np.diff(z)
+    seg[self.jumps] = 0.0
+    c    = np.append(0.0, np.cumsum(seg))
+    if   d == 'up':
+      c  = c - np.repeat(c[self.start],   self.counts)
+    elif d == 'down':
+      c  = np.repeat(c[self.end - 1], self.counts) - c
+    v            = np.empty(len(u))
+    v[self.dofs] = c
+    return v
+
+
+def is_linear_lagrange(Q):
+  """
+  Return True if every component of the function space ``Q`` is linear 
+  Lagrange, so that its functions are determined by their vertex values.
+  """
+  e    = Q.ufl_element()
+  subs = e.sub_elements() or [e]
+  return all(s.family() == 'Lagrange' and s.degree() == 1 for s in subs)
+
+
+def locate_points(mesh, x, tol=1e-9):
+  """
+  Return the array of the index of the cell of the local part of ``mesh`` 
+  containing each row of the coordinate array ``x``, found with the 
+  bounding-box tree of the mesh, or ``mesh.num_cells()`` for those outside.
+  Points within ``tol`` times the largest cell size of the mesh are 
+  assigned to the closest cell.
+
+  Args:
+
+    :mesh: :class:`~fenics.Mesh` to search
+    :x:    array of coordinates
+    :tol:  relative distance within which outside points are accepted
+
+  """
+  tree  = mesh.bounding_box_tree()
+  n_c   = mesh.num_cells()
+  eps   = tol * mesh.hmax() if n_c > 0 else 0.0
+  cell  = np.empty(len(x), dtype=np.intp)
+  for i, p in enumerate(x):
+    c = tree.compute_first_entity_collision(Point(*p))
+    if c >= n_c:
+      c, dist = tree.compute_closest_entity(Point(*p))
+      if dist > eps: c = n_c
+    cell[i] = c
+  return cell
+
+
+class PointProbe(object):
+  """
+  Evaluation of functions at a fixed set of points.  The points are located
+  in the mesh once, and the basis functions of each function space probed 
+  are evaluated at them once, so that each probe is a sparse matrix-vector
+  product.
+
+  In parallel, the points, which must be the same on every process, are 
+  each evaluated by the lowest rank containing them, and the values are 
+  gathered on the first process.  Points outside the mesh have value 
+  ``nan``.
+
+  Args:
+
+    :mesh: :class:`~fenics.Mesh` of the functions to probe
+    :x:    array of coordinates, one point per row
+    :tol:  relative distance within which outside points are accepted
+
+  """
+  def __init__(self, mesh, x, tol=1e-9):
+    self.mesh      = mesh
+    self.x         = np.asarray(x, dtype=float).reshape(len(x), -1)
+    self.operators = {}
+
+    self.rank = MPI.rank(mesh.mpi_comm())
+    self.size = MPI.size(mesh.mpi_comm())
+
+    cell  = locate_points(mesh, self.x, tol)
+    claim = np.where(cell < mesh.num_cells(), self.rank, self.size)
+    claim = claim.astype(np.intc)
+    if self.size > 1:
+      from mpi4py import MPI as mpi4py_MPI
+      self.comm = mesh.mpi_comm().tompi4py()
+      owner     = np.empty_like(claim)
+      self.comm.Allreduce(claim, owner, op=mpi4py_MPI.MIN)
+    else:
+      owner     = claim
+
+    self.mine  = np.where(owner == self.rank)[0]
+    self.cells = cell[self.mine]
+    self.found = owner < self.size
+
+  def get_operator(self, Q):
+    """
+    Return the sparse matrix from the values of the dofs used of ``Q`` to the
+    values at the points of this process, the global indices of those dofs,
+    and the number of components of ``Q``.  These are cached by function 
+    space.
+    """
+    if Q.id() not in self.operators:
+      element = Q.element()
+      dofmap  = Q.dofmap()
+      n_s     = element.space_dimension()
+      n_v     = Q.ufl_element().value_size()
+      m       = len(self.mine)
+      phi     = np.empty((m, n_s, n_v))
+      dofs    = np.empty((m, n_s), dtype=np.intc)
+      values  = np.empty(n_s * n_v)
+      for j, (i, c) in enumerate(zip(self.mine, self.cells)):
+        cell = Cell(self.mesh, int(c))
+        element.evaluate_basis_all(values, self.x[i],
+                                   cell.get_vertex_coordinates(),
+                                   cell.orientation())
+        phi[j]  = values.reshape(n_s, n_v)
+        dofs[j] = dofmap.cell_dofs(int(c))
+
+      # the matrix is over only the dofs used :
+      used, col = np.unique(dofs, return_inverse=True)
+      rows      = np.arange(m)[:,None,None]*n_v + np.arange(n_v)[None,None,:]
+      rows      = np.broadcast_to(rows, phi.shape)
+      cols      = np.broadcast_to(col.reshape(m, n_s, 1), phi.shape)
+      A         = sparse.csr_matrix((phi.ravel(), (rows.ravel(), cols.ravel())),
+                                    shape=(m*n_v, len(used)))
+      if self.size > 1:
+        used    = dofmap.tabulate_local_to_global_dofs()[used]
+      self.operators[Q.id()] = (A, used.astype(np.intc), n_v)
+    return self.operators[Q.id()]
+
+  def __call__(self, u):
+    """
+    Return the array of values of the function ``u`` at the points on the 
+    first process, with one column per component for non-scalar functions,
+    and None on the others.
+    """
+    A, dofs, n_v = self.get_operator(u.function_space())
+    if self.size > 1:
+      u_d = u.vector().gather(dofs)
+    else:
+      u_d = u.vector().get_local()[dofs]
+
+    v = np.zeros((len(self.x), n_v))
+    v[self.mine] = A.dot(u_d).reshape(-1, n_v)
+    if self.size > 1:
+      from mpi4py import MPI as mpi4py_MPI
+      v_sum = np.empty_like(v) if self.rank == 0 else None
+      self.comm.Reduce(v, v_sum, op=mpi4py_MPI.SUM, root=0)
+      v     = v_sum
+    if self.rank != 0:
+      return None
+
+    v[~self.found] = np.nan
+    if len(u.ufl_shape) == 0:
+      v = v[:,0]
+    return v
+
+
+class TransferOperator(object):
+  """
+  Sparse interpolation matrix from the vertex values of a linear Lagrange 
+  function space to the vertices of another, e.g., from a 3D mesh to its 
+  surface or basal boundary mesh.  The target vertices are located in the 
+  source mesh once, so that each transfer is a sparse matrix-vector product.
+
+  In parallel, the target vertices owned by every process are located on 
+  every partition of the source mesh, each claimed by the lowest rank 
+  containing it, and the interpolated values are summed across processes.
+  Target vertices outside the source mesh keep their values.
+
+  The operator is only usable if ``self.usable`` is True; i.e., both spaces
+  are linear Lagrange with the same number of components and geometric 
+  dimension.
+
+  Args:
+
+    :Q_from: :class:`~fenics.FunctionSpace` to transfer from
+    :Q_to:   :class:`~fenics.FunctionSpace` to transfer to
+    :tol:    distance relative to the source mesh size within which target
+             vertices not found inside a source cell are accepted
+
+  """
+  def __init__(self, Q_from, Q_to, tol=1e-9):
+    self.mesh_from = Q_from.mesh()
+    self.ncomp     = Q_to.ufl_element().value_size()
+    self.usable    = False
+
+    mesh_f = self.mesh_from
+    mesh_t = Q_to.mesh()
+    if    not is_linear_lagrange(Q_from) or not is_linear_lagrange(Q_to) \
+       or Q_from.ufl_element().value_size() != self.ncomp \
+       or mesh_f.geometry().dim() != mesh_t.geometry().dim():
+      return
+
+    self.rank = MPI.rank(mesh_t.mpi_comm())
+    self.size = MPI.size(mesh_t.mpi_comm())
+
+    # the target vertices whose dofs are owned by this process :
+    r     = Q_to.dofmap().ownership_range()
+    v2d   = vertex_to_dof_map(Q_to).reshape(-1, self.ncomp)
+    own   = np.all(v2d < r[1] - r[0], axis=1)
+    x     = mesh_t.coordinates()[own]
+
+    if self.size > 1:
+      from mpi4py import MPI as mpi4py_MPI
+      self.comm = mesh_t.mpi_comm().tompi4py()
+      counts    = self.comm.allgather(len(x))
+      x_all     = np.vstack(self.comm.allgather(x))
+    else:
+      counts    = [len(x)]
+      x_all     = x
+
+    # locate every target vertex in the local source mesh :
+    cell  = locate_points(mesh_f, x_all, tol)
+    found = cell < mesh_f.num_cells()
+
+    # each vertex is interpolated by the lowest rank containing it :
+    claim = np.where(found, self.rank, self.size).astype(np.intc)
+    if self.size > 1:
+      owner = np.empty_like(claim)
+      self.comm.Allreduce(claim, owner, op=mpi4py_MPI.MIN)
+    else:
+      owner = claim
+    mine  = np.where(owner == self.rank)[0]
+
+    # barycentric coordinates, by least squares for manifold meshes :
+    cv    = mesh_f.cells()[cell[mine]]
+    X     = mesh_f.coordinates()[cv]
+    T     = X[:,1:] - X[:,:1]
+    M     = np.einsum('nij,nkj->nik', T, T)
+    b     = np.einsum('nij,nj->ni',   T, x_all[mine] - X[:,0])
+    k     = cv.shape[1]
+    if len(mine) > 0:
+      lam = np.linalg.solve(M, b[:,:,np.newaxis])[:,:,0]
+      w   = np.column_stack((1.0 - lam.sum(axis=1), lam))
+    else:
+      w   = np.empty((0, k))
+
+    rows  = np.repeat(np.arange(len(mine)), k)
+    self.A      = sparse.csr_matrix((w.ravel(), (rows, cv.ravel())),
+                                    shape=(len(mine), mesh_f.num_vertices()))
+    self.rows   = mine
+    self.n_all  = len(x_all)
+    self.offset = sum(counts[:self.rank])
+    self.dofs   = v2d[own]
+    self.hit    = owner[self.offset : self.offset + len(x)] < self.size
+    self.usable = True
+
+  def apply(self, u_to, u_from):
+    """
+    Set the values of the function ``u_to`` to those of ``u_from``
+    interpolated at its vertices.
+    """
+    u_v   = u_from.compute_vertex_values(self.mesh_from)
+    u_v   = u_v.reshape(self.ncomp, -1).T
+    v     = np.zeros((self.n_all, self.ncomp))
+    v[self.rows] = self.A.dot(u_v)
+    if self.size > 1:
+      from mpi4py import MPI as mpi4py_MPI
+      v_sum = np.empty_like(v)
+      self.comm.Allreduce(v, v_sum, op=mpi4py_MPI.SUM)
+      v     = v_sum
+    v     = v[self.offset : self.offset + len(self.dofs)]
+    u     = u_to.vector().array()
+    u[self.dofs[self.hit]] = v[self.hit]
+    u_to.vector().set_local(u)
+    u_to.vector().apply('insert')
+
+
 def plot_variable(u, name, direc, 
                   figsize             = (8,7),
                   cmap                = 'gist_yarg',
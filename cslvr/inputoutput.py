@@ -1,8 +1,12 @@
 from scipy.io          import loadmat
 from scipy.interpolate import RectBivariateSpline, griddata, interp2d
+from scipy.spatial     import cKDTree
 from pylab             import array, linspace, ones, isnan, all, zeros, shape, \
                               ndarray, e, nan, float64, logical_and, where, \
-                              meshgrid
+                              meshgrid, searchsorted, asarray, empty, \
+                              float32, dtype, min_scalar_type, promote_types, \
+                              issubdtype, integer, floating, isfinite, \
+                              diff, rint, inf
 from fenics            import interpolate, Expression, Function, \
                               vertices, FunctionSpace, RectangleMesh, \
                               MPI, mpi_comm_world, GenericVector, parameters, \
@@ -10,6 +14,8 @@ from fenics            import interpolate, Expression, Function, \
 from ufl               import indexed
 from pyproj            import Proj, transform
 from colored           import fg, attr
+import sys
+from collections     import OrderedDict
 
 class DataInput(object):
   """
@@ -23,9 +29,15 @@ class DataInput(object):
   :param di:         dictionary of data returned by one of the functions of :class:`~datafactory.DataFactory`
   :param mesh:       finite-element mesh to use for generation of :class:`~fenics.Expression`'s, if desired
   :param order:      if a mesh is used, this defines the order of the finite-element basis used by :func:`~inputoutput.DataInput.get_expression`
+  :param compact:    store every field in the most compact type which holds it, see :func:`~inputoutput.DataInput.compact_field`
+  :param dtypes:     dictionary of types to store specific fields in, overriding ``compact``
+  :param fill_values: dictionary of the no-data values of specific fields, left out of the averages of :func:`~inputoutput.DataInput.get_level` with the NaNs
   :type di: dict
   :type mesh: :class:`~fenics.Mesh`
   :type order: int
+  :type compact: bool
+  :type dtypes: dict
+  :type fill_values: dict
 
   A number of class variables are generated by the instantiation of this 
   class which may be useful.  These are:
@@ -37,14 +49,28 @@ class DataInput(object):
 
   * ``self.x`` -- :class:`~numpy.array` of data grid :math:`x`-coordinates
   * ``self.y`` -- :class:`~numpy.array` of data grid :math:`y`-coordinates
+
+  The fields are kept in their native type, or the compact type requested,
+  and are promoted to ``float64`` only for the region of the grid needed 
+  by the spline fits of :func:`~inputoutput.DataInput.get_interpolant`.
+
+  Coarse meshes may be interpolated from coarsened copies of the data, the
+  pyramid levels of :func:`~inputoutput.DataInput.get_level`, chosen by 
+  :func:`~inputoutput.DataInput.get_mesh_level` when ``level='auto'`` is
+  requested so that the data is not aliased onto the mesh.
   """
-  def __init__(self, di, mesh=None, order=1):
+  def __init__(self, di, mesh=None, order=1, compact=False, dtypes=None,
+               fill_values=None):
     """
     """
     self.mesh       = mesh
     self.data       = {}        # dictionary of data
     self.rem_nans   = False     # may change depending on 'identify_nans' call
     self.chg_proj   = False     # change to other projection flag
+    self.transforms = OrderedDict()  # LRU cache of transformed coordinates
+    self.transform_cache_size = 8
+    self.pyramids   = {}        # cache of coarsened data
+    self.fill_values = fill_values if fill_values is not None else {}
     self.color      = 'light_green'
 
     di              = di.copy()
@@ -84,6 +110,15 @@ class DataInput(object):
     # remove un-needed rows/cols from data:
     if self.rem_nans: self.__remove_nans()
 
+    # store the fields compactly, if desired :
+    if dtypes is None: dtypes = {}
+    for fn in self.data.keys():
+      if fn in dtypes:
+        self.compact_field(fn, dtypes[fn])
+      elif compact:
+        self.compact_field(fn)
+    self.print_memory()
+
     if self.mesh != None:
 
       # define the finite elmenet of the problem :
@@ -127,6 +162,7 @@ class DataInput(object):
     ys  = where(logical_and(ylt, ygt))[0]
    
     # cut out the parts we do not need :
+    self.pyramids = {}
     for i in self.data:
       self.data[i] = self.data[i][:,xs]
       self.data[i] = self.data[i][ys,:]
@@ -177,7 +213,7 @@ class DataInput(object):
     """
     return self.proj(lon,lat)
 
-  def interpolate_from_di(self, di, fi, fo, order=3):
+  def interpolate_from_di(self, di, fi, fo, order=3, tile_size=1000000):
     """
     Interpolates the data field with key ``fi`` of 
     another :class:`~inputoutput.DataInput` object ``di`` to the grid used 
@@ -188,14 +224,22 @@ class DataInput(object):
     * ``2``  -- linear interpolation
     * ``3``  -- cubic interpolation
 
+    If the projections differ, the grid of this object is mapped into the
+    projection of ``di`` and the field is evaluated there with the 
+    structured-grid interpolator, in tiles of about ``tile_size`` points so
+    that memory use is bounded.  Points outside the grid of ``di`` are set
+    to zero.
+
     :param di: the :class:`~inputoutput.DataInput` to interpolate from
     :param fi: the key of the data to interpolate from.
     :param fo: the key to save the data within ``self.data``
     :param order: order of interpolation (see above).
+    :param tile_size: number of grid points resampled at a time
     :type di:    :class:`~inputoutput.DataInput`
     :type fi:    string
     :type fo:    string
     :type order: int
+    :type tile_size: int
     """
     if   order == 1:  method = 'nearest'
     elif order == 2:  method = 'linear'
@@ -222,23 +266,37 @@ class DataInput(object):
                                      kx=order, ky=order)
       fo_v  = interp(self.x, self.y).T
 
-    # if not, then use scipy::griddata to interpolate unstructured data :
+    # if not, then map this grid into di's projection and interpolate there :
     else:
-      s      = '    - projections do not match, using unstructured ' + \
-               'interpolation -'
+      s      = '    - projections do not match, resampling in the source ' + \
+               'projection -'
       print_text(s, self.color)
-      xs,ys   = self.transform_xy(di)
-      di_pts  = (xs.flatten(), ys.flatten())
-      xr,yr   = meshgrid(self.x, self.y)
-      do_pts  = (xr,yr)
-      
-      # create interpolation object to convert to bedmap2 coordinates :
-      # surface accumulation/ablation :
-      fo_v    = griddata(di_pts, di.data[fi].flatten(), do_pts,
-                         method=method, fill_value=0.0)
+
+      data = di.data[fi]
+      if order == 1:
+        ix = nearest_indexer(di.x)
+        iy = nearest_indexer(di.y)
+        def interp(x, y):
+          return data[iy(y), ix(x)]
+      else:
+        k      = {2 : 1, 3 : 3}[order]
+        interp = RectBivariateSpline(di.x, di.y, data.T, kx=k, ky=k).ev
+
+      # resample whole rows of this grid, about tile_size points at a time :
+      fo_v = empty((self.ny, self.nx))
+      n    = max(1, tile_size // self.nx)
+      for i in range(0, self.ny, n):
+        xr,yr  = meshgrid(self.x, self.y[i:i+n])
+        xs,ys  = transform(self.proj, di.proj, xr, yr)
+        tile   = interp(xs.ravel(), ys.ravel()).reshape(xr.shape)
+        out    =   (xs < di.x.min()) | (xs > di.x.max()) \
+                 | (ys < di.y.min()) | (ys > di.y.max())
+        tile[out]   = 0.0
+        fo_v[i:i+n] = tile
 
     # set the data to our dictionary :
     self.data[fo] = fo_v
+    self.clear_levels(fo)
 
     print_min_max(di.data[fi], 'original %s    ' % fi)
     print_min_max(fo_v,        'interpolated %s' % fo)
@@ -252,12 +310,65 @@ class DataInput(object):
     :param di: the :class:`~inputoutput.DataInput` with projection coordinates to transform
     :rtype: tuple of converted coordinates
     """
-    # FIXME : need a fast way to convert all the x, y. Currently broken
     s = "::: transforming coordinates from %s to %s :::" % (di.name, self.name)
     print_text(s, self.color)
     vx,vy  = meshgrid(di.x, di.y)
-    xn, yn = transform(di.proj, self.proj, vx, vy)
-    return (xn, yn)
+    return self.transform_points(di.proj, self.proj, vx, vy)
+
+  def transform_points(self, p_from, p_to, x, y, chunk_size=1000000):
+    """
+    Transforms the coordinate arrays ``x``, ``y`` from the 
+    :class:`~pyproj.Proj` ``p_from`` to ``p_to`` with vectorized calls of 
+    at most ``chunk_size`` points each.  The result is cached by the 
+    projections and the arrays ``x`` and ``y``, recognized by identity, or
+    for views by the identity of the array they view and their place in 
+    it, so that the mesh or dof coordinates are transformed only once for
+    every field of this dataset.  The arrays must not be modified in place
+    between calls.  The least-recently used result is evicted once more 
+    than ``self.transform_cache_size`` are held.  The returned arrays are 
+    shared and must not be modified.
+
+    :param p_from: projection to transform from
+    :param p_to: projection to transform to
+    :param x: :math:`x`-coordinates
+    :param y: :math:`y`-coordinates
+    :param chunk_size: number of points transformed per call
+    :type p_from: :class:`~pyproj.Proj`
+    :type p_to: :class:`~pyproj.Proj`
+    :type x: :class:`~numpy.array`
+    :type y: :class:`~numpy.array`
+    :type chunk_size: int
+    :rtype: tuple of converted coordinates
+    """
+    x   = asarray(x, dtype=float64)
+    y   = asarray(y, dtype=float64)
+
+    # the arrays owning the memory of x and y, kept with the entry so that
+    # their ids are not reused :
+    ox  = x
+    while isinstance(ox.base, ndarray): ox = ox.base
+    oy  = y
+    while isinstance(oy.base, ndarray): oy = oy.base
+
+    key = (p_from.srs, p_to.srs, id(ox), id(oy), 
+           x.__array_interface__['data'][0], x.shape, x.strides,
+           y.__array_interface__['data'][0], y.shape, y.strides)
+    entry = self.transforms.pop(key, None)
+
+    if entry is None or entry[0] is not ox or entry[1] is not oy:
+      xf = x.ravel()
+      yf = y.ravel()
+      xn = empty(len(xf))
+      yn = empty(len(yf))
+      for i in range(0, len(xf), chunk_size):
+        j                = i + chunk_size
+        xn[i:j], yn[i:j] = transform(p_from, p_to, xf[i:j], yf[i:j])
+      entry = (ox, oy, (xn.reshape(x.shape), yn.reshape(y.shape)))
+
+    self.transforms[key] = entry
+    while len(self.transforms) > self.transform_cache_size:
+      self.transforms.popitem(last=False)
+    return entry[2]
 
   def rescale_field(self, fo, fn, umin, umax, inverse=False):
     """
@@ -299,6 +410,7 @@ class DataInput(object):
       amax = umin / ( amin + 1.0/(1.0 + U.max()) )
     
     self.data[fn] = (amin + 1.0/(1.0 + U)) * amax
+    self.clear_levels(fn)
 
   def __identify_nans(self, data, fn):
     """
@@ -345,6 +457,50 @@ class DataInput(object):
       self.data[i] = self.data[i][self.good_y, :          ]
       self.data[i] = self.data[i][:,           self.good_x]
 
+  def compact_field(self, fn, dt=None):
+    """
+    Convert the data with key ``fn`` to type ``dt``.  If ``dt`` is None, 
+    fields with only integer values, such as masks, are stored with the 
+    smallest integer type holding their range (``uint8`` for masks), and
+    all other fields are stored as ``float32``.
+
+    :param fn: key of data array
+    :param dt: type to store the data as
+    :type fn: string
+    :type dt: :class:`~numpy.dtype` or string
+    """
+    d = self.data[fn]
+
+    if dt is None:
+      if issubdtype(d.dtype, integer):
+        dt = promote_types(min_scalar_type(d.min()), min_scalar_type(d.max()))
+      elif issubdtype(d.dtype, floating) and isfinite(d).all() \
+           and (d == d.round()).all() and d.size > 0:
+        dt = promote_types(min_scalar_type(int(d.min())),
+                           min_scalar_type(int(d.max())))
+      else:
+        dt = float32
+
+    dt = dtype(dt)
+    if d.dtype != dt:
+      self.data[fn] = d.astype(dt)
+      self.clear_levels(fn)
+
+  def print_memory(self):
+    """
+    Print the type and memory footprint of each field of this 
+    :class:`~inputoutput.DataInput` object.
+    """
+    total = 0
+    for fn in sorted(self.data.keys()):
+      d      = self.data[fn]
+      total += d.nbytes
+      s      = "    - %s field '%s' : %s, %.2f MB -" \
+               % (self.name, fn, d.dtype, d.nbytes / 1024.0**2)
+      print_text(s, self.color)
+    s = "    - %s fields total : %.2f MB -" % (self.name, total / 1024.0**2)
+    print_text(s, self.color)
+
   def set_data_min(self, fn, boundary, val):
     """
     Set all values of the array associated with this instance's ``self.data`` 
@@ -364,6 +520,7 @@ class DataInput(object):
     d                = self.data[fn]
     d[d <= boundary] = val
     self.data[fn]    = d
+    self.clear_levels(fn)
 
   def set_data_max(self, fn, boundary, val):
     """
@@ -384,6 +541,7 @@ class DataInput(object):
     d                = self.data[fn]
     d[d >= boundary] = val
     self.data[fn]    = d
+    self.clear_levels(fn)
 
   def set_data_val(self, fn, old_val, new_val):
     """
@@ -404,19 +562,232 @@ class DataInput(object):
     d                = self.data[fn]
     d[d == old_val]  = new_val
     self.data[fn]    = d
+    self.clear_levels(fn)
+
+  def clear_levels(self, fn):
+    """
+    Remove the cached pyramid levels of the data with key ``fn``, which must
+    be called whenever this data is changed.
+
+    :param fn: key of data array
+    :type fn: string
+    """
+    for key in self.pyramids.keys():
+      if key[0] == fn:
+        self.pyramids.pop(key)
+
+  def get_level(self, fn, level=0, near=False):
+    """
+    Returns the data with key ``fn`` and its grid coordinates at pyramid 
+    level ``level``, where each level halves the resolution of the one 
+    below by averaging blocks of two-by-two cells, or if ``near == True``,
+    by taking every second row and column so that masks retain their 
+    values.  NaNs and the no-data value of ``fn`` in ``self.fill_values``
+    are left out of the averages, and blocks without data take that value.
+    Level ``0`` is the data itself.  The levels are cached.
+
+    :param fn: key of data array
+    :param level: the pyramid level
+    :param near:  subsample rather than average
+    :type fn: string
+    :type level: int
+    :type near: bool
+    :rtype: tuple ``(data, x, y)``
+    """
+    if level == 0:
+      return self.data[fn], self.x, self.y
+
+    key = (fn, level, near)
+    if key not in self.pyramids:
+      d, xs, ys = self.get_level(fn, level-1, near)
+      nx = len(xs) // 2 * 2
+      ny = len(ys) // 2 * 2
+
+      if near:
+        d  = d[:ny:2, :nx:2]
+        xs = xs[:nx:2]
+        ys = ys[:ny:2]
+      else:
+        dt   = d.dtype if issubdtype(d.dtype, floating) else float64
+        fill = self.fill_values.get(fn, nan)
+        tot  = zeros((ny//2, nx//2), dtype=dt)
+        cnt  = zeros((ny//2, nx//2), dtype='i1')
+        for b in [d[0:ny:2, 0:nx:2], d[1:ny:2, 0:nx:2],
+                  d[0:ny:2, 1:nx:2], d[1:ny:2, 1:nx:2]]:
+          b     = b.astype(dt)
+          good  = isfinite(b) & (b != fill)
+          tot  += where(good, b, 0)
+          cnt  += good
+        d  = where(cnt > 0, tot / cnt.clip(1, 4), fill).astype(dt)
+        xs = 0.5 * (xs[0:nx:2] + xs[1:nx:2])
+        ys = 0.5 * (ys[0:ny:2] + ys[1:ny:2])
+      self.pyramids[key] = (d, xs, ys)
+
+    return self.pyramids[key]
+
+  def get_mesh_level(self, mesh, order=1):
+    """
+    Returns the coarsest pyramid level of :func:`get_level` with grid 
+    spacing no larger than half the smallest horizontal extent of the cells 
+    of ``mesh`` over all processes, such that the data is sampled at least 
+    twice per cell, while keeping enough points for a spline of order 
+    ``order``.  It must therefore be called by all processes.
+
+    :param mesh: the mesh to interpolate the data to
+    :param order: order of the interpolation
+    :type mesh: :class:`~fenics.Mesh`
+    :type order: int
+    :rtype: int
+    """
+    # smallest horizontal extent of the cells, the same on every process :
+    h = inf
+    if mesh.num_cells() > 0:
+      c = mesh.coordinates()[mesh.cells()][:,:,:2]
+      h = (c.max(axis=1) - c.min(axis=1)).max(axis=1).min()
+    h = MPI.min(mesh.mpi_comm(), float(h))
+    if self.nx < 2 or self.ny < 2 or h == inf:
+      return 0
+    dx = min(abs(self.x[1] - self.x[0]), abs(self.y[1] - self.y[0]))
+
+    level = 0
+    while     dx * 2**(level+1) <= 0.5 * h \
+          and min(self.nx, self.ny) // 2**(level+1) > 2*(order + 1):
+      level += 1
+    return level
+
+  def get_interpolant(self, fn, order=1, near=False, bounds=None, level=0):
+    """
+    Returns a function evaluating the data with key ``fn`` at arrays of 
+    :math:`x` and :math:`y` coordinates with a single vectorized call, by 
+    spline interpolation of order ``order`` in :math:`x` and :math:`y`, or
+    if ``near == True``, by nearest-neighbor interpolation.  If 
+    :func:`change_projection` has been called, the coordinates are in the
+    new projection.
+
+    If ``bounds`` is given, only the data covering this box, plus a few 
+    grid cells about it, is promoted to ``float64`` and fit.  Points outside
+    this box, such as those of a mesh other than the one the box was taken 
+    from, are evaluated from a fit of the whole grid, made when first 
+    needed, rather than extrapolated from the cropped one.  The data is
+    taken from pyramid level ``level`` of :func:`get_level`.
+
+    Nearest-neighbor and linear values inside the box are exactly those of
+    the whole grid.  Cubic splines are not local, so for them the box is 
+    widened by 30 grid cells, and the cropped fit agrees with the fit of 
+    the whole grid only to round-off: the influence of a data value on an
+    interpolating cubic spline decays by a factor of about 
+    :math:`2 - \sqrt{3} \approx 0.27` per cell, or to about 
+    :math:`10^{-17}` of the data magnitude 30 cells away.
+
+    :param fn: key of data to interpolate
+    :param order: order of the interpolation
+    :param near:  use nearest-neighbor interpolation
+    :param bounds: box ``(x_min, y_min, x_max, y_max)`` in the projection of this data to be evaluated
+    :param level: pyramid level of the data to interpolate
+    :type fn: string
+    :type order: int
+    :type near: bool
+    :type bounds: tuple
+    :type level: int
+    :rtype: function of the coordinate arrays ``x`` and ``y``, with their 
+            transformation cached by :func:`transform_points` unless called
+            with ``cache=False``
+    """
+    data, xs, ys = self.get_level(fn, level, near)
+
+    def fit(data, xs, ys):
+      if not near :
+        spline = RectBivariateSpline(xs, ys, data.T.astype(float64),
+                                     kx=order, ky=order)
+        return spline.ev
+      ix = nearest_indexer(xs)
+      iy = nearest_indexer(ys)
+      return lambda xn, yn: data[iy(yn), ix(xn)].astype(float64)
+
+    # crop to the region required, with a margin large enough that the 
+    # spline is not affected by the cut away data :
+    cropped = False
+    if bounds is not None:
+      m    = 1 if near or order == 1 else 30
+      i0   = max(searchsorted(xs, bounds[0]) - m, 0)
+      i1   = min(searchsorted(xs, bounds[2], 'right') + m, len(xs))
+      j0   = max(searchsorted(ys, bounds[1]) - m, 0)
+      j1   = min(searchsorted(ys, bounds[3], 'right') + m, len(ys))
+      if      i1 - i0 > order and j1 - j0 > order \
+          and (i1 - i0 < len(xs) or j1 - j0 < len(ys)):
+        ev      = fit(data[j0:j1, i0:i1], xs[i0:i1], ys[j0:j1])
+        cropped = True
+    if not cropped:
+      ev = fit(data, xs, ys)
+    
+    # the fit of the whole grid, for points outside the box :
+    full = []
+    def ev_full(xn, yn):
+      if not full:
+        full.append(fit(data, xs, ys))
+      return full[0](xn, yn)
+
+    if self.chg_proj:
+      new_proj = self.new_p
+      old_proj = self.proj
+
+    chg_proj = self.chg_proj
+
+    def interpolant(x, y, cache=True):
+      if chg_proj and cache:
+        xn, yn = self.transform_points(new_proj, old_proj, x, y)
+      elif chg_proj:
+        xn, yn = transform(new_proj, old_proj, x, y)
+      else:
+        xn, yn = x, y
+      xn = asarray(xn, dtype=float64)
+      yn = asarray(yn, dtype=float64)
+      v  = asarray(ev(xn, yn), dtype=float64)
+      if cropped:
+        out = (xn < bounds[0]) | (xn > bounds[2]) \
+            | (yn < bounds[1]) | (yn > bounds[3])
+        if out.any():
+          v[out] = ev_full(xn[out], yn[out])
+      return v
+
+    return interpolant
+
+  def get_bounds(self, x, y):
+    """
+    Returns the box ``(x_min, y_min, x_max, y_max)`` in the projection of 
+    this data covering the coordinate arrays ``x`` and ``y``, given in the 
+    new projection if :func:`change_projection` has been called, or None if
+    there are no coordinates.
+
+    :param x: :math:`x`-coordinates
+    :param y: :math:`y`-coordinates
+    :type x: :class:`~numpy.array`
+    :type y: :class:`~numpy.array`
+    :rtype: tuple
+    """
+    if len(x) == 0:
+      return None
+    if self.chg_proj:
+      x, y = self.transform_points(self.new_p, self.proj, x, y)
+    return (x.min(), y.min(), x.max(), y.max())
 
-  def get_expression(self, fn, order=1, near=False):
+  def get_expression(self, fn, order=1, near=False, level=0):
     """
     Creates a spline-interpolation expression for data with key ``fn`` with 
     order of approximation in :math:`x` and :math:`y` directions ``order``.
-    if ``near == True``, use nearest-neighbor interpolation.
+    if ``near == True``, use nearest-neighbor interpolation.  The data is
+    taken from pyramid level ``level``, the data itself by default, or if 
+    ``'auto'``, the level chosen for this object's mesh by 
+    :func:`get_mesh_level`.
 
     :param fn: key of data to form expression of
     :param order: order of the interpolation
     :param near:  use nearest-neighbor interpolation
+    :param level: pyramid level of the data to interpolate, or ``'auto'``
     :type fn: string
     :type order: int
     :type near: bool
+    :type level: int or string
     """
     if near:
       t = 'nearest-neighbor'
@@ -425,37 +796,120 @@ class DataInput(object):
     s = "::: getting %s %s expression from %s :::" % (fn, t, self.name)
     print_text(s, self.color)
 
-    data = self.data[fn]
-
-    if self.chg_proj:
-      new_proj = self.new_p
-      old_proj = self.proj
+    # only the region of the data covering the mesh is fit at first; points
+    # of other meshes outside it are evaluated from the whole grid :
+    bounds = None
+    if self.mesh is not None:
+      x      = self.mesh.coordinates()
+      bounds = self.get_bounds(x[:,0], x[:,1])
+
+    if level == 'auto':
+      level = 0 if self.mesh is None else self.get_mesh_level(self.mesh, order)
+    if level > 0:
+      s = "    - using pyramid level %i, coarsened by a factor of %i -" \
+          % (level, 2**level)
+      print_text(s, self.color)
 
-    if not near :
-      spline = RectBivariateSpline(self.x, self.y, data.T, kx=order, ky=order)
-
-    xs       = self.x
-    ys       = self.y
-    chg_proj = self.chg_proj
+    interpolant = self.get_interpolant(fn, order, near, bounds, level)
 
     class CslvrExpression(Expression):
       """
       Class that handles interpolation between altered projection coordinates.
       """
       def eval(self, values, x):
-        if chg_proj:
-          xn, yn = transform(new_proj, old_proj, x[0], x[1])
-        else:
-          xn, yn = x[0], x[1]
-        if not near:
-          values[0] = spline(xn, yn)
-        else:
-          idx       = abs(xs - xn).argmin()
-          idy       = abs(ys - yn).argmin()
-          values[0] = data[idy, idx]
+        values[0] = interpolant(array([x[0]]), array([x[1]]), cache=False)[0]
+
+      def eval_array(self, x):
+        """
+        Return the values of this expression at every row of the coordinate
+        array ``x`` with a single vectorized call.
+        """
+        return interpolant(x[:,0], x[:,1])
 
     return CslvrExpression(element = self.element)
 
+  def interpolate_to(self, Q, fn, order=1, near=False, level=0):
+    """
+    Returns a :class:`~fenics.Function` over the function space ``Q`` with 
+    the data with key ``fn`` evaluated at the coordinates of its degrees of 
+    freedom, tabulated once and interpolated with a single vectorized call of
+    :func:`get_interpolant`.  This is much faster than interpolating the 
+    :class:`~fenics.Expression` of :func:`get_expression`, which is evaluated
+    point-by-point.  The data is taken from pyramid level ``level``, the 
+    data itself by default, or if ``'auto'``, the level chosen for the mesh
+    of ``Q`` by :func:`get_mesh_level`.
+
+    :param Q: scalar function space to interpolate to
+    :param fn: key of data to interpolate
+    :param order: order of the interpolation
+    :param near:  use nearest-neighbor interpolation
+    :param level: pyramid level of the data to interpolate, or ``'auto'``
+    :type Q: :class:`~fenics.FunctionSpace`
+    :type fn: string
+    :type order: int
+    :type near: bool
+    :type level: int or string
+    :rtype: :class:`~fenics.Function`
+    """
+    if near:
+      t = 'nearest-neighbor'
+    else:
+      t = '%i-order spline' % order
+    s = "::: interpolating %s %s data from %s to function space :::" \
+        % (fn, t, self.name)
+    print_text(s, self.color)
+
+    if Q.num_sub_spaces() != 0:
+      s = ">>> interpolate_to() REQUIRES A SCALAR FUNCTION SPACE <<<"
+      print_text(s, 'red', 1)
+      sys.exit(1)
+
+    # the owned dofs are numbered first on each process :
+    r    = Q.dofmap().ownership_range()
+    gdim = Q.mesh().geometry().dim()
+    x    = Q.tabulate_dof_coordinates().reshape(-1, gdim)[:r[1] - r[0]]
+
+    if level == 'auto':
+      level = self.get_mesh_level(Q.mesh(), order)
+    if level > 0:
+      s = "    - using pyramid level %i, coarsened by a factor of %i -" \
+          % (level, 2**level)
+      print_text(s, self.color)
+
+    f    = Function(Q, name=fn)
+    b    = self.get_bounds(x[:,0], x[:,1])
+    u    = self.get_interpolant(fn, order, near, b, level)(x[:,0], x[:,1])
+    f.vector().set_local(u)
+    f.vector().apply('insert')
+    print_min_max(f, fn)
+    return f
+
+
+def nearest_indexer(xs, rtol=1e-6):
+  """
+  Returns a function giving the indices of the nearest values of the sorted 
+  array ``xs`` to each of the values of an array.  If ``xs`` is evenly 
+  spaced to within relative tolerance ``rtol``, the indices are computed 
+  directly from the spacing, otherwise a k-d tree of ``xs`` is queried.
+  """
+  xs = asarray(xs, dtype=float64)
+  n  = len(xs)
+  if n < 2:
+    return lambda xn: zeros(shape(xn), dtype=int)
+
+  dx = (xs[-1] - xs[0]) / (n - 1)
+  if dx != 0 and (abs(diff(xs) - dx) <= rtol * abs(dx)).all():
+    x0 = xs[0]
+    def index(xn):
+      i = rint((asarray(xn, dtype=float64) - x0) / dx)
+      return i.clip(0, n - 1).astype(int)
+  else:
+    tree = cKDTree(xs[:,None])
+    def index(xn):
+      xn = asarray(xn, dtype=float64)
+      return tree.query(xn.reshape(-1, 1))[1].reshape(xn.shape)
+  return index
+
 
 def print_min_max(u, title, color='97'):
   """
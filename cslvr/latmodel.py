@@ -2,7 +2,9 @@ from fenics            import *
 from dolfin_adjoint    import *
 from cslvr.inputoutput import print_text, get_text, print_min_max
 from cslvr.model       import Model
+from cslvr.helper      import get_exterior_facets, evaluate_at_points
 from pylab             import inf
+import numpy               as np
 import sys
 
 class LatModel(Model):
@@ -187,6 +189,9 @@ class LatModel(Model):
     S = self.S
     B = self.B
     
+    # the arguments as given, evaluated at the midpoints below :
+    mask_in, adot_in, U_mask_in = mask, adot, U_mask
+
     # default to all grounded ice :
     if mask == None:
       mask = Expression('1.0', element=self.Q.ufl_element())
@@ -217,7 +222,12 @@ class LatModel(Model):
     
     tol = 1e-6
     
-    # iterate through the facets and mark each if on a boundary :
+    # the fields passed in are evaluated at the midpoints of the facets and
+    # cells, so that a facet or cell straddling a mask transition takes the
+    # value at its centre, as it did when they were marked one at a time :
+    x_c = self.mesh.coordinates()[self.mesh.cells()].mean(axis=1)
+    
+    # mark each exterior facet according to its normal vector :
     #
     #   2 = high slope, upward facing ................ grounded surface
     #   3 = grounded high slope, downward facing ..... grounded base
@@ -229,69 +239,46 @@ class LatModel(Model):
     # facet for accumulation :
     #
     #   1 = high slope, upward facing ................ positive adot
-    s = "    - iterating through %i facets - " % self.num_facets
+    ext, fv, x_m, n = get_exterior_facets(self.mesh)
+    
+    s = "    - marking %i exterior facets - " % len(ext)
     print_text(s, cls=self)
-    for f in facets(self.mesh):
-      n        = f.normal()
-      x_m      = f.midpoint().x()
-      y_m      = f.midpoint().y()
-      mask_xy  = mask(x_m, y_m)
-      
-      if   n.y() >=  tol and f.exterior():
-        adot_xy   = adot(x_m, y_m)
-        U_mask_xy = U_mask(x_m, y_m)
-        if adot_xy > 0:
-          self.ff_acc[f] = self.GAMMA_ACC
-        if mask_xy > 1:
-          if U_mask_xy > 0:
-            self.ff[f] = self.GAMMA_U_FLT
-          else:
-            self.ff[f] = self.GAMMA_S_FLT
-        else:
-          if U_mask_xy > 0:
-            self.ff[f] = self.GAMMA_U_GND
-          else:
-            self.ff[f] = self.GAMMA_S_GND
     
-      elif n.y() <= -tol and f.exterior():
-        if mask_xy > 1:
-          self.ff[f] = self.GAMMA_B_FLT
-        else:
-          self.ff[f] = self.GAMMA_B_GND
-      
-      elif n.y() >  -tol and n.y() < tol and f.exterior():
-        # if we want to use a basin, we need to mark the interior facets :
-        if mark_divide:
-          lat_mask_xy = lat_mask(x_m, y_m)
-          if lat_mask_xy > 0:
-            if y_m > 0:
-              self.ff[f] = self.GAMMA_L_OVR
-            else:
-              self.ff[f] = self.GAMMA_L_UDR
-          else:
-            self.ff[f] = self.GAMMA_L_DVD
-        # otherwise just mark for over (4) and under (10) water :
-        else:
-          if y_m > 0:
-            self.ff[f] = self.GAMMA_L_OVR
-          else:
-            self.ff[f] = self.GAMMA_L_UDR
+    n_y   = n[:,1]
+    y_m   = x_m[:,1]
+    upr   = n_y >=  tol
+    lwr   = n_y <= -tol
+    lat   = ~(upr | lwr)
+    flt   = evaluate_at_points(mask_in, x_m)   > 1
+    obs   = evaluate_at_points(U_mask_in, x_m) > 0
+    acc   = evaluate_at_points(adot_in, x_m)   > 0
+    ovr   = y_m > 0
+    
+    ff     = self.ff.array()
+    ff_acc = self.ff_acc.array()
+    
+    ff_acc[ext[upr & acc]] = self.GAMMA_ACC
+    ff[ext[upr]] = np.select([flt & obs,        flt,              obs],
+                             [self.GAMMA_U_FLT, self.GAMMA_S_FLT,
+                              self.GAMMA_U_GND], self.GAMMA_S_GND)[upr]
+    ff[ext[lwr]] = np.where(flt, self.GAMMA_B_FLT, self.GAMMA_B_GND)[lwr]
+    ff[ext[lat]] = np.where(ovr, self.GAMMA_L_OVR, self.GAMMA_L_UDR)[lat]
+    
+    # if we want to use a basin, we need to mark the interior facets :
+    if mark_divide:
+      dvd = lat & ~(evaluate_at_points(lat_mask, x_m) > 0)
+      ff[ext[dvd]] = self.GAMMA_L_DVD
 
-    s = "    - iterating through %i cells - " % self.num_cells
+    s = "    - marking %i cells - " % self.num_cells
     print_text(s, cls=self)
-    for c in cells(self.mesh):
-      x_m     = c.midpoint().x()
-      y_m     = c.midpoint().y()
-      mask_xy = mask(x_m, y_m)
-
-      if mask_xy > 1:
-        self.cf[c] = self.OMEGA_FLT
-      else:
-        self.cf[c] = self.OMEGA_GND
+    mask_c = evaluate_at_points(mask_in, x_c)
+    cf     = self.cf.array()
+    cf[:]  = np.where(mask_c > 1, self.OMEGA_FLT, self.OMEGA_GND)
 
     s = "    - done - "
     print_text(s, cls=self)
     
+    self.reset_vert_operators()
     self.set_measures()
     
   def deform_mesh_to_geometry(self, S, B):
@@ -302,23 +289,25 @@ class LatModel(Model):
     s = "::: deforming mesh to geometry :::"
     print_text(s, cls=self)
 
-    self.init_S(S)
-    self.init_B(B)
+    Q = self.Q_non_periodic
+    self.init_S(self.evaluate_by_column(S, Q, 1))
+    self.init_B(self.evaluate_by_column(B, Q, 1))
     
     # transform z :
     # thickness = surface - base, z = thickness + base
     # Get the height of the mesh, assumes that the base is at z=0
-    max_height  = self.mesh.coordinates()[:,1].max()
-    min_height  = self.mesh.coordinates()[:,1].min()
+    x           = self.mesh.coordinates()
+    max_height  = x[:,1].max()
+    min_height  = x[:,1].min()
     mesh_height = max_height - min_height
     
-    s = "    - iterating through %i vertices - " % self.dof
+    s = "    - moving %i vertices - " % self.dof
     print_text(s, cls=self)
     
-    for x in self.mesh.coordinates():
-      x[1] = (x[1] / mesh_height) * ( + S(x[0],x[1]) \
-                                      - B(x[0],x[1]) )
-      x[1] = x[1] + B(x[0], x[1])
+    S_v    = self.S.compute_vertex_values(self.mesh)
+    B_v    = self.B.compute_vertex_values(self.mesh)
+    x[:,1] = (x[:,1] / mesh_height) * (S_v - B_v) + B_v
+    self.reset_vert_operators()
     s = "    - done - "
     print_text(s, cls=self)
     
@@ -353,6 +342,50 @@ class LatModel(Model):
     pv[pv < 0] = 0.0
     self.assign_variable(self.p, p)
   
+  def get_vert_markers(self, d='up'):
+    """
+    Return the list of markers of ``self.ff`` on which the vertical operators
+    are started; the bed if ``d`` = 'up' and the surface if ``d`` = 'down'.
+    Only markers with at least one marked facet are returned.
+    """
+    if d == 'up':
+      markers = [(self.GAMMA_B_GND, self.N_GAMMA_B_GND),
+                 (self.GAMMA_B_FLT, self.N_GAMMA_B_FLT)]
+    elif d == 'down':
+      markers = [(self.GAMMA_S_GND, self.N_GAMMA_S_GND),
+                 (self.GAMMA_U_GND, self.N_GAMMA_U_GND),
+                 (self.GAMMA_S_FLT, self.N_GAMMA_S_FLT),
+                 (self.GAMMA_U_FLT, self.N_GAMMA_U_FLT)]
+    return [m for m, n in markers if n != 0]
+
+  def assemble_vert_operator(self, Q, d='up', kind='extrude'):
+    r"""
+    Assemble the matrix of the vertical operator over function space ``Q``
+    with the Dirichlet rows of :func:`get_vert_markers` in direction ``d``
+    applied, for ``kind`` = 'extrude' or 'integrate' :
+  
+    .. math::
+       
+       \pm \int_{\Omega} \frac{\partial v}{\partial z} \phi \ d\Omega
+
+    where the sign is negative only when integrating downwards.
+
+    :rtype: tuple of the :class:`~fenics.Matrix` and a 
+            :class:`~fenics.LUSolver` reusing its factorization
+    """
+    phi = TestFunction(Q)
+    w   = TrialFunction(Q)
+    if kind == 'integrate' and d == 'down':
+      a = -w.dx(1) * phi * dx
+    else:
+      a =  w.dx(1) * phi * dx
+    A   = assemble(a)
+    for m in self.get_vert_markers(d):
+      DirichletBC(Q, 0.0, self.ff, m).apply(A)
+    solver = LUSolver(A)
+    solver.parameters['reuse_factorization'] = True
+    return A, solver
+  
   def vert_extrude(self, u, d='up', Q='self'):
     r"""
     This extrudes a function *u* vertically in the direction *d* = 'up' or
@@ -364,78 +397,74 @@ class LatModel(Model):
        v|_b = u
 
     """
-    s = "::: extruding function %s :::" % d
+    return self.vert_extrude_many([u], d=d, Q=Q)[0]
+  
+  def vert_extrude_many(self, us, d='up', Q='self'):
+    """
+    Extrude each of the list of functions or UFL expressions <us> vertically
+    in the direction <d> = 'up' or 'down', as in :func:`vert_extrude`.  The
+    operator is assembled and factored once and only the boundary values 
+    change for each of <us>.
+
+    :rtype: list of extruded :class:`~fenics.Function`\s
+    """
+    s = "::: extruding %i function(s) %s :::" % (len(us), d)
     print_text(s, cls=self)
     if type(Q) != FunctionSpace:
       Q  = self.Q
-    ff   = self.ff
-    phi  = TestFunction(Q)
-    v    = TrialFunction(Q)
-    a    = v.dx(1) * phi * dx
-    L    = DOLFIN_EPS * phi * dx
-    bcs  = []
-    # extrude bed (ff = 3,5) 
-    if d == 'up':
-      if self.N_GAMMA_B_GND != 0:
-        bcs.append(DirichletBC(Q, u, ff, self.GAMMA_B_GND))  # grounded
-      if self.N_GAMMA_B_FLT != 0:
-        bcs.append(DirichletBC(Q, u, ff, self.GAMMA_B_FLT))  # shelves
-    # extrude surface (ff = 2,6) 
-    elif d == 'down':
-      if self.N_GAMMA_S_GND != 0:
-        bcs.append(DirichletBC(Q, u, ff, self.GAMMA_S_GND))  # grounded
-      if self.N_GAMMA_U_GND != 0:
-        bcs.append(DirichletBC(Q, u, ff, self.GAMMA_U_GND))  # grounded
-      if self.N_GAMMA_S_FLT != 0:
-        bcs.append(DirichletBC(Q, u, ff, self.GAMMA_S_FLT))  # shelves
-      if self.N_GAMMA_U_FLT != 0:
-        bcs.append(DirichletBC(Q, u, ff, self.GAMMA_U_FLT))  # shelves
-    try:
-      name = '%s extruded %s' % (u.name(), d)
-    except AttributeError:
-      name = 'extruded'
-    v    = Function(Q, name=name)
-    solve(a == L, v, bcs, annotate=False)
-    print_min_max(v, 'extruded function')
-    return v
+    A, solver = self.get_vert_operator(Q, d, 'extrude')
+    b0        = assemble(DOLFIN_EPS * TestFunction(Q) * dx)
+    vs        = []
+    for u in us:
+      try:
+        name = '%s extruded %s' % (u.name(), d)
+      except AttributeError:
+        name = 'extruded'
+      if not isinstance(u, (float, int, GenericFunction)):
+        u = project(u, Q, annotate=False)
+      v = Function(Q, name=name)
+      b = b0.copy()
+      for m in self.get_vert_markers(d):
+        DirichletBC(Q, u, self.ff, m).apply(b)
+      solver.solve(v.vector(), b, annotate=False)
+      print_min_max(v, 'extruded function')
+      vs.append(v)
+    return vs
   
   def vert_integrate(self, u, d='up', Q='self'):
     """
     Integrate <u> from the bed to the surface.
     """
-    s = "::: vertically integrating function :::"
+    return self.vert_integrate_many([u], d=d, Q=Q)[0]
+  
+  def vert_integrate_many(self, us, d='up', Q='self'):
+    """
+    Vertically integrate each of the list of functions or UFL expressions
+    <us> in the direction <d> = 'up' or 'down', as in :func:`vert_integrate`.
+    The operator is assembled and factored once and only the right-hand side
+    changes for each of <us>.
+
+    :rtype: list of integrated :class:`~fenics.Function`\s
+    """
+    s = "::: vertically integrating %i function(s) :::" % len(us)
     print_text(s, cls=self)
 
     if type(Q) != FunctionSpace:
       Q = self.Q
-    ff  = self.ff
-    phi = TestFunction(Q)
-    v   = TrialFunction(Q)
-    bcs = []
-    # integral is zero on bed (ff = 3,5) 
-    if d == 'up':
-      if self.N_GAMMA_B_GND != 0:
-        bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_B_GND))  # grounded
-      if self.N_GAMMA_B_FLT != 0:
-        bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_B_FLT))  # shelves
-      a      = v.dx(1) * phi * dx
-    # integral is zero on surface (ff = 2,6) 
-    elif d == 'down':
-      if self.N_GAMMA_S_GND != 0:
-        bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_S_GND))  # grounded
-      if self.N_GAMMA_U_GND != 0:
-        bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_U_GND))  # grounded
-      if self.N_GAMMA_U_FLT != 0:
-        bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_U_FLT))  # shelves
-      if self.N_GAMMA_S_FLT != 0:
-        bcs.append(DirichletBC(Q, 0.0, ff, self.GAMMA_S_FLT))  # shelves
-      a      = -v.dx(1) * phi * dx
-    L      = u * phi * dx
-    name   = 'value integrated %s' % d 
-    v      = Function(Q, name=name)
-    solve(a == L, v, bcs, annotate=False)
-    print_min_max(v, 'vertically integrated function')
-    return v
+    A, solver = self.get_vert_operator(Q, d, 'integrate')
+    phi       = TestFunction(Q)
+    bcs       = [DirichletBC(Q, 0.0, self.ff, m) \
+                 for m in self.get_vert_markers(d)]
+    vs        = []
+    for u in us:
+      v = Function(Q, name='value integrated %s' % d)
+      b = assemble(u * phi * dx)
+      for bc in bcs:
+        bc.apply(b)
+      solver.solve(v.vector(), b, annotate=False)
+      print_min_max(v, 'vertically integrated function')
+      vs.append(v)
+    return vs
 
   def calc_vert_average(self, u):
     """
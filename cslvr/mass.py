@@ -209,6 +209,7 @@ class FreeSurface(Mass):
       model.assign_variable(S, S_2[d2v])
      
       mesh.coordinates()[:, 2] = sigma.compute_vertex_values()*(S_2 - B_a) + B_a
+      model.reset_vert_operators()
       if config['periodic_boundary_conditions']:
         temp = (S_2[d2v] - S_0[d2v])/dt * sigma.vector().get_local()
         model.assign_variable(mhat_non, temp)
@@ -540,6 +541,7 @@ class FirnMass(Mass):
     model.assign_variable(model.m,   model.mp)
     model.mesh.coordinates()[:,0][model.index] = model.z # update the mesh coor
     model.mesh.bounding_box_tree().build(model.mesh)     # rebuild the mesh tree
+    model.reset_vert_operators()                         # the mesh has moved
 
 
 
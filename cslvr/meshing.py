@@ -1,13 +1,22 @@
 import subprocess
+import sys
 import inspect
 import os
+import shutil
+import tempfile
+import numpy           as np
+from hashlib           import sha1
 from PIL import Image
-from gmshpy            import GModel, GmshSetOption, FlGui
+from gmshpy            import GModel, GmshSetOption, GmshMergeFile, FlGui, \
+                              PView
 from scipy.interpolate import RectBivariateSpline
 from pylab             import array, linspace, ones, meshgrid, figure, \
                               size, hstack, vstack, argmin, zeros, shape, \
-                              sqrt, show
-from fenics            import Mesh, MeshEditor, Point, File, XDMFFile
+                              sqrt, show, asarray, column_stack, tile, \
+                              repeat, arange, minimum, maximum, where, \
+                              searchsorted
+from fenics            import Mesh, MeshEditor, Point, File, XDMFFile, \
+                              HDF5File, mpi_comm_world, mpi_comm_self
 from pyproj            import transform
 from cslvr.inputoutput import print_text, print_min_max
 #from scipy.spatial     import ConvexHull
@@ -430,33 +439,41 @@ class MeshGenerator(object):
 
   def convert_msh_to_xml(self, mshfile, xmlfile):
     """
-    convert <mshfile> .msh file to .xml file <xmlfile> via dolfin-convert.
+    convert <mshfile> .msh file to .xml.gz file <xmlfile>, read in bulk 
+    with :func:`read_gmsh`.
     """
-    msh = self.direc + mshfile + '.msh'
-    xml = self.direc + xmlfile + '.xml'
-
-    cmd = 'dolfin-convert ' + msh + ' ' + xml
-    s   = "\nExecuting :\n\n\t %s\n\n" % cmd
-    print_text(s, self.color)
-    subprocess.call(cmd.split())
-    
-    cmd = 'gzip -f ' + xml
-    s   = "\nExecuting :\n\n\t %s\n\n" % cmd
+    msh  = self.direc + mshfile + '.msh'
+    xml  = self.direc + xmlfile + '.xml.gz'
+    s    = "::: converting %s to %s :::" % (msh, xml)
     print_text(s, self.color)
-    subprocess.call(cmd.split())
+    mesh = build_mesh(*read_gmsh(msh))
+    File(xml) << mesh
 
   def convert_msh_to_xdmf(self, mshfile, xdmffile):
     """
     convert <mshfile> .msh file to .xdmf file <xdmffile>.
     """
-    self.convert_msh_to_xml(mshfile, xdmffile)
-
+    msh       = self.direc + mshfile  + '.msh'
     xdmf      = self.direc + xdmffile + '.xdmf'
-    xml       = self.direc + xmlfile  + '.xml.gz'
-    mesh      = Mesh(xml)
+    s         = "::: converting %s to %s :::" % (msh, xdmf)
+    print_text(s, self.color)
+    mesh      = build_mesh(*read_gmsh(msh))
     mesh_file = XDMFFile(mesh.mpi_comm(), xdmf)
     mesh_file.write(mesh)
 
+  def convert_msh_to_hdf5(self, mshfile, h5file):
+    """
+    convert <mshfile> .msh file to .h5 file <h5file>, with the mesh saved 
+    as dataset 'mesh'.  Returns the mesh.
+    """
+    msh  = self.direc + mshfile + '.msh'
+    h5   = self.direc + h5file  + '.h5'
+    s    = "::: converting %s to %s :::" % (msh, h5)
+    print_text(s, self.color)
+    mesh = build_mesh(*read_gmsh(msh))
+    write_mesh_hdf5(mesh, h5)
+    return mesh
+
 
 class linear_attractor(object):
   r"""
@@ -535,6 +552,29 @@ class linear_attractor(object):
         lc = l_max
     return lc
 
+  def grid(self, x, y):
+    """
+    Method which evaluates this linear attractor over a grid.
+
+    Args:
+
+      :x:      the array of x-coordinates of the grid
+      :y:      the array of y-coordinates of the grid
+
+    Returns:
+    
+      :lc:     array of characteristic radii, indexed by x and then y
+    """
+    l_min = self.l_min
+    l_max = self.l_max
+    f     = self.field
+    v     = self.spline(x,y)
+    if self.inv:
+      lc = where(v < self.f_max, l_max - (l_max - l_min) / f.max() * v, l_min)
+    else:
+      lc = where(v < self.f_max, l_min + (l_max - l_min) / f.max() * v, l_max)
+    return lc
+
 class static_attractor(object):
   """
   """
@@ -559,6 +599,38 @@ class static_attractor(object):
       lc = self.c * 1/self.spline(x,y)[0][0]
     return lc
 
+  def grid(self, x, y):
+    """
+    Evaluate this attractor over the grid with coordinates <x> and <y>, 
+    indexed by x and then y.
+    """
+    if not self.inv:
+      lc = self.c * self.spline(x,y)
+    else:
+      lc = self.c * 1/self.spline(x,y)
+    return lc
+
+
+def field_l_min(f):
+  """
+  Return the minimum cell size of the field <f>, an attractor or field 
+  object or its ``op`` method, or None if it has none.
+  """
+  f = getattr(f, '__self__', f)
+  if hasattr(f, 'l_min'):
+    return f.l_min
+  l = [field_l_min(g) for g in getattr(f, 'f_list', [])]
+  l = [l_i for l_i in l if l_i is not None]
+  return min(l) if len(l) > 0 else None
+
+
+def eval_field_grid(f, x, y):
+  """
+  Evaluate the field <f>, an attractor or field object or its ``op`` 
+  method, over the grid with coordinates <x> and <y>.
+  """
+  return getattr(f, '__self__', f).grid(x, y)
+
 
 class min_field(object):
   """
@@ -573,10 +645,13 @@ class min_field(object):
       l.append(f(x,y,z,entity))
     return min(l)
 
+  def grid(self, x, y):
+    return minimum.reduce([eval_field_grid(f, x, y) for f in self.f_list])
+
 
 class max_field(object):
   """
-  Return the minimum of a list of attactor operator fields <f_list>.
+  Return the maximum of a list of attactor operator fields <f_list>.
   """
   def __init__(self, f_list):
     self.f_list = f_list
@@ -587,8 +662,17 @@ class max_field(object):
       l.append(f(x,y,z,entity))
     return max(l)
 
+  def grid(self, x, y):
+    return maximum.reduce([eval_field_grid(f, x, y) for f in self.f_list])
+
 
 class MeshRefiner(object):
+  """
+  The attractor and min/max fields added are evaluated at once over the 
+  grid of the refinement data covering the geometry when the mesh is 
+  generated, and passed to gmsh as a background mesh view, so that gmsh
+  does not call back into Python while meshing.
+  """
 
   def __init__(self, di, fn, gmsh_file_name):
     """
@@ -602,16 +686,42 @@ class MeshRefiner(object):
     self.field  = di.data[fn].T
     print_min_max(self.field, 'refinement field [m]')
 
+    # the meshes are cached by the geometry and the files it includes, the 
+    # data, the gmsh options set, and the fields added :
+    self.key       = sha1()
+    self.field_ids = {}
+    for geo in geo_files(gmsh_file_name + '.geo'):
+      with open(geo) as f:
+        self.key.update(geo + f.read())
+    for a in (di.x, di.y, self.field):
+      self.key.update(np.ascontiguousarray(a).tostring())
+
     self.spline = RectBivariateSpline(di.x, di.y, self.field, kx=1, ky=1)
+    self.x      = di.x
+    self.y      = di.y
+    self.fields = []     # the fields added, by index
+    self.background = None
+
+    self.gmsh_file_name = gmsh_file_name
 
     #load the mesh into a GModel
     self.m = GModel.current()
     self.m.load(gmsh_file_name + '.geo')
 
     # set some parameters :
-    GmshSetOption("Mesh", "CharacteristicLengthFromPoints", 0.0)
-    GmshSetOption("Mesh", "CharacteristicLengthExtendFromBoundary", 0.0)
-    GmshSetOption("Mesh", "Smoothing", 100.0)
+    self.set_option("Mesh", "CharacteristicLengthFromPoints", 0.0)
+    self.set_option("Mesh", "CharacteristicLengthExtendFromBoundary", 0.0)
+    self.set_option("Mesh", "Smoothing", 100.0)
+
+  def set_option(self, category, name, value):
+    """
+    Set the gmsh option <category>.<name> to <value>, recording it in the 
+    key of the cached mesh.  Options changing the mesh must be set here
+    rather than with GmshSetOption, or the cached mesh will not be 
+    regenerated when they change.
+    """
+    GmshSetOption(category, name, value)
+    self.key.update(repr(('option', category, name, value)))
 
   def add_linear_attractor(self, f_max, l_min, l_max, inv):
     """
@@ -627,7 +737,7 @@ class MeshRefiner(object):
     # field, f_max, l_min, l_max, hard_cut=false, inv=true
     a   = linear_attractor(self.spline, self.field, f_max, l_min, l_max,
                            inv=inv)
-    aid = self.m.getFields().addPythonField(a.op)
+    aid = self.add_field(a, ('linear', f_max, l_min, l_max, inv))
     return a,aid
 
   def add_static_attractor(self, c=1, inv=False):
@@ -641,7 +751,7 @@ class MeshRefiner(object):
     """
     # field, f_max, l_min, l_max, hard_cut=false, inv=true
     a   = static_attractor(self.spline, c, inv)
-    aid = self.m.getFields().addPythonField(a.op)
+    aid = self.add_field(a, ('static', c, inv))
     return a,aid
 
   def add_min_field(self, op_list):
@@ -649,67 +759,477 @@ class MeshRefiner(object):
     Create a miniumum field of attactor operator lists <op_list>.
     """
     mf  = min_field(op_list)
-    mid = self.m.getFields().addPythonField(mf.op)
+    mid = self.add_field(mf, ('min', map(self.get_field_id, op_list)))
+    return mid
+
+  def add_max_field(self, op_list):
+    """
+    Create a maximum field of attactor operator lists <op_list>.
+    """
+    mf  = max_field(op_list)
+    mid = self.add_field(mf, ('max', map(self.get_field_id, op_list)))
     return mid
 
-  def set_background_field(self, idn):
+  def add_field(self, f, params):
+    """
+    Add the field object <f> created with parameters <params>, recording it
+    in the key of the cached mesh, and return its index.
+    """
+    idn = len(self.fields)
+    self.fields.append(f)
+    self.field_ids[id(f)] = idn
+    self.key.update(repr((idn,) + params))
+    return idn
+
+  def get_field_id(self, op):
+    """
+    Return the index of the field whose operator is <op>.
+    """
+    return self.field_ids.get(id(getattr(op, '__self__', op)), repr(op))
+
+  def set_background_field(self, idn, stride=None):
+    """
+    Set the background field to that of field index <idn>, evaluated over 
+    every <stride> points of the grid of the refinement data.  If <stride>
+    is None, the grid is sampled no finer than the minimum cell size of the
+    field, or every point if it has none.  The field is evaluated by 
+    :func:`finish` only when the mesh is to be generated.
+    """
+    self.background = (idn, stride)
+    self.key.update(repr(('background', idn, stride)))
+
+  def merge_background_field(self):
     """
-    Set the background field to that of field index <idn>.
+    Evaluate the background field set by :func:`set_background_field` over
+    the grid of the refinement data covering the bounding box of the 
+    geometry, write it to the binary gmsh file 
+    <gmsh_file_name>_background.msh with :func:`write_background_view`, and
+    merge it into the gmsh session as the background mesh.
     """
-    self.m.getFields().setBackgroundFieldId(idn)
+    idn, stride = self.background
+    dx    = abs(self.x[1] - self.x[0])
+    if stride is None:
+      l_min  = field_l_min(self.fields[idn])
+      stride = 1 if l_min is None else max(1, int(l_min // dx))
+
+    # the grid covering the geometry, with a margin of two samples :
+    b     = self.m.bounds()
+    m     = 2 * stride * dx
+    i0    = max(searchsorted(self.x, b.min().x() - m) - 1, 0)
+    i1    = searchsorted(self.x, b.max().x() + m) + 1
+    j0    = max(searchsorted(self.y, b.min().y() - m) - 1, 0)
+    j1    = searchsorted(self.y, b.max().y() + m) + 1
+    x     = self.x[i0:i1:stride]
+    y     = self.y[j0:j1:stride]
+
+    s   = "::: evaluating background field over %i x %i grid :::"
+    print_text(s % (len(x), len(y)), self.color)
+    lc  = self.fields[idn].grid(x, y)
+    print_min_max(lc, 'background cell size [m]')
+
+    # merging a mesh may make a new model current, so restore ours, and 
+    # find the index of the view just merged by its unique name :
+    name = 'background_' + self.key.hexdigest()[:16]
+    msh  = self.gmsh_file_name + '_background.msh'
+    write_background_view(x, y, lc, msh, name)
+    GmshMergeFile(msh)
+    GModel.setCurrent(self.m)
+    self.m.getFields().setBackgroundMesh(PView.getViewByName(name).getIndex())
 
-  def finish(self, gui=True, dim=3, out_file_name='mesh'):
+  def finish(self, gui=True, dim=3, out_file_name='mesh', binary=False):
     """
     Finish and create the .msh file.  If <gui> is True, run the gui program,
     Otherwise, create the .msh file with dimension <dim> and filename
-    <out_file_name>.msh.
+    <out_file_name>.msh, in gmsh's binary format if <binary> is True.
+
+    If a mesh was already generated without the GUI from the same .geo 
+    file and the files it includes, refinement data, options set with 
+    :func:`set_option`, and fields, it is not generated again, and the 
+    conversion methods load it from <out_file_name>.h5 instead.  The key 
+    of the mesh in <out_file_name>.h5 is kept in <out_file_name>.key, and 
+    both are overwritten when the mesh changes.  Meshes saved from the GUI
+    are never cached.
     """
     self.out_file_name = out_file_name
+    self.key_file      = out_file_name + '.key'
+
+    key = self.key.copy()
+    key.update(repr(('dim', dim, 'binary', binary)))
+    self.cache_key = key.hexdigest()
 
     #launch the GUI
     if gui:
+      self.cache_key = None
+      if self.background is not None:
+        self.merge_background_field()
       print_text("::: opening GUI :::", self.color)
       FlGui.instance().run()
 
+    # the mesh is unchanged, so use the cache :
+    elif self.is_cached():
+      s    = "::: mesh unchanged, using cached %s.h5 :::" % out_file_name
+      print_text(s, self.color)
+
     # instead of starting the GUI, we could generate the mesh and save it
     else:
+      if self.background is not None:
+        self.merge_background_field()
       s    = "::: writing %s.msh :::" % out_file_name
       print_text(s, self.color)
+      GmshSetOption("Mesh", "Binary", float(binary))
       self.m.mesh(dim)
       self.m.save(out_file_name + ".msh")
-  
-  def convert_msh_to_xml(self):
+
+  def is_cached(self):
+    """
+    Return True if ``self.out_file_name``.h5 holds the mesh last generated 
+    by :func:`finish`.
     """
-    convert ``self.out_file_name``.msh file to .xml file 
-    ``self.out_file_name``.xml via dolfin-convert.
+    if self.cache_key is None or not os.path.exists(self.key_file) \
+       or not os.path.exists(self.out_file_name + '.h5'):
+      return False
+    with open(self.key_file) as f:
+      return f.read().strip() == self.cache_key
+
+  def convert_msh_to_hdf5(self):
+    """
+    convert ``self.out_file_name``.msh file to the .h5 file 
+    ``self.out_file_name``.h5, with the mesh saved as dataset 'mesh', read
+    in bulk with :func:`read_gmsh`.  Unless the mesh was made in the GUI,
+    the .h5 file is the cache, and is loaded directly if the mesh was not 
+    generated again by :func:`finish`.  Returns the mesh.
     """
     msh = self.out_file_name + '.msh'
-    xml = self.out_file_name + '.xml'
+    h5  = self.out_file_name + '.h5'
 
-    cmd = 'dolfin-convert ' + msh + ' ' + xml
-    s   = "\nExecuting :\n\n\t %s\n\n" % cmd
-    print_text(s, self.color)
-    subprocess.call(cmd.split())
-    
-    cmd = 'gzip -f ' + xml
-    s   = "\nExecuting :\n\n\t %s\n\n" % cmd
+    if self.is_cached():
+      s    = "::: loading cached mesh %s :::" % h5
+      print_text(s, self.color)
+      return read_mesh_hdf5(h5)
+
+    s    = "::: converting %s to %s :::" % (msh, h5)
     print_text(s, self.color)
-    subprocess.call(cmd.split())
+    mesh = build_mesh(*read_gmsh(msh))
+    write_mesh_hdf5(mesh, h5)
+
+    # record the key of the mesh now in the .h5 file, or forget a stale one :
+    if self.cache_key is not None:
+      with open(self.key_file, 'w') as f:
+        f.write(self.cache_key + '\n')
+    elif os.path.exists(self.key_file):
+      os.remove(self.key_file)
+    return mesh
+  
+  def convert_msh_to_xml(self):
+    """
+    convert ``self.out_file_name``.msh file to .xml.gz file 
+    ``self.out_file_name``.xml.gz, through :func:`convert_msh_to_hdf5`.
+    """
+    mesh = self.convert_msh_to_hdf5()
+    File(self.out_file_name + '.xml.gz') << mesh
 
   def convert_msh_to_xdmf(self):
     """
     convert ``self.out_file_name``.msh file to .xdmf file 
-    ``self.out_file_name``.xdmf via dolfin-convert.
+    ``self.out_file_name``.xdmf, through :func:`convert_msh_to_hdf5`.
     """
-    self.convert_msh_to_xml()
-
+    mesh      = self.convert_msh_to_hdf5()
     xdmf      = self.out_file_name + '.xdmf'
-    xml       = self.out_file_name + '.xml.gz'
-    mesh      = Mesh(xml)
     mesh_file = XDMFFile(mesh.mpi_comm(), xdmf)
     mesh_file.write(mesh)
 
 
+def geo_files(filename):
+  """
+  Returns the list of the gmsh .geo file <filename> and the files it 
+  includes or merges, recursively, as far as they exist.
+  """
+  files = [filename]
+  for f in files:
+    d = os.path.dirname(f)
+    with open(f) as geo:
+      for line in geo:
+        w = line.strip().split(None, 1)
+        if len(w) == 2 and w[0] in ('Include', 'Merge'):
+          inc = os.path.join(d, w[1].strip().rstrip(';').strip().strip('"'))
+          if os.path.isfile(inc) and inc not in files:
+            files.append(inc)
+  return files
+
+
+def write_background_view(x, y, lc, filename, name='background'):
+  """
+  Write the cell sizes <lc> over the grid with coordinates <x> and <y>, 
+  indexed by x and then y, to the binary gmsh version 2 mesh file 
+  <filename> of the quadrangles of the grid, with <lc> as the node data of 
+  the view <name>.  The arrays are written whole, without formatting.
+  """
+  nx, ny = len(x), len(y)
+  n      = nx * ny
+  i, j   = meshgrid(arange(nx), arange(ny), indexing='ij')
+
+  # the nodes, numbered from one in the order of lc :
+  nodes      = np.empty(n, np.dtype([('n', '<i4'), ('x', '<f8', (3,))]))
+  nodes['n'] = arange(1, n + 1)
+  nodes['x'] = column_stack((x[i.ravel()], y[j.ravel()], np.zeros(n)))
+
+  # the quadrangles, counter-clockwise from their lower-left node :
+  k          = (i[:-1,:-1] * ny + j[:-1,:-1] + 1).ravel()
+  m          = len(k)
+  quads      = column_stack((arange(1, m + 1), np.zeros(m), np.ones(m),
+                             k, k + ny, k + ny + 1, k + 1)).astype('<i4')
+
+  values      = np.empty(n, np.dtype([('n', '<i4'), ('v', '<f8')]))
+  values['n'] = nodes['n']
+  values['v'] = np.asarray(lc, dtype=float).ravel()
+
+  f = open(filename, 'wb')
+  f.write('$MeshFormat\n2.2 1 8\n')
+  np.array([1], '<i4').tofile(f)
+  f.write('\n$EndMeshFormat\n$Nodes\n%i\n' % n)
+  nodes.tofile(f)
+  f.write('\n$EndNodes\n$Elements\n%i\n' % m)
+  np.array([3, m, 2], '<i4').tofile(f)
+  quads.tofile(f)
+  f.write('\n$EndElements\n$NodeData\n1\n"%s"\n1\n0.0\n3\n0\n1\n%i\n' \
+          % (name, n))
+  values.tofile(f)
+  f.write('\n$EndNodeData\n')
+  f.close()
+
+
+# number of vertices of each gmsh element type :
+gmsh_element_nodes = {1 : 2, 2 : 3, 3 : 4, 4 : 4, 5 : 8, 6 : 6, 7 : 5, 
+                      8 : 3, 9 : 6, 11 : 10, 15 : 1}
+
+def read_gmsh(filename):
+  """
+  Returns the vertex coordinates and the triangles, or if there are any, the
+  tetrahedra of the gmsh version 2 .msh file <filename>, in ASCII or binary
+  format.  The nodes are read with a single array operation, as are the 
+  runs of elements of the same type and number of tags.  The 
+  :math:`z`-coordinate is dropped from 2D meshes lying in the 
+  :math:`x,y`-plane.  
+
+  Physical groups are not carried into the mesh; if the file has any, the
+  number of elements tagged is logged, and the boundaries and subdomains
+  must be marked from the geometry instead.
+  """
+  with open(filename, 'rb') as f:
+    data = f.read()
+
+  def next_line(i):
+    j = data.index('\n', i)
+    return data[i:j], j + 1
+
+  i        = data.index('\n', data.index('$MeshFormat')) + 1
+  fmt, i   = next_line(i)
+  binary   = int(fmt.split()[1]) == 1
+  if binary:
+    i      = data.index('\n', i) + 1      # skip the endianness integer
+
+  # nodes :
+  i        = data.index('\n', data.index('$Nodes', i)) + 1
+  n, i     = next_line(i)
+  n_nodes  = int(n)
+  if binary:
+    dt     = np.dtype([('n', '<i4'), ('x', '<f8', (3,))])
+    nodes  = np.frombuffer(data, dt, n_nodes, i)
+    num    = nodes['n']
+    x      = nodes['x']
+    i     += dt.itemsize * n_nodes
+  else:
+    j      = data.index('$EndNodes', i)
+    nodes  = np.fromstring(data[i:j], sep=' ').reshape(n_nodes, 4)
+    num    = nodes[:,0].astype(int)
+    x      = nodes[:,1:]
+    i      = j
+
+  # gmsh node numbers to vertex indices :
+  index      = np.zeros(num.max() + 1, dtype=int)
+  index[num] = np.arange(n_nodes)
+
+  # elements and their physical tags, by type :
+  i        = data.index('\n', data.index('$Elements', i)) + 1
+  n, i     = next_line(i)
+  n_elems  = int(n)
+  elems    = {}
+  phys     = {}
+  if binary:
+    count  = 0
+    while count < n_elems:
+      t, n, n_tags = np.frombuffer(data, '<i4', 3, i)
+      w      = 1 + n_tags + gmsh_element_nodes[t]
+      block  = np.frombuffer(data, '<i4', n*w, i + 12).reshape(n, w)
+      elems.setdefault(t, []).append(block[:, 1 + n_tags:])
+      if n_tags > 0:
+        phys.setdefault(t, []).append(block[:, 1])
+      i     += 12 + 4*n*w
+      count += n
+  else:
+    j      = data.index('$EndElements', i)
+    a      = np.fromstring(data[i:j], dtype=int, sep=' ')
+    o      = 0
+    count  = 0
+    while count < n_elems:
+      # the run of elements with the type and number of tags of the next, 
+      # found by doubling the number of rows checked at once :
+      t, n_tags = a[o+1], a[o+2]
+      w      = 3 + n_tags + gmsh_element_nodes[t]
+      lim    = min(n_elems - count, (len(a) - o) // w)
+      m      = 1
+      while True:
+        m    = min(2*m, lim)
+        rows = a[o:o + m*w].reshape(m, w)
+        bad  = np.where((rows[:,1] != t) | (rows[:,2] != n_tags))[0]
+        if len(bad) > 0 or m == lim:
+          break
+      k      = bad[0] if len(bad) > 0 else m
+      rows   = rows[:k]
+      elems.setdefault(t, []).append(rows[:, 3 + n_tags:])
+      if n_tags > 0:
+        phys.setdefault(t, []).append(rows[:, 3])
+      o     += k*w
+      count += k
+
+  if 4 in elems:
+    t     = 4
+  elif 2 in elems:
+    t     = 2
+    if (x[:,2] == 0).all():
+      x   = x[:,:2]
+  else:
+    s = ">>> read_gmsh() FOUND NO TRIANGLES OR TETRAHEDRA IN %s <<<" % filename
+    print_text(s, 'red', 1)
+    sys.exit(1)
+  cells = np.vstack(elems[t])
+
+  # physical groups are dropped :
+  tagged = sum((np.concatenate(p) != 0).sum() for p in phys.values())
+  if tagged > 0:
+    s = "    - %i elements of physical groups in %s are not read -" \
+        % (tagged, filename)
+    print_text(s, 'red')
+
+  return np.ascontiguousarray(x, dtype=float), index[cells]
+
+
+def build_mesh(coords, cells):
+  """
+  Return a new :class:`~fenics.Mesh` of triangles or tetrahedra with vertex
+  coordinates <coords> and cell vertex indices <cells>, one row per 
+  vertex and cell, local to this process.  The arrays are written whole 
+  to a temporary XDMF file with :func:`write_mesh_arrays_xdmf`, from which
+  FEniCS builds the mesh in one call, keeping the order of the vertices 
+  and cells, so that no call is made per vertex or cell from Python.  If 
+  :mod:`h5py` is not installed, the vertices and cells are added one at a 
+  time with :func:`build_mesh_editor` instead.
+  """
+  try:
+    import h5py
+  except ImportError:
+    s = "    - h5py not installed, building mesh one cell at a time -"
+    print_text(s, 'red')
+    return build_mesh_editor(coords, cells)
+
+  tmp = tempfile.mkdtemp()
+  try:
+    xdmf = os.path.join(tmp, 'mesh.xdmf')
+    write_mesh_arrays_xdmf(coords, cells, xdmf)
+    mesh = Mesh(mpi_comm_self())
+    XDMFFile(mpi_comm_self(), xdmf).read(mesh)
+  finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+  return mesh
+
+
+def write_mesh_arrays_xdmf(coords, cells, filename):
+  """
+  Write the vertex coordinates <coords> and cell vertex indices <cells> of
+  a mesh of triangles or tetrahedra to the XDMF file <filename>, with the 
+  arrays saved by :mod:`h5py` to the HDF5 file of the same name ending in
+  .h5, beside it.
+  """
+  import h5py
+  n_c, n_v = cells.shape
+  n_p, dim = coords.shape
+  celltype = {3 : 'Triangle', 4 : 'Tetrahedron'}[n_v]
+  geometry = {2 : 'XY',       3 : 'XYZ'}[dim]
+  h5       = os.path.splitext(filename)[0] + '.h5'
+
+  f = h5py.File(h5, 'w')
+  f.create_dataset('topology', data=np.asarray(cells,  dtype='<i8'))
+  f.create_dataset('geometry', data=np.asarray(coords, dtype='<f8'))
+  f.close()
+
+  h5 = os.path.basename(h5)
+  f  = open(filename, 'w')
+  f.write('<?xml version="1.0"?>\n'
+          '<Xdmf Version="3.0">\n'
+          '  <Domain>\n'
+          '    <Grid Name="mesh" GridType="Uniform">\n'
+          '      <Topology NumberOfElements="%i" TopologyType="%s" '
+          'NodesPerElement="%i">\n'
+          '        <DataItem Dimensions="%i %i" NumberType="Int" '
+          'Precision="8" Format="HDF">%s:/topology</DataItem>\n'
+          '      </Topology>\n'
+          '      <Geometry GeometryType="%s">\n'
+          '        <DataItem Dimensions="%i %i" Format="HDF">'
+          '%s:/geometry</DataItem>\n'
+          '      </Geometry>\n'
+          '    </Grid>\n'
+          '  </Domain>\n'
+          '</Xdmf>\n'
+          % (n_c, celltype, n_v, n_c, n_v, h5, geometry, n_p, dim, h5))
+  f.close()
+
+
+def build_mesh_editor(coords, cells):
+  """
+  Return a new :class:`~fenics.Mesh` with vertex coordinates <coords> and
+  cell vertex indices <cells>, added one vertex and cell at a time with a 
+  :class:`~fenics.MeshEditor`.
+  """
+  n_verts = len(coords)
+  n_cells = len(cells)
+  mesh    = Mesh()
+  m       = MeshEditor()
+  m.open(mesh, cells.shape[1] - 1, coords.shape[1])
+  m.init_vertices(n_verts,n_verts)
+  m.init_cells(n_cells,n_cells)
+
+  # Copy vertex data into new mesh
+  for i,v in enumerate(coords.tolist()):
+    m.add_vertex(i,Point(*v))
+
+  # Copy cell data into new mesh
+  for j,c in enumerate(cells.tolist()):
+    m.add_cell(j,*c)
+
+  m.close()
+  return mesh
+
+
+def write_mesh_hdf5(mesh, filename):
+  """
+  Save <mesh> to the HDF5 file <filename> as dataset 'mesh'.
+  """
+  f = HDF5File(mesh.mpi_comm(), filename, 'w')
+  f.write(mesh, 'mesh')
+  f.close()
+
+
+def read_mesh_hdf5(filename):
+  """
+  Return the mesh saved as dataset 'mesh' in the HDF5 file <filename>.
+  """
+  mesh = Mesh()
+  f    = HDF5File(mpi_comm_world(), filename, 'r')
+  f.read(mesh, 'mesh', False)
+  f.close()
+  return mesh
+
+
 class MeshExtruder(object):
   """
   Due to extreme bugginess in the gmsh extrusion utilities, this class
@@ -721,79 +1241,72 @@ class MeshExtruder(object):
   Written by Douglas Brinkerhoff 14.01.25
   """
 
-  indirection_table = {0:[0,1,2,3,4,5],
-                       1:[1,2,0,4,5,3],
-                       2:[2,0,1,5,3,4],
-                       3:[3,5,4,0,2,1],
-                       4:[4,3,5,1,0,3],
-                       5:[5,4,3,2,1,0]}
+  indirection_table = array([[0,1,2,3,4,5],
+                             [1,2,0,4,5,3],
+                             [2,0,1,5,3,4],
+                             [3,5,4,0,2,1],
+                             [4,3,5,1,0,2],
+                             [5,4,3,2,1,0]])
 
   def __init__(self,mesh):
     # Accepts a dolfin mesh of dimension 2
     self.mesh = mesh
     self.n_v2 = mesh.num_vertices()
 
-    # Initialize tetrahedron array for extruded mesh
-    self.global_tets = array([-1,-1,-1,-1])
-
-  def extrude_mesh(self,l,z_offset):
-    # accepts the number of layers and the length of extrusion
-
-    mesh = self.mesh
-
-    # Extrude vertices
-    all_coords = []
-    for i in linspace(0,z_offset,l):
-      all_coords.append(hstack((mesh.coordinates(),i*ones((self.n_v2,1)))))
-    self.global_vertices = vstack(all_coords)
-
-    # Extrude cells (tris to tetrahedra)
-    for i in range(l-1):
-      for c in self.mesh.cells():
-        # Make a prism out of 2 stacked triangles
-        vertices = hstack((c+i*self.n_v2,c+(i+1)*self.n_v2))
-
-        # Determine prism orientation
-        smallest_vertex_index = argmin(vertices)
-
-        # Map to I-ordering of Dompierre et al.
-        mapping = self.indirection_table[smallest_vertex_index]
-
-        # Determine which subdivision scheme to use.
-        if min(vertices[mapping][[1,5]]) < min(vertices[mapping][[2,4]]):
-          local_tets = vstack((vertices[mapping][[0,1,2,5]],\
-                               vertices[mapping][[0,1,5,4]],\
-                               vertices[mapping][[0,4,5,3]]))
-        else:
-          local_tets = vstack((vertices[mapping][[0,1,2,4]],\
-                               vertices[mapping][[0,4,2,5]],\
-                               vertices[mapping][[0,4,5,3]]))
-        # Concatenate local tet to cell array
-        self.global_tets = vstack((self.global_tets,local_tets))
-
-    # Eliminate phantom initialization tet
-    self.global_tets = self.global_tets[1:,:]
+  def extrude_mesh(self, l, z_offset, sigma=None):
+    """
+    Extrude the footprint into ``l`` layers of vertices spanning heights 
+    0 to ``z_offset``, evenly spaced or at the fractions ``sigma`` of 
+    ``z_offset``, creating ``self.new_mesh``.  The coordinates and the 
+    tetrahedra of every layer of prisms are formed at once with array 
+    operations, and the mesh is filled by :func:`build_mesh`, so that the 
+    cost is linear in the number of cells.
+
+    :param l:        number of layers of vertices
+    :param z_offset: height of the extruded mesh
+    :param sigma:    increasing fractions of the height of each layer, from 
+                     0 to 1, evenly spaced by default
+    :type l:         int
+    :type z_offset:  float
+    :type sigma:     :class:`~numpy.ndarray`
+    """
+    if sigma is None:
+      sigma = linspace(0, 1, l)
+    sigma = asarray(sigma, dtype=float)
+    if len(sigma) != l:
+      s = ">>> extrude_mesh() REQUIRES ONE SIGMA VALUE PER LAYER <<<"
+      print_text(s, 'red', 1)
+      sys.exit(1)
+
+    # extrude vertices, layer by layer :
+    n     = self.n_v2
+    xy    = self.mesh.coordinates()[:,:2]
+    self.global_vertices = column_stack((tile(xy, (l,1)),
+                                         repeat(sigma*z_offset, n)))
+
+    # make a prism out of every pair of stacked triangles :
+    c     = self.mesh.cells()
+    k     = arange(l-1)[:,None,None] * n
+    prism = hstack((c, c + n))[None,:,:] + k
+    prism = prism.reshape(-1, 6)
+    idx   = arange(len(prism))[:,None]
+
+    # map to the I-ordering of Dompierre et al. from the smallest vertex :
+    mapping = self.indirection_table[argmin(prism, axis=1)]
+    v       = prism[idx, mapping]
+
+    # determine which subdivision scheme to use :
+    split   = (minimum(v[:,1], v[:,5]) < minimum(v[:,2], v[:,4]))[:,None]
+    tet_1   = where(split, v[:,[0,1,2,5]], v[:,[0,1,2,4]])
+    tet_2   = where(split, v[:,[0,1,5,4]], v[:,[0,4,2,5]])
+    tet_3   = v[:,[0,4,5,3]]
+    self.global_tets = hstack((tet_1, tet_2, tet_3)).reshape(-1, 4)
 
     # Query number of vertices and tets in new mesh
     self.n_verts = self.global_vertices.shape[0]
-    self.n_tets = self.global_tets.shape[0]
-
-    # Initialize new dolfin mesh of dimension 3
-    self.new_mesh = Mesh()
-    m = MeshEditor()
-    m.open(self.new_mesh,3,3)
-    m.init_vertices(self.n_verts,self.n_verts)
-    m.init_cells(self.n_tets,self.n_tets)
-
-    # Copy vertex data into new mesh
-    for i,v in enumerate(self.global_vertices):
-      m.add_vertex(i,Point(*v))
-
-    # Copy cell data into new mesh
-    for j,c in enumerate(self.global_tets):
-      m.add_cell(j,*c)
+    self.n_tets  = self.global_tets.shape[0]
 
-    m.close()
+    self.new_mesh = build_mesh(self.global_vertices, self.global_tets)
 
   def write_mesh_to_file(self,filename):
     # Output mesh
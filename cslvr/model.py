@@ -1,8 +1,12 @@
 from fenics               import *
 from dolfin_adjoint       import *
 from cslvr.inputoutput    import print_text, get_text, print_min_max
+from cslvr.helper         import get_unique_columns, evaluate_at_points, \
+                                 TransferOperator, PointProbe
+from collections          import OrderedDict
 from copy                 import copy
 from scipy.io             import savemat
+from matplotlib.tri       import Triangulation
 from ufl                  import indexed
 import numpy              as np
 import matplotlib.pyplot  as plt
@@ -30,6 +34,10 @@ class Model(object):
   :type order:         int
   :type use_periodic:  bool
   """
+
+  # parent mesh id and parent vertex indices of each boundary mesh formed,
+  # keyed by boundary mesh id, shared by all model instances :
+  submesh_vertices = {}
   
   def __init__(self, mesh, out_dir='./results/', order=1,
                use_periodic=False, **kwargs):
@@ -55,6 +63,15 @@ class Model(object):
     self.out_dir      = out_dir
     self.MPI_rank     = MPI.rank(mpi_comm_world())
     self.use_periodic = use_periodic
+    self.submesh_dofs = {}
+
+    # least-recently-used cache of submesh transfer operators :
+    self.transfer_operators  = OrderedDict()
+    self.transfer_cache_size = 16
+
+    # least-recently-used cache of located point sets :
+    self.probes              = OrderedDict()
+    self.probe_cache_size    = 16
     
     self.generate_constants()
     self.set_mesh(mesh)
@@ -252,7 +269,9 @@ class Model(object):
     f.read(self.ff,     'ff')
     f.read(self.cf,     'cf')
     f.read(self.ff_acc, 'ff_acc')
-    
+
+    # the vertical operators depend on the markers of self.ff :
+    self.reset_vert_operators()
     self.set_measures()
 
   def generate_pbc(self):
@@ -277,6 +296,7 @@ class Model(object):
       self.mesh = f
 
     self.dim   = self.mesh.ufl_cell().topological_dimension()
+    self.reset_vert_operators()
 
   def calculate_boundaries(self):
     """
@@ -1822,6 +1842,61 @@ class Model(object):
     """
     raiseNotDefined()
 
+  def get_vert_markers(self, d='up'):
+    """
+    Return the list of markers of ``self.ff`` on which the vertical operators
+    in direction ``d`` = 'up' or 'down' are started.
+
+    This method must be overwritten by the class inheriting this class.
+    """
+    raiseNotDefined()
+
+  def assemble_vert_operator(self, Q, d='up', kind='extrude'):
+    """
+    Assemble the matrix of the vertical operator ``kind`` = 'extrude' or 
+    'integrate' in direction ``d`` = 'up' or 'down' over function space
+    ``Q``, with its Dirichlet rows applied.
+
+    This method must be overwritten by the class inheriting this class.
+
+    :rtype: tuple of the :class:`~fenics.Matrix` and a 
+            :class:`~fenics.LUSolver` reusing its factorization
+    """
+    raiseNotDefined()
+
+  def reset_vert_operators(self):
+    """
+    Forget the vertical column indices and the vertical operators cached by
+    :func:`get_vert_operator`, the submesh transfer operators cached by 
+    :func:`get_transfer_operator`, and the point sets located by 
+    :func:`probe`.
+    This is called whenever the mesh, its geometry, or its boundary markers
+    are changed, and must be called by anything moving the vertices of 
+    ``self.mesh``.
+    """
+    self.columns        = {}
+    self.vert_operators = {}
+    self.transfer_operators.clear()
+    self.probes.clear()
+
+  def get_vert_operator(self, Q, d='up', kind='extrude'):
+    """
+    Return the vertical operator and its solver created by 
+    :func:`assemble_vert_operator`, cached by function space ``Q``, 
+    direction ``d``, operator ``kind``, and the boundary markers returned by
+    :func:`get_vert_markers`, until :func:`reset_vert_operators` is called, 
+    and so repeated calls cost only a back-substitution.
+
+    :rtype: tuple of the :class:`~fenics.Matrix` and 
+            :class:`~fenics.LUSolver`
+    """
+    key = (Q.id(), d, kind, tuple(self.get_vert_markers(d)))
+    if key not in self.vert_operators:
+      s = "    - assembling %s %s vertical operator -" % (kind, d)
+      print_text(s, cls=self.this)
+      self.vert_operators[key] = self.assemble_vert_operator(Q, d, kind)
+    return self.vert_operators[key]
+
   def calc_normal_vector(self):
     """
     Calculates the outward-pointing normal vector as a FEniCS function.
@@ -2023,10 +2098,169 @@ class Model(object):
     """
     s   = "::: assigning submesh variable :::"
     print_text(s, cls=self.this)
-    lg = LagrangeInterpolator()
-    lg.interpolate(u_to, u_from)
+
+    Q_to   = u_to.function_space()
+    Q_from = u_from.function_space()
+
+    # transfers to and from a boundary mesh are copies of the shared dofs :
+    dofs = self.get_submesh_dofs(Q_to, Q_from)
+    if dofs is not None:
+      u_to.vector().set_local(u_from.vector().array()[dofs])
+      u_to.vector().apply('insert')
+    elif self.get_submesh_dofs(Q_from, Q_to) is not None:
+      dofs       = self.get_submesh_dofs(Q_from, Q_to)
+      u_v        = u_to.vector().array()
+      u_v[dofs]  = u_from.vector().array()
+      u_to.vector().set_local(u_v)
+      u_to.vector().apply('insert')
+    else:
+      T = self.get_transfer_operator(Q_to, Q_from)
+      if T.usable:
+        T.apply(u_to, u_from)
+      else:
+        lg = LagrangeInterpolator()
+        lg.interpolate(u_to, u_from)
     print_min_max(u_to, u_to.name())
 
+  def get_transfer_operator(self, Q_to, Q_from):
+    """
+    Return the :class:`~helper.TransferOperator` interpolating functions of 
+    ``Q_from`` onto ``Q_to``.  The operators are cached by function space 
+    pair until :func:`reset_vert_operators` is called when a mesh moves; 
+    the least-recently used operator is evicted once more than 
+    ``self.transfer_cache_size`` are held.
+
+    :param Q_to:   function space to transfer to
+    :param Q_from: function space to transfer from
+    :type Q_to:    :class:`~fenics.FunctionSpace`
+    :type Q_from:  :class:`~fenics.FunctionSpace`
+    :rtype:        :class:`~helper.TransferOperator`
+    """
+    key = (Q_to.id(), Q_from.id())
+    T   = self.transfer_operators.pop(key, None)
+    if T is None:
+      s = "    - forming submesh transfer operator -"
+      print_text(s, cls=self.this)
+      T = TransferOperator(Q_from, Q_to)
+
+    self.transfer_operators[key] = T
+    while len(self.transfer_operators) > self.transfer_cache_size:
+      self.transfer_operators.popitem(last=False)
+    return T
+
+  def probe(self, functions, points, tol=1e-9):
+    """
+    Return the values of each of the functions ``functions`` at every row of 
+    the coordinate array ``points``, which must be the same on every process.
+    The points are located in the mesh and the basis functions evaluated 
+    there once with a :class:`~helper.PointProbe`, cached by mesh and point 
+    array, so that repeated probes with the same array are a sparse 
+    matrix-vector product each.  The array is recognized by identity, so it
+    must not be modified in place between probes, and the cache is cleared
+    by :func:`reset_vert_operators` when the mesh moves.  The 
+    least-recently used point set is evicted once more than 
+    ``self.probe_cache_size`` are held.  Probing many points in one call is
+    much faster than probing them one call at a time.
+
+    The values are gathered on the first process; the others return None.
+    Points outside the mesh have value ``nan``.
+
+    :param functions: a function or list of functions to evaluate
+    :param points:    array of coordinates, one point per row
+    :param tol:       distance relative to the mesh size within which points
+                      outside the mesh are assigned to the closest cell
+    :type functions:  :class:`~fenics.Function` or list
+    :type points:     :class:`~numpy.ndarray`
+    :type tol:        float
+    :rtype:           :class:`~numpy.ndarray` or list of them, one column per
+                      component for non-scalar functions
+    """
+    single = not isinstance(functions, (list, tuple))
+    if single: functions = [functions]
+
+    values = []
+    for u in functions:
+      mesh  = u.function_space().mesh()
+      key   = (mesh.id(), id(points), tol)
+      entry = self.probes.pop(key, None)
+
+      # every process must agree to rebuild, as the construction is collective;
+      # the entry keeps the array itself, so its id is not reused :
+      stale = float(entry is None or entry[0] is not points)
+      if MPI.max(mpi_comm_world(), stale) > 0:
+        s     = "    - locating %i probe points -" % len(points)
+        print_text(s, cls=self.this)
+        x     = np.ascontiguousarray(points, dtype=float)
+        entry = (points, PointProbe(mesh, x, tol))
+
+      self.probes[key] = entry
+      while len(self.probes) > self.probe_cache_size:
+        self.probes.popitem(last=False)
+      values.append(entry[1](u))
+
+    if single: values = values[0]
+    return values
+
+  def get_submesh_dofs(self, Q_sub, Q):
+    """
+    Return the array of the dofs of the function space ``Q`` corresponding to
+    each dof of ``Q_sub``, where ``Q_sub`` is defined over a boundary mesh of
+    the mesh of ``Q`` formed by 
+    :func:`~d3model.D3Model.form_boundary_meshes`.  If no such 
+    correspondence exists or either space is not a linear Lagrange space, 
+    ``None`` is returned.  The arrays are cached by function space.
+
+    :param Q_sub: boundary-mesh function space
+    :param Q:     parent-mesh function space
+    :type Q_sub:  :class:`~fenics.FunctionSpace`
+    :type Q:      :class:`~fenics.FunctionSpace`
+    :rtype:       :class:`~numpy.ndarray` or ``None``
+    """
+    key = (Q_sub.id(), Q.id())
+    if key not in self.submesh_dofs:
+      dofs  = None
+      par   = Model.submesh_vertices.get(Q_sub.mesh().id())
+      if par is not None and par[0] == Q.mesh().id() \
+         and MPI.size(mpi_comm_world()) == 1 \
+         and Q_sub.dim() == Q_sub.mesh().num_vertices() \
+         and Q.dim()     == Q.mesh().num_vertices() \
+         and Q_sub.ufl_element().family() == 'Lagrange' \
+         and Q.ufl_element().family()     == 'Lagrange':
+        dofs = np.empty(Q_sub.dim(), dtype=np.intc)
+        dofs[vertex_to_dof_map(Q_sub)] = vertex_to_dof_map(Q)[par[1]]
+      self.submesh_dofs[key] = dofs
+    return self.submesh_dofs[key]
+
+  def evaluate_by_column(self, f, Q, axis):
+    """
+    Return the array of dof values over the function space ``Q`` of the
+    expression ``f``, which must not vary along the vertical coordinate 
+    ``axis``, evaluating ``f`` only once at each vertical column of vertices
+    with :func:`~helper.evaluate_at_points`.  If ``f`` is already a 
+    :class:`~fenics.Function`, or ``Q`` is not a scalar linear Lagrange 
+    space over the local vertices, ``f`` is returned unchanged to be 
+    interpolated by :func:`assign_variable`.
+
+    :param f:    the expression to evaluate
+    :param Q:    the function space to evaluate over
+    :param axis: the index of the vertical coordinate
+    :type f:     :class:`~fenics.Expression` or :class:`~fenics.Constant`
+    :type Q:     :class:`~fenics.FunctionSpace`
+    :type axis:  int
+    """
+    e = Q.ufl_element()
+    if    isinstance(f, Function) or not isinstance(f, GenericFunction) \
+       or Q.num_sub_spaces() != 0 \
+       or e.family() != 'Lagrange' or e.degree() != 1 \
+       or Q.dim() != self.mesh.num_vertices():
+      return f
+    x        = self.mesh.coordinates()
+    col, inv = get_unique_columns(x, axis)
+    s = "    - evaluating expression at %i vertical columns -" % len(col)
+    print_text(s, cls=self.this)
+    f_v      = evaluate_at_points(f, x[col])[inv]
+    return f_v[dof_to_vertex_map(Q)]
+
   def assign_variable(self, u, var, annotate=False):
     """
     Manually assign the values from ``var`` to ``u``.  The parameter ``var``
@@ -2133,35 +2367,104 @@ class Model(object):
       f = XDMFFile(self.out_dir + 'xdmf/' +  name + '.xdmf')
       f.write(u)
 
-  def save_matlab(self, u, di, filename, val=np.e):
+  def save_matlab(self, u, di, filename, val=np.e, block_size=1000000):
     """
     Create Matlab version 4 file output of regular gridded data contained by 
-    ``f``.  Currently, this function only works for 2D :math:`x,y`-plane data.
+    ``u``.  Currently, this function only works for 2D :math:`x,y`-plane data,
+    i.e., functions over a 2D mesh or the surface or basal mesh of a 3D mesh.
+
+    The triangles of the mesh are indexed once by the trifinder of a 
+    :class:`~matplotlib.tri.Triangulation`, rather than a 
+    :class:`~fenics.BoundingBoxTree`, which locates only one point per call
+    from Python.  Every grid point is located with a vectorized search and 
+    the vertex values of ``u`` are linearly interpolated there, in blocks of grid rows of about ``block_size`` 
+    points, so that the memory required by the search stays bounded.  In 
+    parallel, the values found on every partition are reduced block by block
+    to the first process, which alone holds the grid and writes the file.
 
     :param u:  a :class:`~fenics.Function`, to be mapped onto the regular 
                grid used by ``di``
     :param di: a :class:`~inputoutput.DataInput` object
     :param filename: filename to save as
     :param val:      value to make values outside of mesh, default :math:`e`
-    :type u:         :class:`~fenics.Function` or :class:`~fenics.GenericVector`
+    :param block_size: number of grid points evaluated at a time
+    :type u:         :class:`~fenics.Function`
     :type filename:  string
     :type val:       float
+    :type block_size: int
     :rtype:          MatLab file ``<self.out_dir>/matlab/<filename>.mat``.
     """
-    fa   = zeros( (di.ny, di.nx) )
     s    = "::: writing %i x %i matlab matrix file %s.mat :::"
     text = s % (di.ny, di.nx, filename)
     print_text(text, cls=self.this)
-    parameters['allow_extrapolation'] = True
-    dim = f.geometric_dimension()
-    for j,x in enumerate(di.x):
-      for i,y in enumerate(di.y):
-        try:
-          fa[i,j] = f(x,y)
-        except:
-          fa[i,j] = val
-    print_min_max(fa, filename + 'matrix')
+
+    mesh = u.function_space().mesh()
+    if u.value_rank() != 0 or mesh.ufl_cell().topological_dimension() != 2:
+      s = ">>> save_matlab() REQUIRES A SCALAR FUNCTION OVER A TRIANGLE MESH <<<"
+      print_text(s, 'red', 1)
+      sys.exit(1)
+
+    # index the triangles of this partition in the x,y-plane :
+    xy     = mesh.coordinates()[:,:2]
+    cells  = mesh.cells()
+    u_v    = u.compute_vertex_values(mesh)
+    finder = None
+    if len(cells) > 0:
+      finder = Triangulation(xy[:,0], xy[:,1], cells).get_trifinder()
+
+    comm   = mesh.mpi_comm()
+    rank   = MPI.rank(comm)
+    size   = MPI.size(comm)
+    if size > 1:
+      from mpi4py import MPI as mpi4py_MPI
+      comm = comm.tompi4py()
+
+    fa   = np.empty((di.ny, di.nx)) if rank == 0 else None
+    n    = max(1, block_size // di.nx)
+    for i in range(0, di.ny, n):
+      x, y  = np.meshgrid(di.x, di.y[i:i+n])
+      x     = x.ravel()
+      y     = y.ravel()
+      v     = np.zeros(len(x))
+      hit   = np.zeros(len(x))
+
+      if finder is not None:
+        t     = finder(x, y)
+        k     = np.where(t >= 0)[0]
+        c     = cells[t[k]]
+        x0,y0 = xy[c[:,0]].T
+        x1,y1 = xy[c[:,1]].T
+        x2,y2 = xy[c[:,2]].T
+        det   = (x1 - x0)*(y2 - y0) - (x2 - x0)*(y1 - y0)
+        l1    = ((x[k] - x0)*(y2 - y0) - (x2 - x0)*(y[k] - y0)) / det
+        l2    = ((x1 - x0)*(y[k] - y0) - (x[k] - x0)*(y1 - y0)) / det
+        v[k]  = (1 - l1 - l2)*u_v[c[:,0]] + l1*u_v[c[:,1]] + l2*u_v[c[:,2]]
+        hit[k] = 1.0
+
+      # the block is gathered by the first process, where points on 
+      # partition boundaries are averaged :
+      if size > 1:
+        v_sum   = np.empty_like(v)   if rank == 0 else None
+        hit_sum = np.empty_like(hit) if rank == 0 else None
+        comm.Reduce(v,   v_sum,   op=mpi4py_MPI.SUM, root=0)
+        comm.Reduce(hit, hit_sum, op=mpi4py_MPI.SUM, root=0)
+        v, hit  = v_sum, hit_sum
+      if rank != 0:
+        continue
+
+      v[hit > 0]  /= hit[hit > 0]
+      v[hit == 0]  = val
+      fa[i:i+n]    = v.reshape(-1, di.nx)
+
+    if rank != 0:
+      return
+    s = filename + 'matrix <min, max> : <%.3e, %.3e>' % (fa.min(), fa.max())
+    print_text(s, '97')
+
     outfile = self.out_dir + 'matlab/' + filename + '.mat'
+    d       = os.path.dirname(outfile)
+    if not os.path.exists(d):
+      os.makedirs(d)
     savemat(outfile, {'map_data'          : fa,
                       'continent'         : di.cont,
                       'nx'                : di.nx,
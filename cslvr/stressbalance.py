@@ -1,6 +1,7 @@
 from cslvr.physics     import Physics
 from cslvr.inputoutput import print_text, print_min_max
 from fenics            import *
+from dolfin_adjoint    import *
 
 
 class StressBalance(Physics):
@@ -24,49 +25,31 @@ class StressBalance(Physics):
     Rz     = model.z_rotation_matrix(rad_xy)
     tau_r  = model.rotate_tensor(tau, Rz)
     
+    # project the components of the rotated stress tensor once for all of 
+    # the vertical operators below :
+    Q     = model.Q_non_periodic
+    tau_c = [tau_r[0,0], tau_r[0,1], tau_r[0,2],
+             tau_r[1,0], tau_r[1,1], tau_r[1,2],
+             tau_r[2,0], tau_r[2,1], tau_r[2,2]]
+    tau_c = [project(t, Q, annotate=False) for t in tau_c]
+    
     # get surface stress :
-    tau_ii_S = model.vert_extrude(tau_r[0,0], d='down', Q=model.Q_non_periodic)
-    tau_ij_S = model.vert_extrude(tau_r[0,1], d='down', Q=model.Q_non_periodic)
-    tau_iz_S = model.vert_extrude(tau_r[0,2], d='down', Q=model.Q_non_periodic)
-    tau_ji_S = model.vert_extrude(tau_r[1,0], d='down', Q=model.Q_non_periodic)
-    tau_jj_S = model.vert_extrude(tau_r[1,1], d='down', Q=model.Q_non_periodic)
-    tau_jz_S = model.vert_extrude(tau_r[1,2], d='down', Q=model.Q_non_periodic)
-    tau_zi_S = model.vert_extrude(tau_r[2,0], d='down', Q=model.Q_non_periodic)
-    tau_zj_S = model.vert_extrude(tau_r[2,1], d='down', Q=model.Q_non_periodic)
-    tau_zz_S = model.vert_extrude(tau_r[2,2], d='down', Q=model.Q_non_periodic)
+    tau_ii_S, tau_ij_S, tau_iz_S, \
+    tau_ji_S, tau_jj_S, tau_jz_S, \
+    tau_zi_S, tau_zj_S, tau_zz_S = model.vert_extrude_many(tau_c, d='down', Q=Q)
     
     # get basal stress :
-    tau_ii_B = model.vert_extrude(tau_r[0,0], d='up', Q=model.Q_non_periodic)
-    tau_ij_B = model.vert_extrude(tau_r[0,1], d='up', Q=model.Q_non_periodic)
-    tau_iz_B = model.vert_extrude(tau_r[0,2], d='up', Q=model.Q_non_periodic)
-    tau_ji_B = model.vert_extrude(tau_r[1,0], d='up', Q=model.Q_non_periodic)
-    tau_jj_B = model.vert_extrude(tau_r[1,1], d='up', Q=model.Q_non_periodic)
-    tau_jz_B = model.vert_extrude(tau_r[1,2], d='up', Q=model.Q_non_periodic)
-    tau_zi_B = model.vert_extrude(tau_r[2,0], d='up', Q=model.Q_non_periodic)
-    tau_zj_B = model.vert_extrude(tau_r[2,1], d='up', Q=model.Q_non_periodic)
-    tau_zz_B = model.vert_extrude(tau_r[2,2], d='up', Q=model.Q_non_periodic)
+    tau_ii_B, tau_ij_B, tau_iz_B, \
+    tau_ji_B, tau_jj_B, tau_jz_B, \
+    tau_zi_B, tau_zj_B, tau_zz_B = model.vert_extrude_many(tau_c, d='up', Q=Q)
     
     # vertically integrate deviatoric stress (membrane stress) :
-    t_ii = model.vert_integrate(tau_r[0,0], d='up', Q=model.Q_non_periodic)
-    t_ij = model.vert_integrate(tau_r[0,1], d='up', Q=model.Q_non_periodic)
-    t_iz = model.vert_integrate(tau_r[0,2], d='up', Q=model.Q_non_periodic)
-    t_ji = model.vert_integrate(tau_r[1,0], d='up', Q=model.Q_non_periodic)
-    t_jj = model.vert_integrate(tau_r[1,1], d='up', Q=model.Q_non_periodic)
-    t_jz = model.vert_integrate(tau_r[1,2], d='up', Q=model.Q_non_periodic)
-    t_zi = model.vert_integrate(tau_r[2,0], d='up', Q=model.Q_non_periodic)
-    t_zj = model.vert_integrate(tau_r[2,1], d='up', Q=model.Q_non_periodic)
-    t_zz = model.vert_integrate(tau_r[2,2], d='up', Q=model.Q_non_periodic)
+    t_c  = model.vert_integrate_many(tau_c, d='up', Q=Q)
 
     # extrude the integral down the vertical :
-    N_ii = model.vert_extrude(t_ii, d='down', Q=model.Q_non_periodic)
-    N_ij = model.vert_extrude(t_ij, d='down', Q=model.Q_non_periodic)
-    N_iz = model.vert_extrude(t_iz, d='down', Q=model.Q_non_periodic)
-    N_ji = model.vert_extrude(t_ji, d='down', Q=model.Q_non_periodic)
-    N_jj = model.vert_extrude(t_jj, d='down', Q=model.Q_non_periodic)
-    N_jz = model.vert_extrude(t_jz, d='down', Q=model.Q_non_periodic)
-    N_zi = model.vert_extrude(t_zi, d='down', Q=model.Q_non_periodic)
-    N_zj = model.vert_extrude(t_zj, d='down', Q=model.Q_non_periodic)
-    N_zz = model.vert_extrude(t_zz, d='down', Q=model.Q_non_periodic)
+    N_ii, N_ij, N_iz, \
+    N_ji, N_jj, N_jz, \
+    N_zi, N_zj, N_zz = model.vert_extrude_many(t_c, d='down', Q=Q)
 
     # save the membrane stresses :
     model.init_N_ii(N_ii)
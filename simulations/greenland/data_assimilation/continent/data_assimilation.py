@@ -51,20 +51,10 @@ bedmodel.assign_submesh_variable(bedmodel.adot,   d3model.adot)
 bv = BalanceVelocity(bedmodel, kappa=5.0)
 bv.solve(annotate=False)
 
-# assign the balance velocity to the 3D model's bed :
-d3model.assign_submesh_variable(d3model.d_x,  bedmodel.d_x)
-d3model.assign_submesh_variable(d3model.d_y,  bedmodel.d_y)
-d3model.assign_submesh_variable(d3model.Ubar, bedmodel.Ubar)
-
-# extrude the bed values up the column : 
-d_x_e  = d3model.vert_extrude(d3model.d_x,  d='up')
-d_y_e  = d3model.vert_extrude(d3model.d_y,  d='up')
-Ubar_e = d3model.vert_extrude(d3model.Ubar, d='up')
-
-# set the appropriate variable to be the function extruded :
-d3model.init_d_x(d_x_e)
-d3model.init_d_y(d_y_e)
-d3model.init_Ubar(Ubar_e)
+# assign the balance velocity to the 3D model, extruded up the column :
+d3model.extrude_from_submesh(d3model.d_x,  bedmodel.d_x,  d='up')
+d3model.extrude_from_submesh(d3model.d_y,  bedmodel.d_y,  d='up')
+d3model.extrude_from_submesh(d3model.Ubar, bedmodel.Ubar, d='up')
 
 #===============================================================================
 # create boundary function spaces for saving variables :
@@ -74,44 +74,28 @@ zmax = mesh.coordinates()[:,2].max()
 
 z_s = linspace(zmin, zmax, 100)
 
-T_a = []
-W_a = []
-z_a = []
-
-for x_w, y_w in zip(x_a, y_a):
-  S    = model.S(x_w, y_w, 1.0)
-  B    = model.B(x_w, y_w, 1.0)
-  T_z  = []
-  W_z  = []
-  for z_w in z_s:
-    theta_i = model.theta(x_w, y_w, z_w)
-    p_i     = model.p(x_w, y_w, z_w)
-    Tm_i    = Tw - gamma*p_i
-    theta_m = a*Tm_i + b/2*Tm_i**2
-    if theta_i > theta_m:
-      W_z.append( (theta_i - theta_m)/L )
-      T_z.append( Tm_i )
-    else:
-      W_z.append( 0.0 )
-      T_z.append( (-a + np.sqrt(a**2 + 2*b*theta_i)) / b )
-  
-  T_z = array(T_z)
-  W_z = array(W_z)
-
-  # get z-coordinates :  
-  z_z = []
-  for z_w in z_s:
-    z_i = (z_w / zmax)# * (S - B) - (S - B)
-    z_z.append(z_i)
-  z_z = array(z_z)
-  
-  T_a.append(T_z)
-  W_a.append(W_z)
-  z_a.append(z_z)
-
-T_a = array(T_a)
-W_a = array(W_a)
-z_a = array(z_a)
+# evaluate every column at once :
+n_z  = len(z_s)
+x_z  = np.column_stack((np.repeat(x_a, n_z), np.repeat(y_a, n_z),
+                        np.tile(z_s, len(x_a))))
+theta_z, p_z = model.probe([model.theta, model.p], x_z)
+
+# the probed values are gathered on the first process :
+if MPI.rank(mpi_comm_world()) != 0:
+  sys.exit(0)
+
+Tm_z     = Tw - gamma*p_z
+theta_m  = a*Tm_z + b/2*Tm_z**2
+temp     = theta_z > theta_m
+W_z      = np.where(temp, (theta_z - theta_m)/L, 0.0)
+T_z      = np.where(temp, Tm_z, (-a + np.sqrt(a**2 + 2*b*theta_z)) / b)
+
+# get z-coordinates :  
+z_z = z_s / zmax# * (S - B) - (S - B)
+
+T_a = T_z.reshape(len(x_a), n_z)
+W_a = W_z.reshape(len(x_a), n_z)
+z_a = np.tile(z_z, (len(x_a), 1))
 
 if not os.path.exists(base_dir + 'profile_data'):
   os.makedirs(base_dir + 'profile_data')